@@ -0,0 +1,77 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Compare fetching secrets from a server with parsing them locally.
+
+Run with ``python benchmarks/bench_daemon.py`` from the repository
+root.  Reports the time taken by an uncached ``fetch_secrets()`` and
+by ``_load_secrets_file()`` for the same configuration in each file
+format.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import djangosecretsloader as DSL  # noqa: E402
+
+
+def _config(services):
+    """Build a configuration with ``services`` nested entries."""
+    return {
+        f"SERVICE{i}": {
+            "HOST": f"service{i}.internal.example.com",
+            "PORT": 8000 + i,
+            "USER": f"user{i}",
+            "PASSWORD": f"password-{i:08d}",
+            "OPTIONS": ["retry", "timeout=30", "keepalive"],
+        }
+        for i in range(services)
+    }
+
+
+def _time(func, number=50):
+    """Time ``func`` in microseconds per call."""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    """Run the benchmark."""
+    print(f"{'services':>8} {'source':>8} {'time (us)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for services in (10, 100, 1000):
+            config = _config(services)
+            files = {}
+            for fmt, suffix in (("TOML", "toml"), ("JSON", "json"), ("YAML", "yaml")):
+                files[fmt] = os.path.join(tmp, f"secrets.{suffix}")
+                with open(files[fmt], "w") as file:
+                    file.write(DSL.dump_secrets(fmt=fmt, **config))
+
+            path = os.path.join(tmp, "dsl.sock")
+            server = DSL.SecretsServer(path, files["JSON"])
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+
+            fetch = _time(lambda: DSL.fetch_secrets(path, refresh=True))
+            print(f"{services:>8} {'server':>8} {fetch:>10.1f}")
+            for fmt, fn in files.items():
+                parse = _time(lambda: DSL._load_secrets_file(fn), number=5)
+                print(f"{services:>8} {fmt:>8} {parse:>10.1f}")
+
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
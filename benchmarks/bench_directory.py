@@ -0,0 +1,68 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Time loading secrets directories of many files.
+
+Run with ``python benchmarks/bench_directory.py`` from the repository
+root.  Reports the time taken by ``_load_secrets_directory()`` for
+directories of increasing size, reading the files serially and in
+parallel.  Parallel reads hide disk and network latency, so they gain
+most on cold caches and network mounts; with a warm page cache and
+few processors, thread overhead can make them slower.
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import djangosecretsloader as DSL  # noqa: E402
+from djangosecretsloader import loader  # noqa: E402
+
+
+def _populate(root, entries):
+    """Write ``entries`` secret files under ``root``."""
+    for i in range(entries):
+        with open(os.path.join(root, f"SERVICE{i // 4}__KEY{i % 4}"), "w") as file:
+            file.write(f"secret-{i:08d}\n")
+
+
+def _bench(root, parallel, number):
+    """Time loading ``root``, reading files in parallel or not."""
+    saved = loader._PARALLEL_READS
+    loader._PARALLEL_READS = 16 if parallel else sys.maxsize
+    try:
+        return (
+            min(
+                timeit.repeat(
+                    lambda: DSL._load_secrets_directory(root), number=number, repeat=5
+                )
+            )
+            / number
+        )
+    finally:
+        loader._PARALLEL_READS = saved
+
+
+def main():
+    """Run the benchmark."""
+    print(f"{'entries':>8} {'serial (ms)':>12} {'parallel (ms)':>14}")
+    for entries in (100, 1000, 5000):
+        with tempfile.TemporaryDirectory() as root:
+            _populate(root, entries)
+            serial = _bench(root, False, 10)
+            parallel = _bench(root, True, 10)
+            print(f"{entries:>8} {serial * 1e3:>12.2f} {parallel * 1e3:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
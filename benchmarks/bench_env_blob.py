@@ -0,0 +1,79 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Compare exploded environment variables with a single blob.
+
+Run with ``python benchmarks/bench_env_blob.py`` from the repository
+root.  Reports the size of the environment block and the time taken
+by ``_load_secrets_environment()`` for each format.
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import djangosecretsloader as DSL  # noqa: E402
+
+
+def _config(services):
+    """Build a configuration with ``services`` nested entries."""
+    return {
+        f"SERVICE{i}": {
+            "HOST": f"service{i}.internal.example.com",
+            "PORT": str(8000 + i),
+            "USER": f"user{i}",
+            "PASSWORD": f"password-{i:08d}",
+            "OPTIONS": ["retry", "timeout=30", "keepalive"],
+        }
+        for i in range(services)
+    }
+
+
+def _variables(dump):
+    """Parse ``dump`` into environment variables."""
+    return DSL._parse_dotenv(dump)
+
+
+def _bench(variables, number):
+    """Time loading ``variables`` from the environment."""
+    saved = dict(os.environ)
+    os.environ.update(variables)
+    try:
+        return (
+            min(timeit.repeat(DSL._load_secrets_environment, number=number, repeat=5))
+            / number
+        )
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+
+def main():
+    """Run the benchmark."""
+    print(f"{'services':>8} {'format':>8} {'vars':>6} {'bytes':>8} {'load (us)':>10}")
+    for services in (10, 50, 200):
+        config = _config(services)
+        for name, dump in (
+            ("ENV", DSL._dump_secrets_environment(config)),
+            ("BLOB", DSL._dump_secrets_blob(config)),
+        ):
+            variables = _variables(dump)
+            size = sum(len(k) + len(v) + 2 for k, v in variables.items())
+            elapsed = _bench(variables, 200)
+            print(
+                f"{services:>8} {name:>8} {len(variables):>6} {size:>8} "
+                f"{elapsed * 1e6:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Compare loading a large bundle from JSON and an indexed snapshot.
+
+Run with ``python benchmarks/bench_indexed.py`` from the repository
+root.  Reports the time and peak memory taken to open a bundle of
+services, each with a binary certificate, and read one service from
+it, as JSON and as an indexed snapshot.
+"""
+
+import base64
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from djangosecretsloader import indexed  # noqa: E402
+
+
+def _bundle(services):
+    """Build a bundle of ``services`` entries."""
+    return {
+        f"SERVICE{i}": {
+            "HOST": f"service{i}.internal.example.com",
+            "PORT": 8000 + i,
+            "CERT": os.urandom(4096),
+        }
+        for i in range(services)
+    }
+
+
+def _measure(load):
+    """Return the seconds and peak bytes taken by ``load()``."""
+    gc.collect()
+    start = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    load()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def _load_json(fn, key):
+    """Load ``key`` from a JSON bundle."""
+    with open(fn) as f:
+        service = json.load(f)[key]
+
+    return base64.b64decode(service["CERT"])
+
+
+def _load_indexed(fn, key):
+    """Load ``key`` from an indexed snapshot."""
+    return indexed.open_secrets(fn)[key]["CERT"]
+
+
+def main():
+    """Run the benchmark."""
+    print(f"{'format':>8} {'MB':>6} {'time (ms)':>10} {'peak (MB)':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for services in (1000, 10000):
+            bundle = _bundle(services)
+            key = f"SERVICE{services // 2}"
+
+            fn = os.path.join(directory, "bundle.json")
+            with open(fn, "w") as f:
+                json.dump(
+                    {
+                        k: dict(v, CERT=base64.b64encode(v["CERT"]).decode())
+                        for k, v in bundle.items()
+                    },
+                    f,
+                )
+            size = os.path.getsize(fn) / 1e6
+            elapsed, peak = _measure(lambda: _load_json(fn, key))
+            print(
+                f"{'JSON':>8} {size:>6.1f} {elapsed * 1e3:>10.1f} {peak / 1e6:>10.1f}"
+            )
+
+            fn = os.path.join(directory, "bundle.dsl")
+            with open(fn, "wb") as f:
+                f.write(indexed._dump_indexed(bundle))
+            size = os.path.getsize(fn) / 1e6
+            elapsed, peak = _measure(lambda: _load_indexed(fn, key))
+            print(
+                f"{'INDEXED':>8} {size:>6.1f} {elapsed * 1e3:>10.1f} "
+                f"{peak / 1e6:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Compare full and partial parses of a large JSON secrets file.
+
+Run with ``python benchmarks/bench_json_partial.py`` from the
+repository root.  Reports the time and peak memory taken to decode a
+JSON bundle whole and to decode only a subset of its top level keys,
+as ``load_secrets()`` does when given defaults.
+"""
+
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from djangosecretsloader import loader  # noqa: E402
+
+
+def _bundle(services):
+    """Build the JSON text of a bundle of ``services`` entries."""
+    return json.dumps(
+        {
+            f"SERVICE{i}": {
+                "HOST": f"service{i}.internal.example.com",
+                "PORT": 8000 + i,
+                "CREDENTIALS": {
+                    f"KEY{j}": f"secret-{i:06d}-{j:02d}-{'x' * 24}" for j in range(20)
+                },
+                "REPLICAS": [f"replica{j}.example.com" for j in range(5)],
+            }
+            for i in range(services)
+        },
+        indent=2,
+    )
+
+
+def _measure(parse):
+    """Return the seconds and peak bytes taken by ``parse()``."""
+    gc.collect()
+    start = time.perf_counter()
+    parse()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    parse()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main():
+    """Run the benchmark."""
+    print(f"{'MB':>6} {'wanted':>7} {'time (ms)':>10} {'peak (MB)':>10}")
+    for services in (5000, 20000):
+        text = _bundle(services)
+        size = len(text) / 1e6
+        elapsed, peak = _measure(lambda: json.loads(text))
+        print(f"{size:>6.1f} {'all':>7} {elapsed * 1e3:>10.1f} {peak / 1e6:>10.1f}")
+        for wanted in (1, 100, services // 2):
+            keys = [f"SERVICE{i}" for i in range(0, services, services // wanted)]
+            elapsed, peak = _measure(lambda: loader._load_json_partial(text, keys))
+            print(
+                f"{size:>6.1f} {len(keys):>7} {elapsed * 1e3:>10.1f} "
+                f"{peak / 1e6:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
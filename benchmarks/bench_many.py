@@ -0,0 +1,117 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Compare loading many tenants one at a time and together.
+
+Run with ``python benchmarks/bench_many.py`` from the repository root.
+Reports the time taken to load 10,000 tenants, each a small overlay
+on a common base, and the memory retained by their configurations and
+the parse caches, from a cold start, with ``load_secrets()`` and an
+include of the base per tenant, and with ``load_secrets_many()`` in
+one process and in a process pool.
+"""
+
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import djangosecretsloader as DSL  # noqa: E402
+
+TENANTS = 10000
+
+
+def _base():
+    """Build a base configuration of services."""
+    return {
+        "DEBUG": False,
+        "SERVICES": {
+            f"SERVICE{i}": {
+                "HOST": f"service{i}.internal.example.com",
+                "PORT": 8000 + i,
+                "OPTIONS": {"timeout": 30, "retries": 3, "tls": True},
+            }
+            for i in range(100)
+        },
+    }
+
+
+def _overlay(i):
+    """Build the overlay of tenant ``i``."""
+    return {
+        "TENANT": f"tenant{i}",
+        "SERVICES": {"SERVICE0": {"HOST": f"tenant{i}.example.com"}},
+    }
+
+
+def _cold():
+    """Clear the parse caches, so that each load starts cold."""
+    DSL.loader._PARSE_CACHE.clear()
+    DSL.loader._INCLUDE_CACHE.clear()
+    gc.collect()
+
+
+def _measure(load):
+    """Return the seconds taken by ``load()`` and the bytes it retains.
+
+    Both are measured from a cold start, and the retained bytes include
+    the parse caches filled by the load.
+    """
+    _cold()
+    start = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - start
+
+    _cold()
+    tracemalloc.start()
+    result = load()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+
+    return elapsed, retained
+
+
+def main():
+    """Run the benchmark."""
+    with tempfile.TemporaryDirectory() as directory:
+        base = os.path.join(directory, "base.json")
+        with open(base, "w") as f:
+            json.dump(_base(), f)
+
+        overlays, included = [], []
+        for i in range(TENANTS):
+            overlays.append(os.path.join(directory, f"tenant{i}.json"))
+            with open(overlays[-1], "w") as f:
+                json.dump(_overlay(i), f)
+            included.append(os.path.join(directory, f"tenant{i}.included.json"))
+            with open(included[-1], "w") as f:
+                json.dump({"_INCLUDE": "base.json", **_overlay(i)}, f)
+
+        cases = (
+            ("load_secrets", lambda: [DSL.load_secrets(fn) for fn in included]),
+            ("many", lambda: DSL.load_secrets_many(base, overlays)),
+            ("many (4)", lambda: DSL.load_secrets_many(base, overlays, processes=4)),
+        )
+
+        print(f"{'loader':>14} {'time (s)':>9} {'retained (MB)':>14}")
+        for name, load in cases:
+            elapsed, retained = _measure(load)
+            print(f"{name:>14} {elapsed:>9.2f} {retained / 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
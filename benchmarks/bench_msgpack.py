@@ -0,0 +1,75 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Compare MessagePack and JSON encoding and decoding of a bundle.
+
+Run with ``python benchmarks/bench_msgpack.py`` from the repository
+root.  Checks that a bundle of services round trips through
+MessagePack, then reports the size of each encoding and its encoding
+and decoding throughput.  Uses the ``msgpack`` package if it is
+installed, and the pure Python implementation otherwise.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from djangosecretsloader import packed  # noqa: E402
+
+
+def _bundle(services):
+    """Build a bundle of ``services`` entries."""
+    return {
+        f"SERVICE{i}": {
+            "HOST": f"service{i}.internal.example.com",
+            "PORT": 8000 + i,
+            "DEBUG": i % 2 == 0,
+            "CREDENTIALS": {
+                f"KEY{j}": f"secret-{i:06d}-{j:02d}-{'x' * 24}" for j in range(20)
+            },
+            "REPLICAS": [f"replica{j}.example.com" for j in range(5)],
+        }
+        for i in range(services)
+    }
+
+
+def _throughput(function, argument, size):
+    """Return the MB per second of ``function(argument)``."""
+    start = time.perf_counter()
+    function(argument)
+
+    return size / 1e6 / (time.perf_counter() - start)
+
+
+def main():
+    """Run the benchmark."""
+    implementation = "msgpack" if packed.msgpack is not None else "pure Python"
+    print(f"MessagePack implementation:  {implementation}")
+    print(f"{'format':>8} {'MB':>6} {'encode (MB/s)':>14} {'decode (MB/s)':>14}")
+    for services in (1000, 10000):
+        bundle = _bundle(services)
+
+        data = packed._pack(bundle)
+        assert packed._unpack(data) == bundle
+        encode = _throughput(packed._pack, bundle, len(data))
+        decode = _throughput(packed._unpack, data, len(data))
+        print(f"{'MSGPACK':>8} {len(data) / 1e6:>6.1f} {encode:>14.1f} {decode:>14.1f}")
+
+        text = json.dumps(bundle)
+        encode = _throughput(json.dumps, bundle, len(text))
+        decode = _throughput(json.loads, text, len(text))
+        print(f"{'JSON':>8} {len(text) / 1e6:>6.1f} {encode:>14.1f} {decode:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
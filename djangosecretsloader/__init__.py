@@ -10,17 +10,79 @@
 
 """django-loader module interface."""
 
+import importlib
+
 from .config import _create_argument_parser
+from .daemon import SecretsServer
+from .daemon import fetch_secrets
+from .daemon import serve_secrets
+from .encryption import decrypt_value
+from .encryption import encrypt_secrets
+from .encryption import encrypt_value
+from .fingerprint import SecretsFingerprint
+from .generated import compile_secrets
+from .index import SecretsIndex
+from .indexed import IndexedSecrets
+from .indexed import open_secrets
 from .loader import _convert_dict_to_list
 from .loader import _convert_listdict_to_list
+from .loader import _decode_blob
+from .loader import _dump_secrets_blob
 from .loader import _dump_secrets_environment
+from .loader import _encode_blob
+from .loader import _exec_secrets
+from .loader import _is_dotenv
 from .loader import _keys_are_indices
+from .loader import _load_dotenv
+from .loader import _load_secrets_directory
 from .loader import _load_secrets_environment
 from .loader import _load_secrets_file
+from .loader import _load_secrets_graph
+from .loader import _load_secrets_indexed
+from .loader import _load_secrets_snapshot
+from .loader import _load_secrets_source
 from .loader import _merge
+from .loader import _parse_dotenv
 from .loader import _process_defaults
 from .loader import _validate_file_format
 from .loader import dump_secrets
 from .loader import generate_secret_key
 from .loader import load_secrets
 from .loader import main
+from .refs import resolve_reference
+from .shared import SharedSecrets
+from .shared import attach_secrets
+from .shared import publish_secrets
+from .shared import unlink_secrets
+
+# Names imported on first use, since their modules import asyncio, the
+# HTTP client and server, and thread and process pools.
+_LAZY = {
+    "CachedBackend": ".cache",
+    "HTTPBackend": ".backends",
+    "LocalSecretsServer": ".backends",
+    "SecretsBackend": ".backends",
+    "TTLCache": ".cache",
+    "VaultBackend": ".backends",
+    "aload_secrets": ".aio",
+    "fetch_backends": ".backends",
+    "load_secrets_many": ".bulk",
+}
+
+
+def __getattr__(name):
+    """Import the lazily loaded names on first use."""
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    """List the lazily loaded names with the others."""
+    return sorted(set(globals()) | set(_LAZY))
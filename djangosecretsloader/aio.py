@@ -0,0 +1,112 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Load Django settings from asyncio code.
+
+Files are parsed in the default executor while remote backends are
+fetched concurrently, so the event loop is never blocked on disk or
+network I/O.  Parsed files are cached with the synchronous loader.
+"""
+
+import asyncio
+
+from .backends import _combine
+from .loader import _finish_secrets
+from .loader import _load_secrets_environment
+from .loader import _load_secrets_shortcut
+from .loader import _load_secrets_source
+from .loader import _resolve_source
+from .loader import _unflatten
+from .loader import _wanted_keys
+
+
+async def aload_secrets(
+    fn=None, prefix="DJANGO_ENV_", backends=None, profile=None, timeout=None, **kwargs
+):
+    """Load configuration variables without blocking the event loop.
+
+    The asyncio counterpart of ``load_secrets()``, with the same
+    sources, precedence, and result.
+
+    Parameters
+    ----------
+    fn : str, optional
+        Filename from which to load configuration values, or ``unix:``
+        and the path of a secrets server socket.
+    prefix : str, optional
+        Prefix for environment variables.
+    backends : list, optional
+        ``SecretsBackend`` instances, fetched concurrently with the
+        file.
+    profile : str, optional
+        Profile of the file to load, defaults to
+        ``DJANGO_LOADER_PROFILE``.
+    timeout : float, optional
+        Seconds to wait for all sources, or ``None`` to wait forever.
+    **kwargs : dict
+        Default configuration variables.
+
+    Returns
+    -------
+    dict
+        A dictionary of configuration variables and their values.
+
+    Raises
+    ------
+    asyncio.TimeoutError
+        Raises ``asyncio.TimeoutError`` if the sources take longer
+        than ``timeout``.
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception under the same
+        conditions as ``load_secrets()``.
+    """
+    return await asyncio.wait_for(
+        _aload_secrets(fn, prefix, backends, profile, kwargs), timeout
+    )
+
+
+async def _aload_secrets(fn, prefix, backends, profile, defaults):
+    """Load the sources of ``aload_secrets()`` concurrently."""
+    fn, profile = _resolve_source(fn, profile)
+    if not backends:
+        secrets = _load_secrets_shortcut(fn, prefix, profile, defaults)
+        if secrets is not None:
+            return secrets
+
+    loop = asyncio.get_running_loop()
+    backends = backends or []
+    keys = _wanted_keys(defaults, prefix)
+
+    file, env, *results = await asyncio.gather(
+        loop.run_in_executor(None, _load_secrets_source, fn, prefix, profile, keys),
+        loop.run_in_executor(None, _load_secrets_environment, prefix),
+        *(loop.run_in_executor(None, b.get_many, keys) for b in backends),
+        return_exceptions=True,
+    )
+    for result in (file, env):
+        if isinstance(result, BaseException):
+            raise result
+
+    remote = {}
+    if backends:
+        remote = _unflatten(_combine(backends, results))
+
+    # Interpolation may resolve secrets, and publishing writes shared
+    # memory, so finish off the event loop too.
+    return await loop.run_in_executor(
+        None,
+        _finish_secrets,
+        prefix,
+        defaults,
+        file,
+        remote,
+        None if backends else (fn, profile),
+        env,
+    )
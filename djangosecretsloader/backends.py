@@ -0,0 +1,390 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Load secrets from remote backends.
+
+Backends return flattened names, following the environment variable
+format, and their values.  Each backend fetches its keys in batches
+over a pool of keep-alive connections, and independent backends are
+fetched concurrently.
+"""
+
+import abc
+import http.client
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+class SecretsBackend(abc.ABC):
+    """A source of remote secrets.
+
+    Subclasses implement ``get_many()``.
+    """
+
+    @abc.abstractmethod
+    def get_many(self, keys=None):
+        """Fetch the values of ``keys`` in one batch.
+
+        Parameters
+        ----------
+        keys : list, optional
+            Top level configuration names to fetch.  Names nested
+            under them, separated by ``__``, are included.  All
+            available names are fetched if ``keys`` is ``None``.
+
+        Returns
+        -------
+        dict
+            Flattened names and their values.
+        """
+
+    def close(self):
+        """Release any resources held by the backend."""
+
+
+class HTTPBackend(SecretsBackend):
+    """A backend for a JSON secrets service over HTTP.
+
+    ``GET {url}`` returns a JSON object of all names and values, and
+    ``POST {url}`` with ``{"keys": [...]}`` returns only the names
+    under ``keys``.
+    """
+
+    def __init__(self, url, token=None, pool_size=4, timeout=5.0):
+        """Create a backend with a connection pool for ``url``."""
+        self.url = url
+        self.token = token
+        self._pool = _ConnectionPool(url, pool_size, timeout)
+
+    def _headers(self):
+        """Return the request headers."""
+        headers = {"Accept": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        return headers
+
+    def get_many(self, keys=None):
+        """Fetch the values of ``keys`` in one request."""
+        headers = self._headers()
+        if keys is None:
+            return self._pool.request_json("GET", self._pool.path, None, headers)
+
+        headers["Content-Type"] = "application/json"
+        body = json.dumps({"keys": list(keys)}).encode("utf-8")
+
+        return self._pool.request_json("POST", self._pool.path, body, headers)
+
+    def close(self):
+        """Close the pooled connections."""
+        self._pool.close()
+
+
+class VaultBackend(HTTPBackend):
+    """A backend for a Vault-style KV version 2 secrets engine.
+
+    All names stored at ``path`` in the ``mount`` engine are fetched
+    in a single request.
+    """
+
+    def __init__(self, url, path, token=None, mount="secret", **kwargs):
+        """Create a backend reading ``path`` from the ``mount`` engine."""
+        super().__init__(
+            f"{url.rstrip('/')}/v1/{mount}/data/{path.strip('/')}", token, **kwargs
+        )
+
+    def _headers(self):
+        """Return the request headers."""
+        headers = {"Accept": "application/json"}
+        if self.token:
+            headers["X-Vault-Token"] = self.token
+
+        return headers
+
+    def get_many(self, keys=None):
+        """Fetch the values of ``keys`` in one request."""
+        response = self._pool.request_json(
+            "GET", self._pool.path, None, self._headers()
+        )
+        data = response["data"]["data"]
+        if keys is None:
+            return data
+
+        return {k: v for k, v in data.items() if _wanted(k, keys)}
+
+
+def fetch_backends(backends, keys=None):
+    """Fetch secrets from ``backends`` concurrently.
+
+    Parameters
+    ----------
+    backends : list
+        ``SecretsBackend`` instances, in increasing order of
+        precedence.
+    keys : list, optional
+        Top level configuration names to fetch.
+
+    Returns
+    -------
+    dict
+        Flattened names and values from all the backends, with later
+        backends overriding earlier ones.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if any backend
+        fails.
+    """
+    if not backends:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=len(backends)) as executor:
+        futures = [executor.submit(b.get_many, keys) for b in backends]
+
+    return _combine(backends, [f.exception() or f.result() for f in futures])
+
+
+def _combine(backends, results):
+    """Combine backend results, raising the first failure.
+
+    Parameters
+    ----------
+    backends : list
+        ``SecretsBackend`` instances, in increasing order of
+        precedence.
+    results : list
+        The dict fetched from each backend, or the exception it
+        raised.
+
+    Returns
+    -------
+    dict
+        Flattened names and values from all the backends.
+    """
+    raw = {}
+    for backend, result in zip(backends, results):
+        if isinstance(
+            result, (OSError, ValueError, KeyError, http.client.HTTPException)
+        ):
+            raise ImproperlyConfigured(
+                f"Secrets backend {type(backend).__name__} failed:  {result}"
+            )
+        elif isinstance(result, BaseException):
+            raise result
+        raw.update(result)
+
+    return raw
+
+
+class _ConnectionPool:
+    """A pool of keep-alive HTTP connections to one host."""
+
+    def __init__(self, url, size=4, timeout=5.0):
+        """Create an empty pool for the host of ``url``."""
+        parts = urlsplit(url)
+        if parts.scheme == "https":
+            self._factory = http.client.HTTPSConnection
+        elif parts.scheme == "http":
+            self._factory = http.client.HTTPConnection
+        else:
+            raise ImproperlyConfigured(f"Unsupported secrets backend URL {url}.")
+
+        self.host = parts.netloc
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path += f"?{parts.query}"
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _acquire(self):
+        """Return an idle connection or a new one."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._factory(self.host, timeout=self.timeout)
+
+    def _release(self, connection):
+        """Return ``connection`` to the pool, or close it if full."""
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def request_json(self, method, path, body, headers):
+        """Make a request and decode the JSON response.
+
+        A request on a reused connection that the server has closed is
+        retried once on a new connection.
+        """
+        for attempt in range(2):
+            connection = self._acquire()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, ConnectionError):
+                connection.close()
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                connection.close()
+                raise
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+
+            if response.status != 200:
+                raise ValueError(f"HTTP {response.status} from {self.host}{path}")
+
+            return json.loads(data)
+
+    def close(self):
+        """Close the idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _wanted(name, keys):
+    """Determine if the flattened ``name`` is under one of ``keys``."""
+    top = name.split("__", 1)[0]
+
+    return top in keys
+
+
+class LocalSecretsServer:
+    """An in-process HTTP stand-in for remote secrets services.
+
+    Serves ``secrets``, a dict of flattened names and values, on an
+    ephemeral localhost port, both as an ``HTTPBackend`` service at
+    ``/secrets`` and as a Vault-style KV engine at
+    ``/v1/secret/data/{path}`` for any path.  Connections and
+    requests are counted for tests.
+    """
+
+    def __init__(self, secrets, token=None):
+        """Create a stopped server for ``secrets``."""
+        self.secrets = secrets
+        self.token = token
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        """Return the base URL of the running server."""
+        host, port = self._server.server_address[:2]
+
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _LocalSecretsHandler)
+        self._server.daemon_threads = True
+        self._server.stand_in = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        """Start the server."""
+        return self.start()
+
+    def __exit__(self, *args):
+        """Stop the server."""
+        self.stop()
+
+
+class _LocalSecretsHandler(BaseHTTPRequestHandler):
+    """Answer requests for a ``LocalSecretsServer``."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        """Count the connection."""
+        super().setup()
+        with self.server.stand_in._lock:
+            self.server.stand_in.connections += 1
+
+    def log_message(self, format, *args):
+        """Do not log requests."""
+
+    def _authorized(self):
+        """Check the request token, if the server has one."""
+        token = self.server.stand_in.token
+        if token is None:
+            return True
+
+        return token in (
+            self.headers.get("X-Vault-Token"),
+            self.headers.get("Authorization", "").removeprefix("Bearer "),
+        )
+
+    def _reply(self, status, data):
+        """Send a JSON response."""
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, keys):
+        """Answer a request for ``keys``."""
+        stand_in = self.server.stand_in
+        with stand_in._lock:
+            stand_in.requests += 1
+
+        if not self._authorized():
+            return self._reply(403, {"errors": ["permission denied"]})
+
+        secrets = stand_in.secrets
+        if keys is not None:
+            secrets = {k: v for k, v in secrets.items() if _wanted(k, keys)}
+
+        if self.path.startswith("/v1/secret/data/"):
+            return self._reply(200, {"data": {"data": secrets}})
+        elif self.path == "/secrets":
+            return self._reply(200, secrets)
+
+        return self._reply(404, {"errors": ["not found"]})
+
+    def do_GET(self):
+        """Answer a request for all names."""
+        self._handle(None)
+
+    def do_POST(self):
+        """Answer a request for some names."""
+        length = int(self.headers.get("Content-Length", 0))
+        self._handle(json.loads(self.rfile.read(length))["keys"])
@@ -0,0 +1,167 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Load secrets for many tenants sharing a base configuration.
+
+The base file is parsed once, and each tenant's overlay file is merged
+over it as an including file is merged over its includes.  Only the
+dicts an overlay changes are copied, so tenants share the unchanged
+subtrees and values of the base, and dict keys are interned so that
+tenants share them too.  Overlays may be parsed in a process pool.
+"""
+
+import os
+import sys
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from .interpolation import _has_references
+from .interpolation import _interpolate
+from .loader import _load_secrets_environment
+from .loader import _load_secrets_source
+from .loader import _merge
+from .loader import _unflatten
+from .loader import _wanted_keys
+from .refs import _REF_KEY
+from .refs import _defer_references
+
+
+def load_secrets_many(
+    base,
+    overlays,
+    prefix="DJANGO_ENV_",
+    backends=None,
+    profile=None,
+    processes=None,
+    **kwargs,
+):
+    """Load the configurations of many tenants over a shared base.
+
+    Each tenant's configuration is loaded as ``load_secrets()`` would
+    load its overlay file if it included ``base``, with the same
+    backends, environment, interpolation, and defaults.  The base,
+    backends, and environment are loaded once for all tenants.
+
+    The configurations share the dicts and values that their overlays
+    do not change, so they must not be modified.  Tenants whose
+    overlays interpolate other values, or whose base does, are
+    interpolated separately and share less.
+
+    Parameters
+    ----------
+    base : str
+        Filename of the base configuration.
+    overlays : list or dict
+        Filenames of the tenants' overlay files, or a dict of tenant
+        names and their overlay filenames.
+    prefix : str, optional
+        Prefix for environment variables.
+    backends : list, optional
+        ``SecretsBackend`` instances to fetch once, for every tenant.
+    profile : str, optional
+        Profile of the files to load, defaults to
+        ``DJANGO_LOADER_PROFILE``.
+    processes : int, optional
+        Number of processes to parse overlays in, or ``None`` to parse
+        them in this process.
+    **kwargs : dict, optional
+        Default configuration variables.
+
+    Returns
+    -------
+    dict
+        The configuration of each tenant, by tenant name or overlay
+        filename.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception under the same
+        conditions as ``load_secrets()``.
+    """
+    if profile is None:
+        profile = os.getenv("DJANGO_LOADER_PROFILE") or None
+    if not isinstance(overlays, Mapping):
+        overlays = {fn: fn for fn in overlays}
+
+    keys = _wanted_keys(kwargs, prefix)
+    raw = _merge_shared({}, _load_secrets_source(base, prefix, profile, keys))
+    layers = _load_overlays(list(overlays.values()), prefix, profile, keys, processes)
+    remote = {}
+    if backends:
+        from .backends import fetch_backends
+
+        remote = _unflatten(fetch_backends(backends, keys))
+    shared = _merge({}, remote, _load_secrets_environment(prefix))
+
+    interpolate = any(_has_references(layer) for layer in (raw, shared, kwargs))
+    deferred = _defer_references(raw)
+    deferred_shared = _defer_references(shared)
+    deferred_defaults = _defer_references(kwargs)
+
+    tenants = {}
+    for name, overlay in zip(overlays, layers):
+        if interpolate or _has_references(overlay):
+            file = _merge_shared(raw, overlay)
+            secrets = _interpolate(_merge({}, kwargs, file, shared))
+            tenants[name] = _defer_references(_merge(dict(kwargs), secrets))
+        else:
+            file = _merge_shared(deferred, _defer_references(overlay))
+            tenants[name] = _merge(dict(deferred_defaults), file, deferred_shared)
+
+    return tenants
+
+
+def _load_overlays(fns, prefix, profile, keys, processes):
+    """Parse the overlay files ``fns``, in a process pool if requested.
+
+    Overlays are loaded once, so they bypass the parse cache.
+    """
+    if not processes or len(fns) < 2:
+        return [_load_secrets_source(fn, prefix, profile, keys, False) for fn in fns]
+
+    with ProcessPoolExecutor(processes) as pool:
+        return list(
+            pool.map(
+                _load_secrets_source,
+                fns,
+                repeat(prefix),
+                repeat(profile),
+                repeat(keys),
+                repeat(False),
+                chunksize=max(1, len(fns) // (processes * 4)),
+            )
+        )
+
+
+def _merge_shared(base, layer):
+    """Merge ``layer`` over ``base``, merging nested dicts.
+
+    Neither argument is modified.  Values of ``base`` that ``layer``
+    does not change, including strings equal to those in ``layer``,
+    are shared, and the keys of ``layer`` are interned.
+    """
+    merged = dict(base)
+    for k, v in layer.items():
+        if isinstance(k, str):
+            k = sys.intern(k)
+        current = merged.get(k)
+        if _is_table(v):
+            merged[k] = _merge_shared(current if _is_table(current) else {}, v)
+        elif not (type(v) is str and type(current) is str and v == current):
+            merged[k] = v
+
+    return merged
+
+
+def _is_table(value):
+    """Determine if ``value`` is a dict other than a reference."""
+    return isinstance(value, dict) and not (len(value) == 1 and _REF_KEY in value)
@@ -0,0 +1,218 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Cache externally sourced secrets.
+
+Cache values per key for a time to live, serving expired values while
+they are refreshed in the background, coalescing concurrent fetches
+of the same key, and jittering expiry so that many processes do not
+refresh at once.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+
+from .backends import SecretsBackend
+
+# Cached marker for keys the source does not have.
+_MISSING = object()
+
+# Cache key for fetching every name from a backend.
+_ALL = object()
+
+
+class TTLCache:
+    """A per-key time to live cache with stale-while-revalidate.
+
+    ``fetch_many`` is called with a list of keys and returns a dict of
+    the values it found.  Fresh values are returned directly.  Expired
+    values are returned while a background thread refreshes them, for
+    at most ``max_stale`` seconds past expiry (forever if ``None``).
+    Missing values are fetched in one batch, and callers needing a key
+    already being fetched wait for that fetch.  Each expiry is
+    shortened by a random fraction, up to ``jitter``, of ``ttl``.
+    """
+
+    def __init__(
+        self, fetch_many, ttl=300.0, max_stale=None, jitter=0.1, clock=time.monotonic
+    ):
+        """Create an empty cache."""
+        self.fetch_many = fetch_many
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.jitter = jitter
+        self.clock = clock
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._metrics = dict.fromkeys(
+            ("hits", "stale_hits", "misses", "fetches", "refreshes", "errors"), 0
+        )
+
+    def get(self, key, default=None):
+        """Return the value of ``key``, or ``default`` if missing."""
+        return self.get_many([key]).get(key, default)
+
+    def get_many(self, keys):
+        """Return the values of ``keys`` that exist.
+
+        Parameters
+        ----------
+        keys : list
+            The keys to look up.
+
+        Returns
+        -------
+        dict
+            Keys and their values, omitting keys the source does not
+            have.
+
+        Raises
+        ------
+        Exception
+            Raises any exception from ``fetch_many`` for keys that are
+            not cached.
+        """
+        now = self.clock()
+        found = {}
+        waiting = {}
+        fetch = []
+        refresh = []
+
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and now < entry[1]:
+                    self._metrics["hits"] += 1
+                    found[key] = entry[0]
+                elif entry is not None and (
+                    self.max_stale is None or now < entry[1] + self.max_stale
+                ):
+                    self._metrics["stale_hits"] += 1
+                    found[key] = entry[0]
+                    if key not in self._inflight:
+                        self._inflight[key] = Future()
+                        refresh.append(key)
+                else:
+                    self._metrics["misses"] += 1
+                    if key not in self._inflight:
+                        self._inflight[key] = Future()
+                        fetch.append(key)
+                    waiting[key] = self._inflight[key]
+
+        if refresh:
+            self._refresher().submit(self._fetch, refresh, True)
+        if fetch:
+            self._fetch(fetch)
+
+        for key, future in waiting.items():
+            found[key] = future.result()
+
+        return {k: v for k, v in found.items() if v is not _MISSING}
+
+    def invalidate(self, key=None):
+        """Forget ``key``, or every key if ``key`` is ``None``."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def metrics(self):
+        """Return the cache metrics.
+
+        Returns
+        -------
+        dict
+            Counts of ``hits``, ``stale_hits``, ``misses``, batch
+            ``fetches``, background ``refreshes``, and fetch
+            ``errors``.
+        """
+        with self._lock:
+            return dict(self._metrics)
+
+    def _fetch(self, keys, background=False):
+        """Fetch ``keys``, store them, and resolve their futures."""
+        try:
+            values = self.fetch_many(keys)
+        except Exception as error:
+            with self._lock:
+                self._metrics["errors"] += 1
+                futures = [self._inflight.pop(k) for k in keys]
+            for future in futures:
+                future.set_exception(error)
+            return
+
+        now = self.clock()
+        with self._lock:
+            self._metrics["refreshes" if background else "fetches"] += 1
+            futures = []
+            for key in keys:
+                value = values.get(key, _MISSING)
+                expires = now + self.ttl * (1.0 - self.jitter * random.random())
+                self._entries[key] = (value, expires)
+                futures.append((self._inflight.pop(key), value))
+
+        for future, value in futures:
+            future.set_result(value)
+
+    def _refresher(self):
+        """Return the background refresh executor."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="django-loader-refresh"
+                )
+
+            return self._executor
+
+
+class CachedBackend(SecretsBackend):
+    """A ``SecretsBackend`` caching another backend with a ``TTLCache``.
+
+    Values are cached per top level key.  Keyword arguments are passed
+    to ``TTLCache``.
+    """
+
+    def __init__(self, backend, **kwargs):
+        """Cache ``backend``."""
+        self.backend = backend
+        self.cache = TTLCache(self._fetch_many, **kwargs)
+
+    def get_many(self, keys=None):
+        """Fetch the values of ``keys`` through the cache."""
+        raw = {}
+        for value in self.cache.get_many([_ALL] if keys is None else keys).values():
+            raw.update(value)
+
+        return raw
+
+    def metrics(self):
+        """Return the cache metrics."""
+        return self.cache.metrics()
+
+    def close(self):
+        """Close the cached backend."""
+        self.backend.close()
+
+    def _fetch_many(self, keys):
+        """Fetch ``keys`` and group the names by top level key."""
+        if keys == [_ALL]:
+            return {_ALL: self.backend.get_many(None)}
+
+        grouped = {}
+        for name, value in self.backend.get_many(keys).items():
+            grouped.setdefault(name.split("__", 1)[0], {})[name] = value
+
+        return grouped
@@ -0,0 +1,153 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Compress and decompress secrets files.
+
+Compressed files are recognized by the magic bytes of their format
+and decompressed in memory, so that no plaintext copy is written.
+gzip and xz are supported with the standard library, and zstd with
+``compression.zstd`` (Python 3.14) or the ``zstandard`` package, if
+either is available.
+"""
+
+import gzip
+import lzma
+
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    from compression import zstd
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
+
+# Bytes needed to recognize any supported format.
+_HEAD_SIZE = 6
+
+# Errors raised for corrupt compressed data.
+_ERRORS = (OSError, EOFError, lzma.LZMAError) + ((zstd.ZstdError,) if zstd else ())
+
+
+def _zstd_reader(f):
+    """Open a zstd decompressing reader on ``f``."""
+    if zstd is None:
+        raise ImproperlyConfigured(
+            "Reading zstd compressed secrets requires the zstandard package."
+        )
+    elif hasattr(zstd, "ZstdFile"):
+        return zstd.ZstdFile(f)
+
+    return zstd.ZstdDecompressor().stream_reader(f)
+
+
+def _zstd_compress(data):
+    """Compress ``data`` with zstd."""
+    if zstd is None:
+        raise ImproperlyConfigured(
+            "Writing zstd compressed secrets requires the zstandard package."
+        )
+
+    return zstd.compress(data)
+
+
+# Compression formats:  magic bytes, reader, and compressor.
+_CODECS = {
+    "gzip": (
+        b"\x1f\x8b",
+        lambda f: gzip.GzipFile(fileobj=f),
+        lambda data: gzip.compress(data, mtime=0),
+    ),
+    "xz": (b"\xfd7zXZ\x00", lzma.LZMAFile, lzma.compress),
+    "zstd": (b"\x28\xb5\x2f\xfd", _zstd_reader, _zstd_compress),
+}
+
+
+def _compression(head):
+    """Return the compression format of ``head``, or ``None``.
+
+    Parameters
+    ----------
+    head : bytes
+        At least the first ``_HEAD_SIZE`` bytes of a file, if it has
+        that many.
+
+    Returns
+    -------
+    str or None
+        The name of the compression format, or ``None`` if the file
+        is not compressed.
+    """
+    for codec, (magic, _, _) in _CODECS.items():
+        if head.startswith(magic):
+            return codec
+
+    return None
+
+
+def _decompress(codec, f, fn):
+    """Decompress the rest of the file ``f`` in memory.
+
+    Parameters
+    ----------
+    codec : str
+        The compression format.
+    f : file
+        The compressed file, opened in binary mode.
+    fn : str
+        Filename of ``f``, for errors.
+
+    Returns
+    -------
+    bytes
+        The decompressed contents.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if the file
+        cannot be decompressed.
+    """
+    try:
+        with _CODECS[codec][1](f) as reader:
+            return reader.read()
+    except _ERRORS as error:
+        raise ImproperlyConfigured(
+            f"Compressed ({codec}) secrets file {fn} is not valid:  {error}"
+        )
+
+
+def _compress(codec, data):
+    """Compress ``data``.
+
+    Parameters
+    ----------
+    codec : str
+        The compression format, one of ``gzip``, ``xz``, or ``zstd``.
+    data : str or bytes
+        The data to compress.  Strings are encoded as UTF-8.
+
+    Returns
+    -------
+    bytes
+        The compressed data.
+
+    Raises
+    ------
+    ValueError
+        Raises a ``ValueError`` if ``codec`` is not supported.
+    """
+    if codec not in _CODECS:
+        raise ValueError(f"unsupported compression {codec}")
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    return _CODECS[codec][2](data)
@@ -66,16 +66,52 @@ to redistribute it under certain conditions; type ``loader.py
         help="Default secrets values.",
     )
 
+    parser.add_argument(
+        "-P",
+        "--profile",
+        dest="profile",
+        type=str,
+        help="Secrets file profile to load; default is `DJANGO_LOADER_PROFILE`.",
+    )
+
     parser.add_argument(
         "-d",
         "--dump-format",
         dest="dump",
         type=str,
         default="TOML",
-        choices=("TOML", "JSON", "YAML", "BespON", "ENV"),
+        choices=(
+            "TOML",
+            "JSON",
+            "YAML",
+            "BespON",
+            "MSGPACK",
+            "ENV",
+            "ENVJSON",
+            "BLOB",
+            "INDEXED",
+        ),
         help="Configuration dump format.",
     )
 
+    parser.add_argument(
+        "-z",
+        "--compress",
+        dest="compress",
+        type=str,
+        choices=("gzip", "xz", "zstd"),
+        help="Compress the dumped configuration.",
+    )
+
+    parser.add_argument(
+        "-o",
+        "--output",
+        dest="output",
+        metavar="FILE",
+        type=str,
+        help="Write the dumped configuration to FILE, readable only by its owner.",
+    )
+
     parser.add_argument(
         "-V",
         "--validate-secrets-format",
@@ -94,6 +130,89 @@ to redistribute it under certain conditions; type ``loader.py
         help="Generate a secret key.",
     )
 
+    parser.add_argument(
+        "--get",
+        dest="get",
+        metavar="KEY_PATH",
+        type=str,
+        help="Print the value at KEY_PATH, with `__` separating keys.",
+    )
+
+    parser.add_argument(
+        "--many",
+        dest="many",
+        metavar="KEY_PATH",
+        type=str,
+        nargs="+",
+        help="Print the values at each KEY_PATH as a JSON object.",
+    )
+
+    parser.add_argument(
+        "--fingerprint",
+        dest="fingerprint",
+        default=False,
+        action="store_true",
+        help="Print the SHA-256 Merkle hash of the loaded secrets.",
+    )
+
+    parser.add_argument(
+        "-x",
+        "--exec",
+        dest="exec",
+        metavar="COMMAND",
+        nargs=argparse.REMAINDER,
+        help="Load secrets once and execute a command with them.",
+    )
+
+    parser.add_argument(
+        "--exec-mode",
+        dest="exec_mode",
+        type=str,
+        default="env",
+        choices=("env", "fd"),
+        help="Pass the secrets to the command in the environment or a file descriptor.",
+    )
+
+    parser.add_argument(
+        "--publish",
+        dest="publish",
+        metavar="NAME",
+        type=str,
+        help="Publish the secrets to shared memory as NAME.",
+    )
+
+    parser.add_argument(
+        "--serve",
+        dest="serve",
+        metavar="SOCKET",
+        type=str,
+        help="Serve the secrets over the Unix domain socket SOCKET.",
+    )
+
+    parser.add_argument(
+        "--compile",
+        dest="compile",
+        metavar="MODULE",
+        type=str,
+        help="Render the secrets file into the Python module MODULE and compile it.",
+    )
+
+    parser.add_argument(
+        "--encrypt",
+        dest="encrypt",
+        default=False,
+        action="store_true",
+        help="Encrypt string values in place with DJANGO_LOADER_KEY[_FILE].",
+    )
+
+    parser.add_argument(
+        "--rotate",
+        dest="rotate",
+        default=False,
+        action="store_true",
+        help="Re-encrypt values in place with DJANGO_LOADER_NEW_KEY[_FILE].",
+    )
+
     return parser
 
 
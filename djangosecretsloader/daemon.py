@@ -0,0 +1,243 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Serve loaded secrets over a Unix domain socket.
+
+A server loads secrets once, reloads them when the secrets file
+changes, and answers each request with the loaded configuration.
+Clients fetch the configuration in one round trip.
+
+Requests are the magic ``DSLD`` and an opcode byte.  Responses are
+the magic, a status byte, the generation, and the length of the
+payload, followed by the payload:  the compact JSON encoding of the
+prefix and secrets, or an error message.
+"""
+
+import errno
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .loader import _load_secrets_environment
+from .loader import _load_secrets_file
+from .loader import _merge
+from .loader import _stamp
+
+_MAGIC = b"DSLD"
+_REQUEST = struct.Struct("!4sB")
+_RESPONSE = struct.Struct("!4sBQI")
+_OP_GET = 1
+_STATUS_OK = 0
+_STATUS_ERROR = 1
+
+# Payloads fetched by this process, by socket path.
+_FETCHED = {}
+
+
+def serve_secrets(path, fn=".env", prefix="DJANGO_ENV_", defaults=None):
+    """Serve secrets over the Unix domain socket ``path`` forever.
+
+    Parameters
+    ----------
+    path : str
+        Path of the socket.
+    fn : str, optional
+        Secrets file to load and watch.
+    prefix : str, optional
+        Prefix for environment variables.
+    defaults : dict, optional
+        Default configuration variables.
+    """
+    with SecretsServer(path, fn, prefix, defaults) as server:
+        server.serve_forever()
+
+
+def fetch_secrets(path, prefix="DJANGO_ENV_", refresh=False, timeout=5.0):
+    """Fetch secrets from the server listening on ``path``.
+
+    The payload is cached, so later calls in the same process do not
+    contact the server unless ``refresh`` is ``True``.
+
+    Parameters
+    ----------
+    path : str
+        Path of the socket.
+    prefix : str, optional
+        Prefix for environment variables, which must match the prefix
+        of the server.
+    refresh : bool, optional
+        Fetch from the server even if a payload is cached.
+    timeout : float, optional
+        Socket timeout in seconds.
+
+    Returns
+    -------
+    dict
+        The served configuration.
+
+    Raises
+    ------
+    OSError
+        Raises an ``OSError`` if the server cannot be reached.
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if the server
+        reports an error or uses a different prefix.
+    """
+    payload = None if refresh else _FETCHED.get(path)
+
+    if payload is None:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(path)
+            client.sendall(_REQUEST.pack(_MAGIC, _OP_GET))
+            magic, status, _, length = _RESPONSE.unpack(
+                _receive(client, _RESPONSE.size)
+            )
+            payload = _receive(client, length)
+
+        if magic != _MAGIC:
+            raise ImproperlyConfigured(f"Secrets server {path} is not valid.")
+        if status != _STATUS_OK:
+            raise ImproperlyConfigured(payload.decode("utf-8"))
+
+        _FETCHED[path] = payload
+
+    served = json.loads(payload)
+    if served["prefix"] != prefix:
+        raise ImproperlyConfigured(
+            f"Secrets server {path} uses prefix {served['prefix']}, not {prefix}."
+        )
+
+    return served["secrets"]
+
+
+class SecretsServer(socketserver.ThreadingUnixStreamServer):
+    """A threaded Unix domain socket server for secrets.
+
+    The secrets file, and the files it includes, are checked on each
+    request and the secrets are reloaded if any has changed.  The
+    socket is only accessible to its owner from the moment it is
+    bound.  A stale socket at ``path`` is replaced, but if another
+    server is listening on it, ``OSError`` is raised with
+    ``errno.EADDRINUSE``.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, fn=".env", prefix="DJANGO_ENV_", defaults=None):
+        """Load the secrets and bind to ``path``."""
+        self.fn = fn
+        self.prefix = prefix
+        self.defaults = defaults or {}
+        self.generation = 0
+        self._stamps = {}
+        self._payload = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+        # Replace a stale socket, but not one a server is listening on.
+        try:
+            if stat.S_ISSOCK(os.stat(path).st_mode):
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                    try:
+                        probe.connect(path)
+                    except ConnectionRefusedError:
+                        os.unlink(path)
+                    else:
+                        raise OSError(
+                            errno.EADDRINUSE, os.strerror(errno.EADDRINUSE), path
+                        )
+        except FileNotFoundError:
+            pass
+
+        # Bind under a restrictive umask, so that the socket is never
+        # accessible to other users.
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, _SecretsHandler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self):
+        """Close and remove the socket."""
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+
+    def refresh(self):
+        """Reload the secrets if the secrets file or its includes changed.
+
+        Returns
+        -------
+        bytes
+            The current payload.
+        """
+        with self._lock:
+            if self._payload is None or any(
+                _stamp(p) != s for p, s in self._stamps.items()
+            ):
+                stamps = {}
+                secrets = _merge(
+                    dict(self.defaults),
+                    _load_secrets_file(self.fn, prefix=self.prefix, stamps=stamps),
+                    _load_secrets_environment(self.prefix),
+                )
+                self._payload = json.dumps(
+                    {"prefix": self.prefix, "secrets": secrets},
+                    separators=(",", ":"),
+                    default=str,
+                ).encode("utf-8")
+                self._stamps = stamps
+                self.generation += 1
+
+            return self._payload
+
+
+class _SecretsHandler(socketserver.BaseRequestHandler):
+    """Answer a single secrets request."""
+
+    def handle(self):
+        """Send the current secrets."""
+        server = self.server
+        try:
+            magic, op = _REQUEST.unpack(_receive(self.request, _REQUEST.size))
+            if magic != _MAGIC or op != _OP_GET:
+                raise ImproperlyConfigured("Invalid secrets request.")
+            payload = server.refresh()
+            status = _STATUS_OK
+        except (ImproperlyConfigured, ValueError) as error:
+            payload = str(error).encode("utf-8")
+            status = _STATUS_ERROR
+        except (ConnectionError, EOFError):
+            return
+
+        self.request.sendall(
+            _RESPONSE.pack(_MAGIC, status, server.generation, len(payload)) + payload
+        )
+
+
+def _receive(sock, size):
+    """Receive exactly ``size`` bytes from ``sock``."""
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise EOFError("Connection closed by peer.")
+        data += chunk
+
+    return bytes(data)
@@ -0,0 +1,402 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Encrypt individual secret values.
+
+String values may be encrypted in place, as ``ENC[...]`` strings, so
+that secrets files can be committed with their structure and names
+readable.  Encrypted values are deferred like secret references, and
+decrypted and memoized when first used.
+
+Keys are derived from a passphrase, in ``DJANGO_LOADER_KEY`` or the
+file named by ``DJANGO_LOADER_KEY_FILE``, with scrypt and the salt of
+each value.  Values encrypted together share a salt, so each key is
+derived once per process.  Values are encrypted and authenticated
+with AES-256-GCM from the ``cryptography`` package, with the version
+and salt as associated data.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import os
+import threading
+import warnings
+
+import bespon
+import toml
+from django.core.exceptions import ImproperlyConfigured
+from ruamel.yaml import YAML
+from ruamel.yaml.error import YAMLError
+
+from .compressed import _HEAD_SIZE
+from .compressed import _compress
+from .compressed import _compression
+from .interpolation import _REFERENCE
+from .loader import _INCLUDE_NAME
+from .loader import _INDEXED
+from .loader import _MSGPACK
+from .loader import _TEXT
+from .loader import _is_dotenv
+from .loader import _load_secrets_indexed
+from .loader import _parse_dotenv
+from .loader import _quote_shell
+from .loader import _read_secrets_file
+from .loader import _write_output
+from .loader import dump_secrets
+from .packed import _unpack
+from .refs import _ENC_PREFIX
+from .refs import _ENCRYPTED
+from .refs import _REF_KEY
+from .refs import _REF_PREFIX
+
+_VERSION = "v1"
+_SALT_SIZE = 16
+_NONCE_SIZE = 12
+
+# scrypt cost parameters.
+_SCRYPT_N = 2**15
+_SCRYPT_R = 8
+_SCRYPT_P = 1
+
+# Derived keys by passphrase and salt.
+_KEYS = {}
+_KEYS_LOCK = threading.Lock()
+
+
+def encrypt_value(value, key=None, salt=None):
+    """Encrypt a string.
+
+    Parameters
+    ----------
+    value : str
+        The string to encrypt.
+    key : str or bytes, optional
+        The passphrase, defaulting to ``DJANGO_LOADER_KEY`` or the
+        contents of ``DJANGO_LOADER_KEY_FILE``.
+    salt : bytes, optional
+        The key derivation salt.  A random salt is used if ``None``;
+        pass the same salt to encrypt many values with one key
+        derivation.
+
+    Returns
+    -------
+    str
+        The encrypted value, as ``ENC[...]``.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if there is no
+        key, or the ``cryptography`` package is not installed.
+    """
+    if salt is None:
+        salt = os.urandom(_SALT_SIZE)
+    cipher = _cipher(_passphrase(key), salt)
+    nonce = os.urandom(_NONCE_SIZE)
+    ciphertext = cipher.encrypt(nonce, value.encode("utf-8"), _associated(salt))
+
+    return (
+        f"{_ENC_PREFIX}{_VERSION}:{_encode(salt)}:{_encode(nonce)}:"
+        f"{_encode(ciphertext)}]"
+    )
+
+
+def decrypt_value(value, key=None):
+    """Decrypt a string encrypted by ``encrypt_value()``.
+
+    Parameters
+    ----------
+    value : str
+        The encrypted value.
+    key : str or bytes, optional
+        The passphrase, defaulting to ``DJANGO_LOADER_KEY`` or the
+        contents of ``DJANGO_LOADER_KEY_FILE``.
+
+    Returns
+    -------
+    str
+        The decrypted string.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if there is no
+        key, the value is not valid, it was encrypted with another key
+        or modified, or the ``cryptography`` package is not installed.
+    """
+    match = _ENCRYPTED.fullmatch(value)
+    if match is None:
+        raise ImproperlyConfigured("Encrypted secret is not valid.")
+
+    try:
+        salt, nonce, ciphertext = (_decode(part) for part in match.groups()[1:])
+    except (binascii.Error, ValueError):
+        raise ImproperlyConfigured("Encrypted secret is not valid.")
+    if len(nonce) != _NONCE_SIZE:
+        raise ImproperlyConfigured("Encrypted secret is not valid.")
+
+    cipher = _cipher(_passphrase(key), salt)
+
+    from cryptography.exceptions import InvalidTag
+
+    try:
+        plaintext = cipher.decrypt(nonce, ciphertext, _associated(salt))
+    except InvalidTag:
+        raise ImproperlyConfigured(
+            "Encrypted secret cannot be decrypted with this key, or was modified."
+        )
+
+    return plaintext.decode("utf-8")
+
+
+def encrypt_secrets(fn, key=None, new_key=None):
+    """Encrypt the string values of a secrets file in place.
+
+    Each string value is encrypted, except for secret references,
+    interpolated strings, includes, and values already encrypted.
+    Strings interpolating other values are left as they are, so that
+    they are still interpolated, with a warning naming them, since
+    they may hold secrets too.  If
+    ``new_key`` is given, encrypted values are decrypted with ``key``
+    and every value is encrypted with ``new_key`` instead.  The file
+    is rewritten in the format it was read in, without comments, and
+    is readable only by its owner.
+
+    Parameters
+    ----------
+    fn : str
+        The secrets file.
+    key : str or bytes, optional
+        The passphrase, defaulting to ``DJANGO_LOADER_KEY`` or the
+        contents of ``DJANGO_LOADER_KEY_FILE``.
+    new_key : str or bytes, optional
+        The passphrase to rotate to.
+
+    Returns
+    -------
+    int
+        The number of values encrypted.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if there is no
+        key, the file is not a recognized format, or an encrypted
+        value cannot be decrypted.
+    """
+    fmt, config = _read_secrets(fn)
+    passphrase = _passphrase(key)
+    salt = os.urandom(_SALT_SIZE)
+    count = 0
+
+    def _encrypt(value):
+        nonlocal count
+        if _is_encrypted(value):
+            if new_key is None:
+                return value
+            value = decrypt_value(value, passphrase)
+        count += 1
+
+        return encrypt_value(value, passphrase if new_key is None else new_key, salt)
+
+    skipped = []
+    config = _encrypt_strings(config, _encrypt, skipped)
+    if skipped:
+        warnings.warn(
+            "Values interpolating other values were not encrypted:  "
+            + ", ".join(skipped)
+        )
+    if fmt.startswith("DOTENV"):
+        dumped = "\n".join(f"{k}={_dotenv_value(v)}" for k, v in config.items())
+        codec = fmt.partition("+")[2]
+        if codec:
+            dumped = _compress(codec, dumped + "\n")
+    else:
+        dumped = dump_secrets(fmt, **config)
+    _write_output(fn, dumped)
+
+    return count
+
+
+def _is_encrypted(value):
+    """Determine if ``value`` is an encrypted string."""
+    return isinstance(value, str) and _ENCRYPTED.fullmatch(value) is not None
+
+
+def _passphrase(key, name="DJANGO_LOADER_KEY"):
+    """Return ``key``, or the passphrase configured by ``name``, as bytes.
+
+    The passphrase is read from the environment variable ``name``, or
+    from the file named by ``name`` with a ``_FILE`` suffix.
+    """
+    if key is None:
+        key = os.getenv(name)
+    if key is None and os.getenv(f"{name}_FILE"):
+        try:
+            with open(os.environ[f"{name}_FILE"], "rb") as f:
+                key = f.read().rstrip(b"\r\n")
+        except OSError as error:
+            raise ImproperlyConfigured(f"Secrets key file is unreadable:  {error}")
+    if not key:
+        raise ImproperlyConfigured(
+            f"Encrypted secrets require {name} or {name}_FILE to be set."
+        )
+
+    return key.encode("utf-8") if isinstance(key, str) else key
+
+
+def _new_key():
+    """Return the passphrase to rotate to."""
+    return _passphrase(None, "DJANGO_LOADER_NEW_KEY")
+
+
+def _cipher(passphrase, salt):
+    """Return the AES-GCM cipher for ``passphrase`` and ``salt``."""
+    try:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    except ImportError:
+        raise ImproperlyConfigured(
+            "Encrypted secrets require the cryptography package."
+        ) from None
+
+    return AESGCM(_derive(passphrase, salt))
+
+
+def _derive(passphrase, salt):
+    """Derive and memoize the cipher key for ``salt``."""
+    try:
+        return _KEYS[(passphrase, salt)]
+    except KeyError:
+        pass
+
+    with _KEYS_LOCK:
+        if (passphrase, salt) not in _KEYS:
+            _KEYS[(passphrase, salt)] = hashlib.scrypt(
+                passphrase,
+                salt=salt,
+                n=_SCRYPT_N,
+                r=_SCRYPT_R,
+                p=_SCRYPT_P,
+                maxmem=256 * _SCRYPT_N * _SCRYPT_R,
+                dklen=32,
+            )
+
+        return _KEYS[(passphrase, salt)]
+
+
+def _associated(salt):
+    """Return the data authenticated with an encrypted value."""
+    return _VERSION.encode("ascii") + salt
+
+
+def _encode(data):
+    """Encode ``data`` as unpadded URL safe base64."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _decode(text):
+    """Decode unpadded URL safe base64."""
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _encrypt_strings(value, encrypt, skipped, path=""):
+    """Apply ``encrypt`` to the string values in ``value``.
+
+    The flattened names of strings left unencrypted because they
+    interpolate other values, other than whole value references, are
+    appended to ``skipped``.
+    """
+    if isinstance(value, dict):
+        if len(value) == 1 and _REF_KEY in value:
+            return value
+        return {
+            k: (
+                v
+                if k == _INCLUDE_NAME
+                else _encrypt_strings(
+                    v, encrypt, skipped, f"{path}__{k}" if path else str(k)
+                )
+            )
+            for k, v in value.items()
+        }
+    elif isinstance(value, list):
+        return [
+            _encrypt_strings(v, encrypt, skipped, f"{path}__{i}")
+            for i, v in enumerate(value)
+        ]
+    elif isinstance(value, str):
+        if value.startswith(_REF_PREFIX):
+            return value
+        if "${" in value:
+            match = _REFERENCE.fullmatch(value)
+            if match is None or match.group(1):
+                skipped.append(path)
+            return value
+        return encrypt(value)
+
+    return value
+
+
+def _dotenv_value(value):
+    """Quote a string, or write another value as TOML, for dotenv."""
+    if isinstance(value, str):
+        return _quote_shell(value)
+    elif isinstance(value, dict):
+        return toml.TomlEncoder().dump_inline_table(value).strip()
+
+    return toml.TomlEncoder().dump_value(value)
+
+
+def _read_secrets(fn):
+    """Read a secrets file and determine the format to rewrite it in.
+
+    Returns the dump format, with any compression, or ``DOTENV``, and
+    the configuration, with dotenv variables left flat.
+    """
+    try:
+        with open(fn, "rb") as f:
+            codec = _compression(f.read(_HEAD_SIZE))
+        kind, content = _read_secrets_file(fn)
+    except OSError as error:
+        raise ImproperlyConfigured(f"Configuration file {fn} is unreadable:  {error}")
+    suffix = f"+{codec}" if codec else ""
+
+    if kind == _INDEXED:
+        return f"INDEXED{suffix}", _load_secrets_indexed(fn, data=content)
+    elif kind == _MSGPACK:
+        try:
+            return f"MSGPACK{suffix}", _unpack(content)
+        except ValueError:
+            pass
+    elif _is_dotenv(fn, content):
+        try:
+            return f"DOTENV{suffix}", _parse_dotenv(content)
+        except ValueError:
+            pass
+
+    parsers = (
+        ("TOML", toml.loads, toml.TomlDecodeError),
+        ("JSON", json.loads, json.JSONDecodeError),
+        ("YAML", YAML(typ="safe").load, YAMLError),
+        ("BespON", bespon.loads, bespon.erring.DecodingException),
+    )
+    for fmt, parse, error in parsers if kind == _TEXT else ():
+        try:
+            config = parse(content)
+        except error:
+            continue
+        if isinstance(config, dict):
+            return f"{fmt}{suffix}", config
+
+    raise ImproperlyConfigured(
+        f"Configuration file {fn} is not a recognized format for encryption."
+    )
@@ -0,0 +1,195 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Fingerprint configurations with Merkle hashes.
+
+Each value is hashed with SHA-256 over its type and a canonical
+encoding of its contents, and each dict and list over the hashes of
+its items, with dict items sorted by key.  The fingerprint of a
+configuration therefore does not depend on the order or format it was
+loaded in, and comparing two fingerprints only descends into the
+subtrees whose hashes differ.  References and encrypted values are
+hashed as written, without resolving them.
+"""
+
+import hashlib
+import struct
+from collections.abc import Mapping
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .refs import _parse_reference
+from .refs import _Reference
+
+# Length of a dict key.
+_LENGTH = struct.Struct("!Q")
+
+
+class SecretsFingerprint:
+    """The Merkle hashes of a configuration.
+
+    Fingerprints are equal if their configurations are, and are
+    hashable, so they may be used as cache keys.  Hashes stored in an
+    indexed snapshot are used as they are, and the subtrees of the
+    snapshot are only decoded as ``diff()`` needs them.
+    """
+
+    def __init__(self, secrets):
+        """Hash ``secrets``, a configuration dict, list, or snapshot."""
+        self._mapping = isinstance(secrets, Mapping)
+        self._source = secrets
+        self._items = None
+        self.digest = getattr(secrets, "_digest", None)
+
+        if self.digest is None:
+            self.digest = _combine(self._mapping, self._children())
+
+    def hexdigest(self):
+        """Return the hash of the configuration as hexadecimal."""
+        return self.digest.hex()
+
+    def __eq__(self, other):
+        """Compare hashes with another fingerprint."""
+        if not isinstance(other, SecretsFingerprint):
+            return NotImplemented
+
+        return self.digest == other.digest
+
+    def __hash__(self):
+        """Hash the fingerprint by its hash."""
+        return hash(self.digest)
+
+    def __repr__(self):
+        """Represent the fingerprint by its hash."""
+        return f"SecretsFingerprint({self.hexdigest()!r})"
+
+    def diff(self, other):
+        """Find the paths that differ from another fingerprint.
+
+        Parameters
+        ----------
+        other : SecretsFingerprint
+            The fingerprint to compare.
+
+        Returns
+        -------
+        set
+            The flattened names, such as ``DB__default__HOST``, of the
+            values added, removed, or changed.  Changes within dicts
+            and lists are reported at the innermost changed name.
+        """
+        changed = set()
+        stack = [("", self, other)]
+
+        while stack:
+            prefix, mine, theirs = stack.pop()
+            if mine.digest == theirs.digest:
+                continue
+
+            a, b = mine._children(), theirs._children()
+            for key in a.keys() | b.keys():
+                path = f"{prefix}__{key}" if prefix else key
+                x, y = a.get(key), b.get(key)
+                if (
+                    isinstance(x, SecretsFingerprint)
+                    and isinstance(y, SecretsFingerprint)
+                    and x._mapping == y._mapping
+                ):
+                    stack.append((path, x, y))
+                elif x is None or y is None or _node_digest(x) != _node_digest(y):
+                    changed.add(path)
+
+        return changed
+
+    def _children(self):
+        """Return the fingerprint or hash of each item, by name."""
+        if self._items is None:
+            items = self._source.items() if self._mapping else enumerate(self._source)
+            self._items = {str(k): _node(v) for k, v in items}
+            # Only the hashes are needed once the items are hashed.
+            self._source = None
+
+        return self._items
+
+
+def _node(value):
+    """Fingerprint a dict or list, or hash another value."""
+    if isinstance(value, (Mapping, list, tuple)) and _reference(value) is None:
+        return SecretsFingerprint(value)
+
+    return _value_digest(value)
+
+
+def _node_digest(node):
+    """Return the hash of a node from ``_node()``."""
+    return node.digest if isinstance(node, SecretsFingerprint) else node
+
+
+def _combine(mapping, items):
+    """Combine the hashes of the items of a dict or list."""
+    if mapping:
+        return _table_digest({k: _node_digest(n) for k, n in items.items()})
+
+    return _hash(b"l", b"".join(_node_digest(n) for n in items.values()))
+
+
+def _table_digest(digests):
+    """Hash a dict from the hashes of its values, by key."""
+    keys = sorted((k.encode("utf-8"), d) for k, d in digests.items())
+
+    return _hash(b"d", b"".join(_LENGTH.pack(len(k)) + k + d for k, d in keys))
+
+
+def _value_digest(value):
+    """Return the Merkle hash of ``value``.
+
+    Values of types without a canonical encoding are hashed as their
+    strings, as they are dumped.
+    """
+    reference = _reference(value)
+    if reference is not None:
+        return _hash(b"r", reference)
+    elif isinstance(value, (Mapping, list, tuple)):
+        return SecretsFingerprint(value).digest
+    elif value is None:
+        return _hash(b"n", b"")
+    elif isinstance(value, bool):
+        return _hash(b"b", b"1" if value else b"0")
+    elif isinstance(value, int):
+        return _hash(b"i", str(value).encode("ascii"))
+    elif isinstance(value, float):
+        return _hash(b"f", value.hex().encode("ascii"))
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        return _hash(b"y", bytes(value))
+
+    return _hash(b"s", str(value).encode("utf-8"))
+
+
+def _reference(value):
+    """Return the scheme and target of a reference as bytes, or ``None``."""
+    if isinstance(value, _Reference):
+        scheme, target = value._args
+    elif isinstance(value, (str, dict)):
+        try:
+            reference = _parse_reference(value)
+        except ImproperlyConfigured:
+            return None
+        if reference is None:
+            return None
+        scheme, target = reference
+    else:
+        return None
+
+    return f"{scheme}:{target}".encode("utf-8")
+
+
+def _hash(tag, data):
+    """Hash ``data`` tagged with its type."""
+    return hashlib.sha256(tag + data).digest()
@@ -0,0 +1,219 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Load secrets from generated Python modules.
+
+Render a secrets file into a Python module holding its configuration
+as a literal, and compile the module, so that processes can import
+the bytecode instead of parsing the file.  The module records a hash
+of each file it was generated from, and is only used while they are
+unchanged.
+"""
+
+import hashlib
+import importlib.util
+import math
+import os
+import py_compile
+import warnings
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .loader import _load_secrets_graph
+from .loader import _stamp
+from .loader import _write_output
+
+_MODULE = '''\
+"""Secrets generated by dsloader; do not edit."""
+
+SOURCE = {source!r}
+PREFIX = {prefix!r}
+PROFILE = {profile!r}
+SOURCE_FILES = {sources!r}
+SECRETS = {secrets!r}
+'''
+
+# Names defined by generated modules.
+_ATTRIBUTES = ("SOURCE", "PREFIX", "PROFILE", "SOURCE_FILES", "SECRETS")
+
+# Name under which generated modules are executed.
+_MODULE_NAME = "djangosecretsloader._generated"
+
+# Generated modules, by filename, with their stamps.
+_MODULES = {}
+
+# File hashes, by filename, with their stamps.
+_HASHES = {}
+
+# Bytes read at a time while hashing.
+_CHUNK = 1 << 20
+
+
+def compile_secrets(module, fn=".env", prefix="DJANGO_ENV_", profile=None):
+    """Generate and compile a Python module from a secrets file.
+
+    The module holds the configuration of ``fn`` and the files it
+    includes, before environment variables, backends, and
+    interpolation are applied, and a SHA-256 hash of each file.  The
+    module and its bytecode are readable only by their owner.
+
+    Parameters
+    ----------
+    module : str
+        Filename of the module to write.
+    fn : str, optional
+        Secrets file to render.
+    prefix : str, optional
+        Prefix stripped from variable names in dotenv files.
+    profile : str, optional
+        Profile of the file to render, defaults to
+        ``DJANGO_LOADER_PROFILE``.
+
+    Returns
+    -------
+    str
+        The filename of the compiled bytecode.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if ``fn`` cannot
+        be loaded, is a directory, or changes while it is rendered.
+    """
+    if profile is None:
+        profile = os.getenv("DJANGO_LOADER_PROFILE") or None
+
+    source = os.path.abspath(fn)
+    if os.path.isdir(source):
+        raise ImproperlyConfigured(f"Secrets directory {fn} cannot be compiled.")
+
+    stamps = {}
+    secrets = _load_secrets_graph(source, prefix, stamps, {}, True, profile)
+    sources = {path: _hash_file(path) for path in stamps}
+    if any(_stamp(path) != stamp for path, stamp in stamps.items()):
+        raise ImproperlyConfigured(f"Secrets file {fn} changed while compiling.")
+
+    text = _MODULE.format(
+        source=source,
+        prefix=prefix,
+        profile=profile,
+        sources=sources,
+        secrets=_literal(secrets),
+    )
+    _write_output(module, text.encode("utf-8"))
+    compiled = py_compile.compile(module, doraise=True)
+    os.chmod(compiled, 0o600)
+
+    return compiled
+
+
+def _load_secrets_module(module, fn, prefix="DJANGO_ENV_", profile=None):
+    """Load the configuration of ``fn`` from a generated module.
+
+    Parameters
+    ----------
+    module : str
+        Filename of the generated module.
+    fn : str
+        Secrets file the configuration is needed from.
+    prefix : str, optional
+        Prefix stripped from variable names in dotenv files.
+    profile : str, optional
+        Profile of the file.
+
+    Returns
+    -------
+    dict or None
+        The configuration, shared with the module, or ``None`` with a
+        warning if the module is missing, was generated from other
+        options, or any of its files have changed.
+    """
+    generated = _import(module)
+    if generated is None:
+        warnings.warn(f"Generated secrets module {module} is not valid; loading {fn}.")
+        return None
+
+    if (generated.SOURCE, generated.PREFIX, generated.PROFILE) != (
+        os.path.abspath(fn),
+        prefix,
+        profile,
+    ) or any(_hash_file(p) != h for p, h in generated.SOURCE_FILES.items()):
+        warnings.warn(
+            f"Generated secrets module {module} is out of date; loading {fn}."
+        )
+        return None
+
+    return generated.SECRETS
+
+
+def _import(module):
+    """Execute the generated ``module``, reusing it while unchanged."""
+    path = os.path.abspath(module)
+    stamp = _stamp(path)
+    cached = _MODULES.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    try:
+        spec = importlib.util.spec_from_file_location(_MODULE_NAME, path)
+        generated = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(generated)
+    except (OSError, SyntaxError, ImportError):
+        return None
+    if not all(hasattr(generated, name) for name in _ATTRIBUTES):
+        return None
+
+    _MODULES[path] = (stamp, generated)
+
+    return generated
+
+
+def _hash_file(path):
+    """Return the SHA-256 hash of ``path``, or ``None`` if unreadable."""
+    stamp = _stamp(path)
+    cached = _HASHES.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    digest = digest.hexdigest()
+
+    _HASHES[path] = (stamp, digest)
+
+    return digest
+
+
+def _literal(value):
+    """Convert ``value`` into values with Python literal reprs.
+
+    Values of other types, and infinite and undefined floats, are
+    converted to strings.
+    """
+    if isinstance(value, dict):
+        return {
+            k if isinstance(k, (str, int)) else str(k): _literal(v)
+            for k, v in value.items()
+        }
+    elif isinstance(value, (list, tuple)):
+        return [_literal(v) for v in value]
+    elif isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    elif isinstance(value, float):
+        return value if math.isfinite(value) else str(value)
+    elif value is None or isinstance(value, (str, bytes, int)):
+        return value
+
+    return str(value)
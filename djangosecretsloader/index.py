@@ -0,0 +1,168 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Look up loaded secrets by flattened path.
+
+Index the configuration returned by ``load_secrets()`` by the same
+``__`` separated names used for environment variables, so that
+values may be looked up without walking nested dicts and lists.
+"""
+
+import bisect
+from collections.abc import Mapping
+
+from .loader import _walk_secrets
+from .refs import _Reference
+
+# Marker for paths missing from one of the compared configurations.
+_ABSENT = object()
+
+
+class SecretsIndex:
+    """A flattened path index over a configuration.
+
+    Every value, including each list and dict, is indexed by its
+    flattened name, such as ``DB__default__HOST``, so that lookups and
+    existence checks are a single dict lookup.  Scalar values may be
+    iterated by name prefix in sorted order.  ``update()`` replaces
+    the configuration, reindexing only the paths that changed.
+    """
+
+    def __init__(self, secrets):
+        """Index ``secrets``."""
+        self.secrets = secrets
+        self._paths = dict(_walk_secrets(secrets))
+        self._sorted = None
+
+    def get(self, path, default=None):
+        """Return the value at ``path``, or ``default`` if missing."""
+        return self._paths.get(path, default)
+
+    def __getitem__(self, path):
+        """Return the value at ``path``."""
+        return self._paths[path]
+
+    def __contains__(self, path):
+        """Determine if ``path`` exists."""
+        return path in self._paths
+
+    def __len__(self):
+        """Return the number of indexed paths."""
+        return len(self._paths)
+
+    def items(self, prefix=None):
+        """Iterate over scalar values in sorted path order.
+
+        Parameters
+        ----------
+        prefix : str, optional
+            Only iterate over ``prefix`` and the paths nested under
+            it.
+
+        Yields
+        ------
+        tuple
+            The flattened path and the value.
+        """
+        if self._sorted is None:
+            self._sorted = sorted(
+                k for k, v in self._paths.items() if not isinstance(v, (list, Mapping))
+            )
+
+        if prefix is None:
+            paths = self._sorted
+        else:
+            nested = f"{prefix}__"
+            start = bisect.bisect_left(self._sorted, nested)
+            paths = [prefix] if prefix in self._paths else []
+            for path in self._sorted[start:]:
+                if not path.startswith(nested):
+                    break
+                paths.append(path)
+
+        for path in paths:
+            value = self._paths[path]
+            if not isinstance(value, (list, Mapping)):
+                yield path, value
+
+    def update(self, secrets):
+        """Replace the indexed configuration.
+
+        Only the paths under values that differ from the current
+        configuration are reindexed.  Lazy references are compared by
+        reference, without resolving them.
+
+        Parameters
+        ----------
+        secrets : dict
+            The new configuration.
+
+        Returns
+        -------
+        set
+            The paths whose values were added, changed, or removed.
+        """
+        changed = set()
+        self._update(None, self.secrets, secrets, changed)
+        self.secrets = secrets
+        if changed:
+            self._sorted = None
+
+        return changed
+
+    def _update(self, path, old, new, changed):
+        """Reindex the paths under ``path`` that changed."""
+        if isinstance(old, Mapping) and isinstance(new, Mapping):
+            old_items, new_items = old, new
+        elif isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+            old_items, new_items = dict(enumerate(old)), dict(enumerate(new))
+        else:
+            if isinstance(old, (list, Mapping)) or not _same(old, new):
+                self._replace(path, old, new, changed)
+            return
+
+        if path is not None:
+            self._paths[path] = new
+
+        for k, v in new_items.items():
+            name = k if path is None else f"{path}__{k}"
+            if k in old_items:
+                self._update(name, old_items[k], v, changed)
+            else:
+                self._replace(name, _ABSENT, v, changed)
+
+        for k, v in old_items.items():
+            if k not in new_items:
+                name = k if path is None else f"{path}__{k}"
+                self._replace(name, v, _ABSENT, changed)
+
+    def _replace(self, path, old, new, changed):
+        """Replace the paths under ``path`` in ``old`` with ``new``."""
+        if old is not _ABSENT:
+            for k, _ in _walk_secrets({path: old}):
+                del self._paths[k]
+                changed.add(k)
+
+        if new is not _ABSENT:
+            for k, v in _walk_secrets({path: new}):
+                self._paths[k] = v
+                changed.add(k)
+
+
+def _same(old, new):
+    """Compare scalar values without resolving lazy references."""
+    if isinstance(old, _Reference) or isinstance(new, _Reference):
+        return (
+            isinstance(old, _Reference)
+            and isinstance(new, _Reference)
+            and old._args == new._args
+        )
+
+    return type(old) is type(new) and old == new
@@ -0,0 +1,239 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Load secrets from indexed binary snapshots.
+
+An indexed snapshot starts with a table of the top level keys and the
+offset, length, and type of each value, so that a memory mapped
+snapshot can be opened without reading the values and each value
+decoded only when it is accessed.  Dict values are stored as nested
+tables, strings as UTF-8, binary values as raw bytes, and other
+values as JSON.
+
+The snapshot is a magic number and format version, followed by the
+top level table.  Each table is a key count, the Merkle hash of the
+table, and an index of (key length, key, type, value offset, value
+length) entries, followed by the values.  Offsets are from the start
+of the snapshot.  The stored hashes let a snapshot be fingerprinted,
+and compared with another, without decoding unchanged tables.
+"""
+
+import json
+import mmap
+import struct
+from collections.abc import Mapping
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .fingerprint import _table_digest
+from .fingerprint import _value_digest
+from .refs import _REF_KEY
+from .refs import _defer_references
+
+_HEADER = struct.Struct("!4sH")
+_HEADER_MAGIC = b"DSLI"
+_HEADER_VERSION = 2
+_TABLE_HEAD = struct.Struct("!I32s")
+_ENTRY = struct.Struct("!H")
+_SPAN = struct.Struct("!cQQ")
+
+# Value types.
+_TABLE = b"t"
+_STRING = b"s"
+_BINARY = b"b"
+_JSON = b"j"
+
+
+def open_secrets(fn):
+    """Open an indexed snapshot.
+
+    Parameters
+    ----------
+    fn : str
+        Filename of a snapshot dumped in the ``INDEXED`` format.
+
+    Returns
+    -------
+    IndexedSecrets
+        A read only mapping of the configuration in the snapshot.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if the file is
+        not a valid snapshot.
+    """
+    with open(fn, "rb") as f:
+        try:
+            buffer = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        except ValueError:
+            raise ImproperlyConfigured(f"Secrets snapshot {fn} is not valid.")
+
+    return _open_buffer(buffer, fn)
+
+
+def _open_buffer(buffer, fn):
+    """Open the snapshot in ``buffer``, read from the file ``fn``."""
+    try:
+        if _HEADER.unpack_from(buffer, 0) == (_HEADER_MAGIC, _HEADER_VERSION):
+            return IndexedSecrets(buffer, _HEADER.size)
+    except (struct.error, UnicodeDecodeError):
+        pass
+
+    raise ImproperlyConfigured(f"Secrets snapshot {fn} is not valid.")
+
+
+class IndexedSecrets(Mapping):
+    """A read only mapping of secrets in an indexed snapshot.
+
+    Values are decoded from the mapped snapshot on first access and
+    memoized.  Dicts are returned as nested ``IndexedSecrets`` and
+    binary values as ``memoryview`` slices of the snapshot, without
+    copying.
+    """
+
+    def __init__(self, buffer, offset):
+        """Index the table at ``offset`` in ``buffer``."""
+        self._buffer = buffer
+        self._values = {}
+        self._index = {}
+
+        count, self._digest = _TABLE_HEAD.unpack_from(buffer, offset)
+        offset += _TABLE_HEAD.size
+        for _ in range(count):
+            (length,) = _ENTRY.unpack_from(buffer, offset)
+            offset += _ENTRY.size
+            key = str(buffer[offset : offset + length], "utf-8")
+            offset += length
+            self._index[key] = _SPAN.unpack_from(buffer, offset)
+            offset += _SPAN.size
+
+    def __getitem__(self, key):
+        """Decode and memoize the value of ``key``."""
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+
+        value = _defer_references(self._decode(key))
+        self._values[key] = value
+
+        return value
+
+    def __iter__(self):
+        """Iterate over the keys without decoding values."""
+        return iter(self._index)
+
+    def __len__(self):
+        """Count the keys."""
+        return len(self._index)
+
+    def __contains__(self, key):
+        """Check for ``key`` without decoding its value."""
+        return key in self._index
+
+    def _decode(self, key):
+        """Decode the value of ``key``, leaving references unresolved."""
+        kind, offset, length = self._index[key]
+        view = self._buffer[offset : offset + length]
+
+        if kind == _TABLE:
+            return IndexedSecrets(self._buffer, offset)
+        elif kind == _BINARY:
+            return view
+        elif kind == _STRING:
+            return str(view, "utf-8")
+
+        return json.loads(bytes(view))
+
+    def _to_dict(self, keys=None):
+        """Decode ``keys``, or all keys, into a dict.
+
+        Nested tables are decoded into dicts, and references are left
+        unresolved.
+        """
+        secrets = {}
+        for key in self._index if keys is None else keys:
+            if key in self._index:
+                value = self._decode(key)
+                if isinstance(value, IndexedSecrets):
+                    value = value._to_dict()
+                secrets[key] = value
+
+        return secrets
+
+
+def _is_indexed(head):
+    """Determine if ``head``, the start of a file, is a snapshot."""
+    return head.startswith(_HEADER_MAGIC)
+
+
+def _dump_indexed(config):
+    """Dump configuration as an indexed snapshot.
+
+    Parameters
+    ----------
+    config : dict
+        The configuration dict.  ``bytes`` values are stored as
+        binary values.
+
+    Returns
+    -------
+    bytes
+        The snapshot.
+    """
+    parts = [_HEADER.pack(_HEADER_MAGIC, _HEADER_VERSION)]
+    _pack_table(config, _HEADER.size, parts)
+
+    return b"".join(parts)
+
+
+def _pack_table(table, offset, parts):
+    """Append ``table``, starting at ``offset``, to ``parts``.
+
+    Returns the offset of the end of the table and its Merkle hash.
+    """
+    keys = [str(k).encode("utf-8") for k in table]
+    offset += _TABLE_HEAD.size + sum(_ENTRY.size + len(k) + _SPAN.size for k in keys)
+    index = []
+    values = []
+    digests = {}
+
+    for key, value in zip(keys, table.values()):
+        start = offset
+        if isinstance(value, dict) and not (len(value) == 1 and _REF_KEY in value):
+            kind = _TABLE
+            offset, digest = _pack_table(value, offset, values)
+        else:
+            kind, data = _encode(value)
+            values.append(data)
+            offset += len(data)
+            digest = _value_digest(value)
+        digests[str(key, "utf-8")] = digest
+        index.extend(
+            (_ENTRY.pack(len(key)), key, _SPAN.pack(kind, start, offset - start))
+        )
+
+    digest = _table_digest(digests)
+    parts.append(_TABLE_HEAD.pack(len(keys), digest))
+    parts.extend(index)
+    parts.extend(values)
+
+    return offset, digest
+
+
+def _encode(value):
+    """Encode a value that is not a table."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return _BINARY, bytes(value)
+    elif isinstance(value, str):
+        return _STRING, value.encode("utf-8")
+
+    return _JSON, json.dumps(value, separators=(",", ":"), default=str).encode()
@@ -0,0 +1,248 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Interpolate configuration values into other values.
+
+A string containing ``${NAME}``, where ``NAME`` is a flattened
+configuration name such as ``DB__HOST``, has the value of ``NAME``
+substituted.  A string that is only a reference takes the value with
+its type, so that ``${DB}`` may copy a whole dict, and a reference to
+a secret reference or encrypted value stays lazy.  Secrets
+substituted into a larger string are resolved, since the string
+cannot be.  ``$${`` is a literal ``${``.
+
+Values are resolved depth first from the references they contain, and
+each is resolved once, so the cost is linear in the size of the
+configuration and the number of references.
+"""
+
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .refs import _parse_reference
+from .refs import resolve_reference
+
+# A reference, possibly escaped by a second dollar sign.
+_REFERENCE = re.compile(r"\$(\$?)\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+# The dollar sign of a reference or an escaped reference.
+_UNESCAPED = re.compile(r"\$(?=\{[A-Za-z_][A-Za-z0-9_]*\})")
+
+
+def _interpolate(config):
+    """Interpolate the references in ``config``.
+
+    Parameters
+    ----------
+    config : dict
+        The merged configuration.
+
+    Returns
+    -------
+    dict
+        ``config``, or a copy with its references substituted if it
+        has any.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if a reference
+        is undefined, cyclic, or substitutes a dict or list into a
+        string, or if a secret substituted into a string cannot be
+        resolved.
+    """
+    if not _has_references(config):
+        return config
+
+    return _Resolver(config).resolve(())
+
+
+def _referenced_names(value):
+    """Return the top level names referenced in ``value``.
+
+    Parameters
+    ----------
+    value : object
+        A configuration value, possibly a dict or list of values.
+
+    Returns
+    -------
+    set
+        The first component of each name referenced by ``value``.
+    """
+    names = set()
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, str):
+            if "${" in value:
+                names.update(
+                    m.group(2).split("__", 1)[0]
+                    for m in _REFERENCE.finditer(value)
+                    if not m.group(1)
+                )
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+
+    return names
+
+
+def _escape_references(value):
+    """Escape the references in the strings of ``value``.
+
+    Interpolated configurations are escaped before they are dumped, so
+    that a literal ``${NAME}`` is not interpolated when it is loaded
+    again.
+
+    Parameters
+    ----------
+    value : object
+        A configuration value, possibly a dict or list of values.
+
+    Returns
+    -------
+    object
+        ``value``, or a copy with each ``${`` of a reference escaped as
+        ``$${`` if it has any.
+    """
+    if not _has_references(value):
+        return value
+    elif isinstance(value, dict):
+        return {k: _escape_references(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [_escape_references(v) for v in value]
+
+    return _UNESCAPED.sub("$$", value)
+
+
+def _has_references(value):
+    """Determine if ``value`` contains any references."""
+    if isinstance(value, str):
+        return "${" in value
+    elif isinstance(value, dict):
+        return any(_has_references(v) for v in value.values())
+    elif isinstance(value, list):
+        return any(_has_references(v) for v in value)
+
+    return False
+
+
+def _expandable(value):
+    """Determine if ``value`` is a container or has a reference."""
+    return isinstance(value, (dict, list)) or (isinstance(value, str) and "${" in value)
+
+
+class _Resolver:
+    """Resolve and memoize the values of a configuration by path.
+
+    Each value is expanded by a generator that yields the paths it
+    needs and is sent their resolved values.  The generators are run
+    from an explicit stack, so long chains of references do not
+    exhaust the interpreter stack.
+    """
+
+    def __init__(self, config):
+        """Prepare to resolve ``config``."""
+        self.config = config
+        self.resolved = {}
+        self.active = {}
+
+    def resolve(self, path):
+        """Return the resolved value at ``path``, a tuple of keys."""
+        if path in self.resolved:
+            return self.resolved[path]
+
+        stack = [self._start(path)]
+        value = None
+        while stack:
+            current, expansion = stack[-1]
+            try:
+                needed = expansion.send(value)
+            except StopIteration as stop:
+                stack.pop()
+                del self.active[current]
+                self.resolved[current] = value = stop.value
+                continue
+
+            if needed in self.resolved:
+                value = self.resolved[needed]
+            else:
+                stack.append(self._start(needed))
+                value = None
+
+        return self.resolved[path]
+
+    def _start(self, path):
+        """Begin expanding the value at ``path``."""
+        if path in self.active:
+            cycle = list(self.active)[list(self.active).index(path) :] + [path]
+            raise ImproperlyConfigured(
+                "Interpolation cycle:  " + " -> ".join("__".join(p) for p in cycle)
+            )
+
+        self.active[path] = None
+
+        return path, self._expand(path, self._lookup(path))
+
+    def _lookup(self, path):
+        """Return the unresolved value at ``path``."""
+        value = self.config
+        try:
+            for key in path:
+                value = value[int(key)] if isinstance(value, list) else value[key]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise ImproperlyConfigured(f"${{{'__'.join(path)}}} is not defined.")
+
+        return value
+
+    def _expand(self, path, value):
+        """Yield the paths ``value`` needs and return it resolved."""
+        if isinstance(value, dict):
+            result = {}
+            for k, v in value.items():
+                result[k] = (yield path + (k,)) if _expandable(v) else v
+            return result
+        elif isinstance(value, list):
+            result = []
+            for i, v in enumerate(value):
+                result.append((yield path + (str(i),)) if _expandable(v) else v)
+            return result
+        elif not isinstance(value, str) or "${" not in value:
+            return value
+
+        match = _REFERENCE.fullmatch(value)
+        if match and not match.group(1):
+            # Keep the type of a whole value reference.
+            return (yield tuple(match.group(2).split("__")))
+
+        pieces = []
+        end = 0
+        for match in _REFERENCE.finditer(value):
+            pieces.append(value[end : match.start()])
+            end = match.end()
+            if match.group(1):
+                pieces.append("${" + match.group(2) + "}")
+                continue
+
+            resolved = yield tuple(match.group(2).split("__"))
+            reference = _parse_reference(resolved)
+            if reference is not None:
+                resolved = resolve_reference(*reference)
+            elif isinstance(resolved, (dict, list)):
+                raise ImproperlyConfigured(
+                    f"${{{match.group(2)}}} in {'__'.join(path)} is not a scalar."
+                )
+            pieces.append(str(resolved))
+        pieces.append(value[end:])
+
+        return "".join(pieces)
@@ -14,19 +14,149 @@ Load Django settings from defaults, files, or the environment, in that
 order.
 """
 
+import base64
+import binascii
+import collections
+import io
 import json
 import os
+import re
+import stat
 import sys
+import tempfile
 import warnings
+import zlib
+from collections.abc import Mapping
 from pathlib import Path
 
 import bespon
 import toml
 from django.core.exceptions import ImproperlyConfigured
+from django.utils.functional import Promise
 from ruamel.yaml import YAML
 from ruamel.yaml.error import YAMLError
 
+from .compressed import _HEAD_SIZE
+from .compressed import _compress
+from .compressed import _compression
+from .compressed import _decompress
 from .config import _create_argument_parser
+from .indexed import _dump_indexed
+from .indexed import _is_indexed
+from .indexed import _open_buffer
+from .indexed import open_secrets
+from .interpolation import _escape_references
+from .interpolation import _has_references
+from .interpolation import _interpolate
+from .interpolation import _referenced_names
+from .packed import _is_msgpack
+from .packed import _pack
+from .packed import _unpack
+from .refs import _defer_references
+from .refs import _restore_references
+from .shared import attach_secrets
+from .shared import publish_secrets
+
+# File suffixes that are never treated as dotenv files.
+_STRUCTURED_SUFFIXES = (".toml", ".json", ".yaml", ".yml", ".bespon")
+
+# The first significant line of a dotenv file:  optional blank or
+# comment lines, then ``[export ]NAME=`` with no space before ``=``.
+_DOTENV_SIGNATURE = re.compile(
+    r"\A(?:[ \t]*(?:#[^\n]*)?\r?\n)*[ \t]*(?:export[ \t]+)?[A-Za-z_][A-Za-z0-9_.]*="
+)
+# The start of an unquoted dotenv value that may be a typed TOML
+# value, and TOML integers, which are converted without TOML.
+_DOTENV_TYPED = re.compile(r"[\[{0-9+-]|(?:true|false|inf|nan)(?![A-Za-z0-9_])")
+_TOML_INTEGER = re.compile(r"[+-]?(?:0|[1-9](?:_?[0-9])*)")
+_DOTENV_BLANK = re.compile(r"[ \t]*(?:#[^\n]*)?(?:\r?\n|\Z)")
+_DOTENV_KEY = re.compile(r"[ \t]*(?:export[ \t]+)?([A-Za-z_][A-Za-z0-9_.]*)=[ \t]*")
+_DOTENV_VALUE = re.compile(
+    r"""
+    (?P<eol>\r?\n|\Z)
+    | (?P<space>[ \t\r]+)
+    | '(?P<single>[^']*)'
+    | "(?P<double>(?:[^"\\]|\\.)*)"
+    | \\(?P<escaped>.)
+    | (?P<bare>[^\s'"\\]+)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_DOTENV_ESCAPE = re.compile(r"\\(.)", re.DOTALL)
+# Suffix marking flattened variables holding JSON-encoded values, and
+# the minimum encoded size of subtrees dumped as JSON in ``ENVJSON``.
+_JSON_SUFFIX = "__JSON"
+_ENV_JSON_THRESHOLD = 128
+
+# Name, after the prefix, of the variable holding the whole
+# configuration as a compressed blob, and the blob format tag.
+_BLOB_NAME = "_BLOB"
+_BLOB_TAG = "z1:"
+
+# Variables passing a loaded snapshot to ``--exec`` children, either
+# as a blob or as an inherited file descriptor.
+_SNAPSHOT_VAR = "DJANGO_LOADER_SNAPSHOT"
+_SNAPSHOT_FD_VAR = "DJANGO_LOADER_SNAPSHOT_FD"
+
+# Default of values queried from the command line.
+_UNDEFINED = object()
+
+# Filename scheme for secrets servers.
+_UNIX_SCHEME = "unix:"
+
+# Link to the current version of a Kubernetes secret volume.
+_DIRECTORY_DATA = "..data"
+
+# Read this many files or more in parallel, with this many threads.
+_PARALLEL_READS = 16
+_READ_WORKERS = 8
+
+# Parsed files by absolute path, prefix, and profile, with the stat
+# stamp of the parse.
+_PARSE_CACHE = {}
+
+# Kinds of secrets files, as read by ``_read_secrets_file()``.
+_TEXT = "text"
+_INDEXED = "indexed"
+_MSGPACK = "msgpack"
+
+# Decoder for partial JSON parses, delimiters of JSON containers, and
+# the next container delimiter outside of strings.
+_JSON_DECODER = json.JSONDecoder()
+_JSON_DELIMITERS = {"{": ("{", "}"), "[": ("[", "]")}
+_JSON_TOKEN = re.compile(r'(?:[^"\[\]{}]|"[^"\\]*(?:\\.[^"\\]*)*")*([\[\]{}])')
+
+# Section of a profiled file merged under every profile.
+_PROFILE_BASE = "base"
+
+# A TOML table header, and its top level name.
+_TOML_TABLE = re.compile(
+    r"^[ \t]*\[\[?[ \t]*([A-Za-z0-9_-]+|\"[^\"\n]*\"|'[^'\n]*')"
+    r"[ \t]*(?:\.[^\]\n]*)?\]\]?[ \t]*(?:#[^\n]*)?$",
+    re.MULTILINE,
+)
+
+# A YAML document separator, an unindented line of a document, and a
+# plain top level key.
+_YAML_DOCUMENT = re.compile(r"^---[ \t]*(?:#[^\n]*)?$", re.MULTILINE)
+_YAML_TOP = re.compile(r"^[^\s#].*$", re.MULTILINE)
+_YAML_KEY = re.compile(r"([A-Za-z0-9_-]+)[ \t]*:(?:\s|$)")
+
+# Name of the files included by a file.
+_INCLUDE_NAME = "_INCLUDE"
+
+# Merged include graphs by absolute path, prefix, and profile, with
+# the stat stamps of every file in the graph.
+_INCLUDE_CACHE = {}
+
+_DOTENV_ESCAPES = {
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    '"': '"',
+    "\\": "\\",
+    "$": "$",
+}
 
 
 def main(argv=None):
@@ -52,21 +182,234 @@ def main(argv=None):
         except ImproperlyConfigured as error:
             print(error)
             sys.exit(1)
-    # Load and dump secrets.
-    else:
+    # Print some values without dumping the secrets.
+    elif args.get or args.many:
+        try:
+            values = _query_secrets(
+                [args.get] if args.get else args.many,
+                fn=args.file,
+                prefix=args.prefix,
+                profile=args.profile,
+                defaults=_process_defaults(args.defaults),
+            )
+        except KeyError as error:
+            print(f"{error.args[0]} is not defined.", file=sys.stderr)
+            sys.exit(1)
+
+        if args.get:
+            print(_format_value(values[args.get]))
+        else:
+            print(json.dumps(values, indent=2, default=str))
+        sys.exit(0)
+    # Print the fingerprint of the secrets.
+    elif args.fingerprint:
+        from .fingerprint import SecretsFingerprint
+
         print(
-            dump_secrets(
-                fmt=args.dump,
-                **load_secrets(
+            SecretsFingerprint(
+                load_secrets(
                     fn=args.file,
                     prefix=args.prefix,
+                    profile=args.profile,
+                    **_process_defaults(args.defaults),
+                )
+            ).hexdigest()
+        )
+        sys.exit(0)
+    # Load secrets once and execute a command with them.
+    elif args.exec:
+        # Ignore any snapshot inherited by this process.
+        os.environ.pop(_SNAPSHOT_VAR, None)
+        os.environ.pop(_SNAPSHOT_FD_VAR, None)
+        fn, profile = _resolve_source(args.file, args.profile)
+        _exec_secrets(
+            args.exec,
+            load_secrets(
+                fn=fn,
+                prefix=args.prefix,
+                profile=profile,
+                **_process_defaults(args.defaults),
+            ),
+            prefix=args.prefix,
+            mode=args.exec_mode,
+            fn=fn,
+            profile=profile,
+        )
+    # Load secrets and publish them to shared memory.
+    elif args.publish:
+        os.environ.pop("DJANGO_LOADER_SHM", None)
+        fn, profile = _resolve_source(args.file, args.profile)
+        print(
+            publish_secrets(
+                load_secrets(
+                    fn=fn,
+                    prefix=args.prefix,
+                    profile=profile,
                     **_process_defaults(args.defaults),
                 ),
+                args.publish,
+                args.prefix,
+                fn=_source_path(fn),
+                profile=profile,
+            )
+        )
+        sys.exit(0)
+    # Render the secrets file into a compiled Python module.
+    elif args.compile:
+        from .generated import compile_secrets
+
+        print(
+            compile_secrets(
+                args.compile, fn=args.file, prefix=args.prefix, profile=args.profile
+            )
+        )
+        sys.exit(0)
+    # Encrypt the secrets file, or rotate its key, in place.
+    elif args.encrypt or args.rotate:
+        from .encryption import _new_key
+        from .encryption import encrypt_secrets
+
+        try:
+            count = encrypt_secrets(
+                args.file, new_key=_new_key() if args.rotate else None
             )
+        except ImproperlyConfigured as error:
+            print(error, file=sys.stderr)
+            sys.exit(1)
+        print(f"Encrypted {count} values in {args.file}.")
+        sys.exit(0)
+    # Serve secrets over a Unix domain socket.
+    elif args.serve:
+        from .daemon import serve_secrets
+
+        serve_secrets(
+            args.serve,
+            fn=args.file,
+            prefix=args.prefix,
+            defaults=_process_defaults(args.defaults),
+        )
+    # Load and dump secrets, escaping literal references so that the
+    # dump loads as it was loaded.
+    else:
+        dumped = dump_secrets(
+            fmt=f"{args.dump}+{args.compress}" if args.compress else args.dump,
+            **_escape_references(
+                load_secrets(
+                    fn=args.file,
+                    prefix=args.prefix,
+                    profile=args.profile,
+                    **_process_defaults(args.defaults),
+                )
+            ),
         )
+        if args.output:
+            _write_output(args.output, dumped)
+        elif isinstance(dumped, bytes):
+            sys.stdout.buffer.write(dumped)
+        else:
+            print(dumped)
         sys.exit(0)
 
 
+def _write_output(fn, dumped):
+    """Write a dumped configuration to ``fn``.
+
+    The configuration is written to a temporary file, readable only by
+    its owner, which then replaces ``fn``, so that processes which
+    have mapped an earlier snapshot are unaffected.
+
+    Parameters
+    ----------
+    fn : str
+        Filename to write.
+    dumped : str or bytes
+        The dumped configuration.  Strings are written with a trailing
+        newline.
+    """
+    if isinstance(dumped, str):
+        dumped = f"{dumped}\n".encode("utf-8")
+
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(fn)))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(dumped)
+        os.replace(temporary, fn)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def _query_secrets(paths, fn=None, prefix="DJANGO_ENV_", profile=None, defaults=None):
+    """Load only the values at ``paths``.
+
+    Only the top level names of ``paths`` are loaded, so that files
+    which allow it are only partly parsed, and the secrets are not
+    dumped.
+
+    Parameters
+    ----------
+    paths : list
+        Names of values, with nested keys separated by ``__``.
+    fn : str, optional
+        Configuration filename, as for ``load_secrets()``.
+    prefix : str, optional
+        Prefix for environment variables.
+    profile : str, optional
+        Profile of the file to load.
+    defaults : dict, optional
+        Default configuration variables.
+
+    Returns
+    -------
+    dict
+        The value at each path, with secret references resolved.
+
+    Raises
+    ------
+    KeyError
+        Raises a ``KeyError`` with the first path that is not defined.
+    """
+    defaults = defaults or {}
+    tops = {path.split("__", 1)[0]: _UNDEFINED for path in paths}
+    secrets = load_secrets(
+        fn=fn, prefix=prefix, profile=profile, **dict(tops, **defaults)
+    )
+
+    values = {}
+    for path in paths:
+        value = secrets
+        try:
+            for key in path.split("__"):
+                value = value[_index(value, key)]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise KeyError(path)
+        if value is _UNDEFINED:
+            raise KeyError(path)
+        values[path] = _resolve_value(value)
+
+    return values
+
+
+def _resolve_value(value):
+    """Resolve the secret references in ``value``."""
+    if isinstance(value, Promise):
+        return str(value)
+    elif isinstance(value, dict):
+        return {k: _resolve_value(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [_resolve_value(v) for v in value]
+
+    return value
+
+
+def _format_value(value):
+    """Format ``value`` for printing, as itself if a string or JSON."""
+    if isinstance(value, str):
+        return value
+
+    return json.dumps(value, indent=2, default=str)
+
+
 def generate_secret_key():
     """Generate a secret key for a Django app.
 
@@ -76,309 +419,1958 @@ def generate_secret_key():
     Returns
     -------
     string
-        A random secret key.
+        A random secret key.
+    """
+    from django.core.management.utils import get_random_secret_key
+
+    return get_random_secret_key()
+
+
+def load_secrets(
+    fn=None,
+    prefix="DJANGO_ENV_",
+    backends=None,
+    profile=None,
+    **kwargs,
+):
+    """Load a list of configuration variables.
+
+    Return a dictionary of configuration variables, as loaded from a
+    configuration file or the environment.  Default key/value pairs
+    may be passed as ``kwargs``.
+
+    In a process started by ``dsloader --exec``, the snapshot loaded
+    by the launcher is used instead of loading the file and
+    environment again, if it was loaded from the same file, profile,
+    and prefix, and no backends are given.
+
+    If ``DJANGO_LOADER_SHM`` names a shared memory snapshot, the
+    secrets are taken from it, decoding values only as they are used,
+    or loaded and published to it if it does not exist yet, under the
+    same conditions.  See ``publish_secrets()``.
+
+    If ``DJANGO_LOADER_MODULE`` names a module generated from the
+    secrets file by ``compile_secrets()``, and the file has not
+    changed since, the file's configuration is imported from the
+    module instead of parsed.
+
+    If defaults are provided, then only the variables in defaults will
+    be the only ones that can be set from files or the environment.
+    If there are no defaults, then any variable can be set from files
+    or the environment.
+
+    References to other values, such as ``${DB__HOST}``, are
+    interpolated after the layers are merged.  Secret references,
+    such as ``{"$ref": "file:/run/secrets/key"}`` or
+    ``ref+env://API_KEY``, are returned as lazy strings resolved on
+    first use.
+
+    Parameters
+    ----------
+    fn : str, optional
+        Configuration filename, defaults to ``.env`` if not defined in
+        the environment as ``DJANGO_LOADER_ENV_FILE``.  May be in
+        dotenv, TOML, JSON, YAML, or BespON formats.  Formats will be
+        attempted in this order, after the binary MessagePack and
+        indexed snapshot formats, which are recognized by their first
+        bytes.  Files compressed with gzip, xz, or zstd are
+        decompressed in memory.  A filename of ``unix:/path`` fetches
+        the secrets from ``dsloader --serve /path`` instead, falling
+        back to ``DJANGO_LOADER_FALLBACK_FILE`` (or ``.env``) if the
+        server cannot be reached.
+    prefix : str, optional
+        Prefix for environment variables.  This prefix will be
+        prepended to all variable names before searching for them in
+        the environment.
+    backends : list, optional
+        ``SecretsBackend`` instances to fetch, concurrently, after the
+        file and before the environment, in increasing order of
+        precedence.
+    profile : str, optional
+        Profile of the file to load, defaults to
+        ``DJANGO_LOADER_PROFILE``; the ``base`` section of the file
+        is merged under the profile's section.
+    **kwargs : dict, optional
+        Dictionary with configuration variables as keys and default
+        values as values.
+
+    Returns
+    -------
+    dict
+        A dictionary of configuration variables and their values.
+    """
+    fn, profile = _resolve_source(fn, profile)
+    if not backends:
+        secrets = _load_secrets_shortcut(fn, prefix, profile, kwargs)
+        if secrets is not None:
+            return secrets
+
+    keys = _wanted_keys(kwargs, prefix)
+    file = _load_secrets_source(fn, prefix, profile, keys)
+    remote = {}
+    if backends:
+        from .backends import fetch_backends
+
+        remote = _unflatten(fetch_backends(backends, keys))
+
+    return _finish_secrets(
+        prefix, kwargs, file, remote, None if backends else (fn, profile)
+    )
+
+
+def _resolve_source(fn, profile):
+    """Apply the environment's defaults to a filename and profile.
+
+    Parameters
+    ----------
+    fn : str or None
+        Configuration filename, defaults to ``DJANGO_LOADER_ENV_FILE``
+        or ``.env``.
+    profile : str or None
+        Profile of the file, defaults to ``DJANGO_LOADER_PROFILE``.
+
+    Returns
+    -------
+    tuple
+        The filename and profile.
+    """
+    if fn is None:
+        fn = os.getenv("DJANGO_LOADER_ENV_FILE", ".env")
+    if profile is None:
+        profile = os.getenv("DJANGO_LOADER_PROFILE") or None
+
+    return fn, profile
+
+
+def _source_path(fn):
+    """Return the absolute path of ``fn``, or ``fn`` if it is a server."""
+    return fn if fn.startswith(_UNIX_SCHEME) else os.path.abspath(fn)
+
+
+def _load_secrets_shortcut(fn, prefix, profile, defaults):
+    """Load secrets from an ``--exec`` snapshot or shared memory.
+
+    Snapshots are only used if they were loaded from the same file,
+    profile, and prefix.
+
+    Parameters
+    ----------
+    fn : str
+        Configuration filename.
+    prefix : str
+        Prefix for environment variables.
+    profile : str or None
+        Profile of the configuration.
+    defaults : dict
+        Default configuration variables.
+
+    Returns
+    -------
+    dict or None
+        The configuration, or ``None`` if the secrets must be loaded.
+    """
+    snapshot = _load_secrets_snapshot(fn, prefix, profile)
+    if snapshot is not None:
+        defaults = _interpolate_defaults(defaults, snapshot)
+        return _defer_references(_merge(defaults, snapshot))
+
+    shared = os.getenv("DJANGO_LOADER_SHM")
+    if shared:
+        try:
+            secrets = attach_secrets(shared)
+        except FileNotFoundError:
+            return None
+
+        if (secrets.prefix, secrets.fn, secrets.profile) == (
+            prefix,
+            _source_path(fn),
+            profile,
+        ):
+            if not defaults:
+                return secrets
+            return _merge(_interpolate_defaults(defaults, secrets), secrets)
+
+        secrets.close()
+
+    return None
+
+
+def _interpolate_defaults(defaults, secrets):
+    """Interpolate ``defaults`` against interpolated ``secrets``.
+
+    Only the defaults, and the values of ``secrets`` they use, are
+    interpolated.  The values of ``secrets`` are escaped, since their
+    references were substituted when they were loaded.
+
+    Parameters
+    ----------
+    defaults : dict
+        Default configuration variables.
+    secrets : dict or collections.abc.Mapping
+        Configuration variables from a snapshot or shared memory.
+
+    Returns
+    -------
+    dict
+        ``defaults``, with their references substituted if they have
+        any.
+    """
+    if not _has_references(defaults):
+        return defaults
+
+    used = {
+        k: secrets[k]
+        for k in set(defaults) | _referenced_names(defaults)
+        if k in secrets
+    }
+
+    return _merge(
+        defaults, _interpolate(_merge({}, defaults, _escape_references(used)))
+    )
+
+
+def _wanted_keys(defaults, prefix="DJANGO_ENV_"):
+    """Return the top level names to load from files and backends.
+
+    Only the defaults, and the names referenced by them or by prefixed
+    environment variables, are loaded, unless everything will be
+    published to shared memory.
+
+    Parameters
+    ----------
+    defaults : dict
+        Default configuration variables.
+    prefix : str, optional
+        Prefix for environment variables.
+
+    Returns
+    -------
+    list or None
+        The sorted names to load, or ``None`` to load every name.
+    """
+    if not defaults or os.getenv("DJANGO_LOADER_SHM"):
+        return None
+
+    keys = set(defaults) | _referenced_names(defaults)
+    for key, value in os.environ.items():
+        if key.startswith(prefix) and "${" in value:
+            keys |= _referenced_names(value)
+
+    return sorted(keys)
+
+
+def _finish_secrets(prefix, defaults, file, remote, source=None, env=None):
+    """Merge loaded secrets with the environment and defaults.
+
+    Parameters
+    ----------
+    prefix : str
+        Prefix for environment variables.
+    defaults : dict
+        Default configuration variables.
+    file : dict
+        File configuration dictionary.
+    remote : dict
+        Remote backend configuration dictionary.
+    source : tuple, optional
+        The filename and profile of ``file``, to publish the secrets
+        to ``DJANGO_LOADER_SHM``, or ``None`` not to publish them.
+    env : dict, optional
+        Environment configuration dictionary, loaded with ``prefix``
+        if ``None``.
+
+    Returns
+    -------
+    dict
+        A dictionary of configuration variables and their values.
+    """
+    if env is None:
+        env = _load_secrets_environment(prefix)
+
+    shared = os.getenv("DJANGO_LOADER_SHM")
+    if shared and source is not None:
+        # Publish everything, since other processes may use different
+        # defaults.
+        fn, profile = source
+        secrets = _interpolate(_merge({}, file, remote, env))
+        publish_secrets(secrets, shared, prefix, fn=_source_path(fn), profile=profile)
+
+        return _defer_references(_merge(defaults, secrets))
+
+    # Interpolate over every layer, so that values outside the
+    # defaults may be referenced.
+    secrets = _interpolate(_merge({}, defaults, file, remote, env))
+
+    return _defer_references(_merge(defaults, secrets))
+
+
+def _load_secrets_source(fn, prefix="DJANGO_ENV_", profile=None, keys=None, cache=True):
+    """Load configuration variables from a file or secrets server.
+
+    If ``DJANGO_LOADER_MODULE`` names a module generated from the file
+    by ``compile_secrets()``, and the file is unchanged, the
+    configuration is taken from the module instead of parsing the
+    file.
+
+    Parameters
+    ----------
+    fn : str
+        Filename, or ``unix:`` and the path of a secrets server
+        socket.
+    prefix : str, optional
+        Prefix for environment variables.
+    profile : str, optional
+        Profile of the configuration to load.
+    keys : list, optional
+        Top level names needed from the file, or ``None`` for all.
+    cache : bool, optional
+        Determine whether to cache the parse of the file; see
+        ``_load_secrets_file()``.  Default is ``True``.
+
+    Returns
+    -------
+    dict
+        A dictionary, possibly empty, of configuration variables and
+        values.
+    """
+    if fn.startswith(_UNIX_SCHEME):
+        from .daemon import fetch_secrets
+
+        try:
+            return _select_profile(
+                fetch_secrets(fn.removeprefix(_UNIX_SCHEME), prefix), profile, fn
+            )
+        except (OSError, EOFError) as error:
+            fn = os.getenv("DJANGO_LOADER_FALLBACK_FILE", ".env")
+            warnings.warn(f"Secrets server unavailable ({error}); loading {fn}.")
+
+    module = os.getenv("DJANGO_LOADER_MODULE")
+    if module:
+        from .generated import _load_secrets_module
+
+        secrets = _load_secrets_module(module, fn, prefix, profile)
+        if secrets is not None:
+            if keys is not None:
+                secrets = _decode_referenced(keys, secrets, secrets.__getitem__)
+            return _copy_tree(secrets)
+
+    return _load_secrets_file(
+        fn, prefix=prefix, profile=profile, keys=keys, cache=cache
+    )
+
+
+def dump_secrets(fmt="TOML", **kwargs):
+    """Dump a secrets dictionary to the specified format.
+
+    Dump a secrets dictionary to the specified format, defaulting to
+    TOML.
+
+    Parameters
+    ----------
+    fmt : str, optional
+        The dump format, one of ``TOML``, ``JSON``, ``YAML``,
+        ``BespON``, ``MSGPACK``, ``ENV``, ``ENVJSON``, ``BLOB``, or
+        ``INDEXED``.  ``ENVJSON`` is ``ENV`` with large lists and
+        dicts dumped as JSON values, ``BLOB`` dumps the whole
+        configuration as one compressed environment variable, and
+        ``INDEXED`` dumps an indexed binary snapshot.  ``MSGPACK`` and
+        ``INDEXED`` are dumped as ``bytes``.  Any format followed by
+        ``+gzip``, ``+xz``, or ``+zstd``, such as ``JSON+gzip``, is
+        dumped compressed, as ``bytes``.
+    **kwargs : dict
+        A dictionary of configuration variables.  Secret references
+        are dumped unresolved.
+
+    Raises
+    ------
+    ValueError
+        Raises a ``ValueError`` if the compression is not supported.
+    """
+    kwargs = _restore_references(kwargs)
+
+    fmt, _, codec = fmt.partition("+")
+    if codec:
+        return _compress(codec, dump_secrets(fmt, **kwargs))
+
+    if fmt == "TOML":
+        return toml.dumps(kwargs)
+    elif fmt == "JSON":
+        return json.dumps(kwargs, indent=2)
+    elif fmt == "YAML":
+        # Let's jump through some hoops for the sake of streams.
+        # https://yaml.readthedocs.io/en/latest/example.html#output-of-dump-as-a-string
+        from ruamel.yaml.compat import StringIO
+
+        stream = StringIO()
+        yaml = YAML(typ="safe")
+        yaml.dump(kwargs, stream)
+        return stream.getvalue()
+    elif fmt == "BespON":
+        return bespon.dumps(kwargs)
+    elif fmt == "ENVJSON":
+        return _dump_secrets_environment(kwargs, json_threshold=_ENV_JSON_THRESHOLD)
+    elif fmt == "BLOB":
+        return _dump_secrets_blob(kwargs)
+    elif fmt == "INDEXED":
+        return _dump_indexed(kwargs)
+    elif fmt == "MSGPACK":
+        return _pack(kwargs)
+    else:
+        return _dump_secrets_environment(kwargs)
+
+
+def _process_defaults(defaults):
+    """Process defaults passed as arguments.
+
+    Process a list of key/value defaults
+    """
+    if defaults is None:
+        return {}
+
+    if len(defaults) % 2 != 0:
+        raise ValueError(
+            f"keys and values must be passed as pairs; length was {len(defaults)}"
+        )
+
+    return _unflatten(dict(zip(defaults[::2], defaults[1::2])))
+
+
+def _load_secrets_environment(prefix="DJANGO_ENV_", file_suffix=None):
+    """Load Django configuration variables from the enviroment.
+
+    This function searches the environment for variables prepended
+    with ``prefix``.  Currently, this function only reliably works for
+    string variables, but hopefully will work for other types,
+    dictionaries, and lists in the future.
+
+    If the variable ``{prefix}_BLOB`` exists, it is decoded as a
+    compressed blob from ``_dump_secrets_blob()`` and the other
+    variables are merged over it.
+
+    If ``file_suffix`` is set, variables ending in it name files
+    holding the value of the variable without the suffix, as with
+    Docker secrets.  The
+    files are read in one batch and trailing newlines are removed.  A
+    variable set directly takes precedence over a file, and a file
+    that cannot be read leaves its variable as the filename.
+
+    Parameters
+    ----------
+    prefix : str, optional
+        Prefix for environment variables.  This prefix should be
+        prepended to all valid variable names in the environment.
+    file_suffix : str, optional
+        Suffix of variables naming secret files, such as ``_FILE``.
+        Defaults to ``DJANGO_LOADER_FILE_SUFFIX``; if neither is set,
+        or the suffix is empty, files are not read.
+
+    Returns
+    -------
+    dict
+        A dictionary, possibly empty, of configuration variables and
+        values.
+    """
+    if file_suffix is None:
+        file_suffix = os.getenv("DJANGO_LOADER_FILE_SUFFIX", "")
+
+    raw = {}
+    files = {}
+
+    for key, value in os.environ.items():
+        if key.startswith(prefix):
+            # Find the prefixed values and strip the prefix.
+            name = key.removeprefix(prefix)
+            if file_suffix and name.endswith(file_suffix):
+                files[name] = value
+            else:
+                raw[name] = value
+
+    if files:
+        contents = _read_files(list(files.values()))
+        for (name, fn), content in zip(files.items(), contents):
+            if isinstance(content, OSError):
+                warnings.warn(f"Secret file {fn} for {name} is unreadable:  {content}")
+                raw.setdefault(name, fn)
+            else:
+                raw.setdefault(name.removesuffix(file_suffix), content.rstrip("\r\n"))
+
+    return _unflatten_variables(raw)
+
+
+def _read_files(fns):
+    """Read the files ``fns``, in parallel if there are many.
+
+    Parameters
+    ----------
+    fns : list
+        Filenames to read.
+
+    Returns
+    -------
+    list
+        The contents of each file, or the ``OSError`` raised reading
+        it.
+    """
+    if len(fns) < _PARALLEL_READS:
+        return [_read_file(fn) for fn in fns]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Give each thread one contiguous chunk, to avoid a task per file.
+    size = -(-len(fns) // _READ_WORKERS)
+    chunks = [fns[i : i + size] for i in range(0, len(fns), size)]
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        return [c for chunk in executor.map(_read_chunk, chunks) for c in chunk]
+
+
+def _read_chunk(fns):
+    """Read the files ``fns`` in order."""
+    return [_read_file(fn) for fn in fns]
+
+
+def _read_file(fn):
+    """Read the file ``fn``, returning any ``OSError`` raised."""
+    try:
+        with open(fn, "r") as file:
+            return file.read()
+    except OSError as error:
+        return error
+
+
+def _unflatten_variables(raw):
+    """Unflatten variables, decoding any configuration blob.
+
+    Parameters
+    ----------
+    raw : dict
+        Variable names, without prefix, and their values.
+
+    Returns
+    -------
+    dict
+        The unflattened dictionary of configuration values, with the
+        variables merged over the decoded blob.
+    """
+    blob = raw.pop(_BLOB_NAME, None)
+    if blob is None:
+        return _unflatten(raw)
+
+    secrets = _decode_blob(blob)
+    secrets.update(_unflatten(raw))
+
+    return secrets
+
+
+def _unflatten(raw):
+    """Unflatten a raw list of key/value options.
+
+    Unflatten a list of key/value options according to the rules for
+    scalars, dicts, and lists.  Names ending in ``__JSON`` hold JSON
+    values, which are decoded in one parse and stored under the name
+    without the suffix.
+
+    Parameters
+    ----------
+    raw : list
+        List of single key/value dicts.
+
+    Returns
+    -------
+    dict
+        The unflattened dictionary of configuration values.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if a name is
+        defined multiple times or a JSON value is invalid.
+    """
+    config = {}
+    encoded = []
+
+    for name, value in raw.items():
+        if name.endswith(_JSON_SUFFIX):
+            # Decode JSON values, wrapping them so that list
+            # conversion leaves them alone.
+            name = name.removesuffix(_JSON_SUFFIX)
+            try:
+                value = _JSONValue(json.loads(value))
+            except json.JSONDecodeError as error:
+                raise ImproperlyConfigured(f"{name} is not valid JSON:  {error}")
+            encoded.append(name)
+
+        if "__" not in name:
+            # Find scalars.
+            config[name] = value
+        else:
+            # Handle the flattened data structures, treating the
+            # list type variables as dicts.
+            # Based on:
+            # https://gist.github.com/fmder/494aaa2dd6f8c428cede
+            keys = name.split("__")
+            sub_config = config
+            for k in keys[:-1]:
+                try:
+                    if not isinstance(sub_config[k], dict):
+                        raise ImproperlyConfigured(
+                            f"{k} is defined multiple times in the environment."
+                        )
+                    sub_config = sub_config[k]
+                except KeyError:
+                    sub_config[k] = {}
+                    sub_config = sub_config[k]
+            sub_config[keys[-1]] = value
+
+    config = _convert_listdict_to_list(config)
+
+    # Unwrap the decoded JSON values.
+    for name in encoded:
+        keys = name.split("__")
+        sub_config = config
+        for k in keys[:-1]:
+            sub_config = sub_config[_index(sub_config, k)]
+        k = _index(sub_config, keys[-1])
+        sub_config[k] = sub_config[k].value
+
+    return config
+
+
+class _JSONValue:
+    """A decoded JSON value awaiting placement in the configuration."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+def _index(container, key):
+    """Convert ``key`` to an index if ``container`` is a list."""
+    if isinstance(container, list):
+        return int(key)
+
+    return key
+
+
+def _load_secrets_file(
+    fn,
+    raise_bad_format=True,
+    prefix="DJANGO_ENV_",
+    profile=None,
+    keys=None,
+    stamps=None,
+    cache=True,
+):
+    """Attempt to load configuration variables from ``fn``.
+
+    Attempt to load configuration variables from ``fn``.  If ``fn``
+    does not exist or is not a recognized format, return an empty
+    dict.  Raises ``ImproperlyConfigured`` if the file exists and does
+    not match a recognized format unless ``raise_bad_format`` is
+    ``False``.
+
+    Dotenv files are recognized by their first significant line and
+    parsed before the other formats are attempted.  Compressed files
+    are recognized by their first bytes and decompressed in memory.
+    Parses are cached by file identity, size, and modification time,
+    and each call returns a copy.  If ``fn`` is a directory, it is
+    loaded with ``_load_secrets_directory()``.
+
+    Files named by an ``_INCLUDE`` key are loaded and merged under the
+    file; see ``_load_secrets_graph()``.  The merged graph is cached
+    until one of its files changes, and shared fragments are parsed
+    once.
+
+    Parameters
+    ----------
+    fn : str
+        Filename from which to load configuration values.
+    raise_bad_format : bool, optional
+        Determine whether to raise
+        ``django.core.exceptions.ImproperlyConfigured`` if the file
+        format is not recognized.  Default is ``True``.
+    prefix : str, optional
+        Prefix stripped from variable names in dotenv files.
+    profile : str, optional
+        Profile of the file to load.  Only the ``base`` and
+        ``profile`` sections are parsed, where the format allows, and
+        the ``profile`` section is deep merged over the ``base``
+        section.
+    keys : list, optional
+        Top level names needed from the file.  Other names may be
+        omitted, and are not decoded from JSON files.
+    stamps : dict, optional
+        Collects the stamp of ``fn`` and of each file it includes, by
+        filename, so that callers may detect changes to any of them.
+    cache : bool, optional
+        Determine whether to cache the parses and include graph.  If
+        ``False``, the files are parsed without consulting or filling
+        the caches, and the configuration is returned without a copy,
+        as for files that are loaded once.  Default is ``True``.
+
+    Returns
+    -------
+    dict
+        A dictionary, possibly empty, of configuration variables and
+        values.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if the file
+        format is not recognized and ``raise_bad_format`` is ``True``,
+        or if ``profile`` is not in the file.
+    """
+    if stamps is None:
+        stamps = {}
+
+    # Determine if the file actually exists, and bail if not.
+    try:
+        info = os.stat(fn)
+    except OSError:
+        info = None
+    stamps[os.path.abspath(fn)] = _stamp(fn)
+    if info is not None and stat.S_ISDIR(info.st_mode):
+        return _select_profile(_load_secrets_directory(fn, prefix), profile, fn)
+    if info is None or not stat.S_ISREG(info.st_mode):
+        warnings.warn(f'File "{fn}" does not exist.')
+        return {}
+
+    # Reuse the last include graph if none of its files changed.
+    if keys is not None:
+        keys = frozenset(keys)
+    key = (os.path.abspath(fn), prefix, profile, keys)
+    cached = _INCLUDE_CACHE.get(key) if cache else None
+    if cached is not None and all(_stamp(p) == s for p, s in cached[0].items()):
+        stamps.update(cached[0])
+        return _copy_tree(cached[1])
+
+    graph = {}
+    secrets = _load_secrets_graph(
+        key[0], prefix, graph, {}, raise_bad_format, profile, keys, cache
+    )
+    stamps.update(graph)
+    if secrets is None:
+        return {}
+    elif not cache:
+        return secrets
+
+    if len(graph) > 1:
+        _INCLUDE_CACHE[key] = (graph, secrets)
+    else:
+        _INCLUDE_CACHE.pop(key, None)
+
+    return _copy_tree(secrets)
+
+
+def _load_secrets_graph(
+    path,
+    prefix,
+    stamps,
+    active,
+    raise_bad_format=True,
+    profile=None,
+    keys=None,
+    cache=True,
+):
+    """Load ``path`` and the files it includes.
+
+    Files named by the ``_INCLUDE`` key, a filename or list of
+    filenames relative to the including file, are loaded and deep
+    merged in order, and the including file is deep merged over them.
+
+    Parameters
+    ----------
+    path : str
+        Absolute filename to load.
+    prefix : str
+        Prefix stripped from variable names in dotenv files.
+    stamps : dict
+        Collects the stamp of each file loaded, by filename.
+    active : dict
+        Files being loaded, to detect include cycles.
+    raise_bad_format : bool, optional
+        Determine whether to raise if ``path`` is not a recognized
+        format; included files always raise.
+    profile : str, optional
+        Profile of ``path`` to load; included files are loaded whole.
+    keys : frozenset, optional
+        Top level names needed from ``path``.
+    cache : bool, optional
+        Determine whether to cache the parses.  Default is ``True``.
+
+    Returns
+    -------
+    dict or None
+        The merged configuration, shared with the parse cache, or
+        ``None`` if ``path`` is not a recognized format.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if an included
+        file is missing or unrecognized, or includes form a cycle.
+    """
+    if path in active:
+        cycle = list(active)[list(active).index(path) :] + [path]
+        raise ImproperlyConfigured(f"Include cycle:  {' -> '.join(cycle)}")
+
+    stamps[path], secrets = _parse_secrets_file(path, prefix, profile, keys, cache)
+    if secrets is None:
+        if raise_bad_format:
+            raise ImproperlyConfigured(
+                f"Configuration file {Path(path).resolve()} is not a recognized format."
+            )
+
+        return None
+
+    if not isinstance(secrets, dict) or _INCLUDE_NAME not in secrets:
+        return secrets
+
+    includes = secrets[_INCLUDE_NAME]
+    if isinstance(includes, str):
+        includes = [includes]
+
+    active[path] = None
+    merged = {}
+    for include in includes:
+        include = os.path.normpath(os.path.join(os.path.dirname(path), include))
+        merged = _merge_deep(
+            merged,
+            _load_secrets_graph(include, prefix, stamps, active, cache=cache),
+        )
+    del active[path]
+
+    return _merge_deep(merged, {k: v for k, v in secrets.items() if k != _INCLUDE_NAME})
+
+
+def _parse_secrets_file(
+    path, prefix="DJANGO_ENV_", profile=None, keys=None, cache=True
+):
+    """Parse ``path``, reusing the last parse if it is unchanged.
+
+    Parameters
+    ----------
+    path : str
+        Absolute filename to parse.
+    prefix : str, optional
+        Prefix stripped from variable names in dotenv files.
+    profile : str, optional
+        Profile to select from the file.
+    keys : frozenset, optional
+        Top level names needed from the file.
+    cache : bool, optional
+        Determine whether to reuse and cache the parse.  Default is
+        ``True``.
+
+    Returns
+    -------
+    tuple
+        The stamp of the file and its configuration, shared with the
+        parse cache, or ``None`` if the file is not a recognized
+        format.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if the file
+        cannot be read.
+    """
+    stamp = _stamp(path)
+    cached = _PARSE_CACHE.get((path, prefix, profile, keys)) if cache else None
+    if cached is not None and cached[0] == stamp:
+        return cached
+
+    # Read the file once and attempt each parser on the text, unless
+    # it is recognized as a binary format by its first bytes.
+    try:
+        kind, content = _read_secrets_file(path)
+    except OSError as error:
+        raise ImproperlyConfigured(f"Configuration file {path} is unreadable:  {error}")
+
+    if kind == _INDEXED:
+        secrets = _load_secrets_indexed(path, profile, keys, content)
+    elif kind == _MSGPACK:
+        secrets = _load_msgpack(path, content, profile)
+    else:
+        secrets = _parse_secrets(path, content, prefix, profile, keys)
+
+    if secrets is not None and cache:
+        _PARSE_CACHE[(path, prefix, profile, keys)] = (stamp, secrets)
+
+    return stamp, secrets
+
+
+def _read_secrets_file(path):
+    """Read a secrets file, decompressing it in memory.
+
+    Compressed, indexed snapshot, and MessagePack files are recognized
+    by their first bytes.  Other files are read as text.
+
+    Parameters
+    ----------
+    path : str
+        Filename to read.
+
+    Returns
+    -------
+    tuple
+        The kind of file, ``_INDEXED``, ``_MSGPACK``, or ``_TEXT``, and
+        its decompressed contents as ``bytes``, or text for text
+        files.  The contents of uncompressed indexed snapshots are
+        ``None``, since they are mapped rather than read.
+
+    Raises
+    ------
+    OSError
+        Raises an ``OSError`` if the file cannot be read.
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if the file
+        cannot be decompressed.
+    """
+    with open(path, "rb") as f:
+        head = f.read(_HEAD_SIZE)
+        codec = _compression(head)
+        if codec is not None:
+            f.seek(0)
+            data = _decompress(codec, f, path)
+            head = data[:_HEAD_SIZE]
+        elif _is_indexed(head):
+            return _INDEXED, None
+        elif _is_msgpack(head):
+            data = head + f.read()
+        else:
+            data = None
+
+    if _is_indexed(head):
+        return _INDEXED, data
+    elif _is_msgpack(head):
+        return _MSGPACK, data
+    elif data is None:
+        with open(path, "r") as f:
+            return _TEXT, f.read()
+
+    # Decode as ``open()`` does in text mode.
+    return _TEXT, io.TextIOWrapper(io.BytesIO(data)).read()
+
+
+def _load_msgpack(path, data, profile=None):
+    """Decode a MessagePack secrets file.
+
+    Parameters
+    ----------
+    path : str
+        Filename of the secrets file.
+    data : bytes
+        Contents of the secrets file.
+    profile : str, optional
+        Profile to select from the file.
+
+    Returns
+    -------
+    dict or None
+        The configuration, or ``None`` if ``data`` is not MessagePack.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if ``profile`` is
+        not in the file.
+    """
+    try:
+        secrets = _unpack(data)
+    except ValueError:
+        return None
+
+    return _select_profile(secrets, profile, path)
+
+
+def _load_secrets_indexed(path, profile=None, keys=None, data=None):
+    """Load configuration variables from an indexed snapshot.
+
+    Only the values of ``keys``, and of the names referenced by them,
+    or of the ``base`` and ``profile`` sections, are decoded.  Binary
+    values are ``memoryview`` slices of the mapped snapshot, or of
+    ``data``.
+
+    Parameters
+    ----------
+    path : str
+        Filename of the snapshot.
+    profile : str, optional
+        Profile to select from the snapshot.
+    keys : frozenset, optional
+        Top level names needed from the snapshot.
+    data : bytes, optional
+        The snapshot, if it was decompressed rather than mapped from
+        ``path``.
+
+    Returns
+    -------
+    dict
+        A dictionary of configuration variables and values.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if the snapshot
+        is not valid, or if ``profile`` is not in the snapshot.
+    """
+    if data is None:
+        snapshot = open_secrets(path)
+    else:
+        snapshot = _open_buffer(memoryview(data), path)
+    if profile is not None:
+        secrets = snapshot._to_dict((_PROFILE_BASE, profile, _INCLUDE_NAME))
+    elif keys is not None:
+        secrets = _decode_referenced(
+            keys, snapshot, lambda key: snapshot._to_dict((key,))[key]
+        )
+    else:
+        secrets = snapshot._to_dict()
+
+    return _select_profile(secrets, profile, path)
+
+
+def _stamp(path):
+    """Return the identity, size, and modification times of ``path``."""
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+
+    return (info.st_ino, info.st_size, info.st_mtime_ns, info.st_ctime_ns)
+
+
+def _merge_deep(base, layer):
+    """Merge ``layer`` over ``base``, merging nested dicts.
+
+    Neither argument is modified, but unmerged values are shared.
+    """
+    merged = dict(base)
+    for k, v in layer.items():
+        if isinstance(v, dict) and isinstance(merged.get(k), dict):
+            merged[k] = _merge_deep(merged[k], v)
+        else:
+            merged[k] = v
+
+    return merged
+
+
+def _load_secrets_directory(fn, prefix="DJANGO_ENV_"):
+    """Load configuration variables from a directory of files.
+
+    Each file in ``fn`` holds one variable, named like an environment
+    variable, with or without ``prefix``, as in Docker and Kubernetes
+    secret mounts.  Trailing newlines are removed from the values.
+    Hidden files are ignored.
+
+    If ``fn`` has a ``..data`` link, as Kubernetes uses to swap
+    secrets atomically, it is resolved once and the files are read
+    from its target, so that the variables come from one version of
+    the secrets.
+
+    Parameters
+    ----------
+    fn : str
+        The directory from which to load configuration values.
+    prefix : str, optional
+        Prefix stripped from file names.
+
+    Returns
+    -------
+    dict
+        A dictionary, possibly empty, of configuration variables and
+        values.
+    """
+    data = os.path.join(fn, _DIRECTORY_DATA)
+    if os.path.isdir(data):
+        fn = os.path.realpath(data)
+
+    names = []
+    paths = []
+    with os.scandir(fn) as entries:
+        for entry in entries:
+            if not entry.name.startswith(".") and entry.is_file():
+                names.append(entry.name.removeprefix(prefix))
+                paths.append(entry.path)
+
+    raw = {}
+    for name, path, content in zip(names, paths, _read_files(paths)):
+        if isinstance(content, OSError):
+            warnings.warn(f"Secret file {path} is unreadable:  {content}")
+        else:
+            raw[name] = content.rstrip("\r\n")
+
+    return _unflatten_variables(raw)
+
+
+def _parse_secrets(fn, text, prefix="DJANGO_ENV_", profile=None, keys=None):
+    """Parse configuration variables from the text of ``fn``.
+
+    Parameters
+    ----------
+    fn : str
+        Filename of the text, used to recognize dotenv files.
+    text : str
+        The file contents.
+    prefix : str, optional
+        Prefix stripped from variable names in dotenv files.
+    profile : str, optional
+        Profile to select.  TOML tables and YAML documents of other
+        profiles are skipped before parsing.
+    keys : frozenset, optional
+        Top level names needed.  JSON objects are decoded only for
+        these names, or the profiles if ``profile`` is given, and the
+        names they reference.
+
+    Returns
+    -------
+    dict or None
+        The configuration variables and values, or ``None`` if the
+        text is not a recognized format.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if ``profile`` is
+        not in the text.
+    """
+    wanted = None if profile is None else (_PROFILE_BASE, profile, _INCLUDE_NAME)
+
+    # Attempt to load dotenv, since it's cheap to detect.
+    if _is_dotenv(fn, text):
+        try:
+            return _select_profile(_load_dotenv(text, prefix), profile, fn)
+        except ValueError:
+            pass
+    # Attempt to decode part of a JSON object, since TOML cannot start
+    # with a brace.
+    if wanted is not None or keys is not None:
+        if text[json.decoder.WHITESPACE.match(text).end() :][:1] == "{":
+            try:
+                return _select_profile(
+                    _load_json_partial(text, wanted or keys | {_INCLUDE_NAME}),
+                    profile,
+                    fn,
+                )
+            except json.JSONDecodeError:
+                pass
+    # Attempt to load TOML, since python.
+    if wanted is not None:
+        # Try the profile's tables, and the whole text if they are
+        # not valid alone.
+        try:
+            return _select_profile(toml.loads(_prune_toml(text, wanted)), profile, fn)
+        except toml.TomlDecodeError:
+            pass
+    try:
+        return _select_profile(toml.loads(text), profile, fn)
+    except toml.TomlDecodeError:
+        pass
+    # Attempt to load JSON.
+    try:
+        return _select_profile(json.loads(text), profile, fn)
+    except json.JSONDecodeError:
+        pass
+    # Attempt to load YAML, with ruamel.yaml and YAML 1.2.
+    # Overachiever.
+    try:
+        return _select_profile(_load_yaml(text, wanted), profile, fn)
+    except YAMLError:
+        pass
+    # Attempt to load BespON.  Geek.
+    try:
+        return _select_profile(bespon.loads(text), profile, fn)
+    except bespon.erring.DecodingException:
+        pass
+
+    return None
+
+
+def _select_profile(secrets, profile, fn):
+    """Merge the ``profile`` section of ``secrets`` over its base.
+
+    Parameters
+    ----------
+    secrets : dict
+        Configuration with a section per profile.
+    profile : str or None
+        The profile to select, or ``None`` for the whole
+        configuration.
+    fn : str
+        Filename of the configuration, for errors.
+
+    Returns
+    -------
+    dict
+        The ``base`` section, if any, deep merged with the
+        ``profile`` section, including the files included by
+        ``secrets`` before those included by the sections.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if ``profile`` is
+        not in ``secrets``.
+    """
+    if profile is None:
+        return secrets
+
+    if not isinstance(secrets, dict) or not isinstance(secrets.get(profile), dict):
+        raise ImproperlyConfigured(f"Profile {profile} is not defined in {fn}.")
+
+    selected = _merge_deep(secrets.get(_PROFILE_BASE, {}), secrets[profile])
+    if _INCLUDE_NAME in secrets:
+        selected[_INCLUDE_NAME] = _as_list(secrets[_INCLUDE_NAME]) + _as_list(
+            selected.get(_INCLUDE_NAME, [])
+        )
+
+    return selected
+
+
+def _as_list(value):
+    """Wrap ``value`` in a list unless it is one."""
+    return value if isinstance(value, list) else [value]
+
+
+def _prune_toml(text, wanted):
+    """Remove the top level TOML tables not in ``wanted``.
+
+    Keys before the first table are kept.  Text with multiline
+    strings, which could hide table headers, is not pruned.
+    """
+    if "'''" in text or '"""' in text:
+        return text
+
+    pieces = []
+    start = 0
+    keep = True
+    for match in _TOML_TABLE.finditer(text):
+        if keep:
+            pieces.append(text[start : match.start()])
+        keep = match.group(1).strip("\"'") in wanted
+        start = match.start()
+    if keep:
+        pieces.append(text[start:])
+
+    return "".join(pieces)
+
+
+def _load_json_partial(text, keys):
+    """Decode the values of ``keys`` from a JSON object.
+
+    The object is scanned without decoding values, and only the values
+    of ``keys``, and of the names referenced by them, are decoded.
+
+    Parameters
+    ----------
+    text : str
+        Text of a JSON object.
+    keys : collection
+        Top level names to decode.
+
+    Returns
+    -------
+    dict
+        The decoded names and values, in the order of the text.
+
+    Raises
+    ------
+    json.JSONDecodeError
+        Raises a ``JSONDecodeError`` if the structure of the object is
+        invalid.  Skipped values are not validated.
+    """
+    offsets = _index_json_object(text)
+    secrets = _decode_referenced(
+        keys, offsets, lambda key: _JSON_DECODER.raw_decode(text, offsets[key])[0]
+    )
+
+    return {k: secrets[k] for k in sorted(secrets, key=offsets.get)}
+
+
+def _decode_referenced(keys, names, decode):
+    """Decode the values of ``keys``, and of the names they reference.
+
+    References are followed transitively, so that the values needed
+    to interpolate the values of ``keys`` are decoded too.
+
+    Parameters
+    ----------
+    keys : collection
+        Top level names to decode.
+    names : collection
+        The top level names available.
+    decode : callable
+        Returns the value of a name.
+
+    Returns
+    -------
+    dict
+        The decoded names and values.
+    """
+    secrets = {}
+    pending = [k for k in keys if k in names]
+    while pending:
+        key = pending.pop()
+        if key not in secrets:
+            secrets[key] = decode(key)
+            pending.extend(k for k in _referenced_names(secrets[key]) if k in names)
+
+    return secrets
+
+
+def _index_json_object(text):
+    """Return the offset of each top level value of a JSON object."""
+    ws = json.decoder.WHITESPACE.match
+    offsets = {}
+    try:
+        pos = ws(text).end()
+        if text[pos] != "{":
+            raise json.JSONDecodeError("Expecting object", text, pos)
+        pos = ws(text, pos + 1).end()
+        if text[pos] == "}":
+            pos += 1
+        else:
+            while True:
+                if text[pos] != '"':
+                    raise json.JSONDecodeError(
+                        "Expecting property name enclosed in double quotes", text, pos
+                    )
+                key, pos = json.decoder.scanstring(text, pos + 1)
+                pos = ws(text, pos).end()
+                if text[pos] != ":":
+                    raise json.JSONDecodeError("Expecting ':' delimiter", text, pos)
+                pos = ws(text, pos + 1).end()
+                offsets[key] = pos
+                pos = ws(text, _skip_json(text, pos)).end()
+                if text[pos] == "}":
+                    pos += 1
+                    break
+                if text[pos] != ",":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+                pos = ws(text, pos + 1).end()
+    except IndexError:
+        raise json.JSONDecodeError("Unterminated object", text, len(text))
+
+    if ws(text, pos).end() != len(text):
+        raise json.JSONDecodeError("Extra data", text, pos)
+
+    return offsets
+
+
+def _skip_json(text, pos):
+    """Return the end of the JSON value at ``pos`` without decoding it.
+
+    Objects and arrays are skipped by counting their delimiters, which
+    is only valid if no string in the value contains a delimiter or a
+    backslash.  Otherwise, the value is scanned token by token.
+    """
+    delimiters = _JSON_DELIMITERS.get(text[pos])
+    if delimiters is None:
+        return _JSON_DECODER.raw_decode(text, pos)[1]
+
+    opener, closer = delimiters
+    depth = 1
+    quotes = 0
+    start = pos + 1
+    next_open = text.find(opener, start)
+    next_close = text.find(closer, start)
+    while next_close != -1:
+        if next_open != -1 and next_open < next_close:
+            end = next_open
+            next_open = text.find(opener, end + 1)
+            depth += 1
+        else:
+            end = next_close
+            next_close = text.find(closer, end + 1)
+            depth -= 1
+
+        # A delimiter after an odd number of quotes is in a string.
+        quotes += text.count('"', start, end)
+        start = end
+        if quotes % 2:
+            break
+        if depth == 0:
+            if text.find("\\", pos, end) == -1:
+                return end + 1
+            break
+
+    depth = 0
+    for match in _JSON_TOKEN.finditer(text, pos):
+        depth += 1 if match.group(1) in "{[" else -1
+        if depth == 0:
+            return match.end()
+
+    raise json.JSONDecodeError("Unterminated value", text, pos)
+
+
+def _load_yaml(text, wanted=None):
+    """Load YAML text, merging multiple documents.
+
+    If ``wanted`` is given, documents whose unindented lines are all
+    plain keys not in ``wanted`` are skipped without parsing.
+    """
+    yaml = YAML(typ="safe")
+    documents = _YAML_DOCUMENT.split(text)
+    if len(documents) == 1:
+        return yaml.load(text)
+
+    secrets = {}
+    for document in documents:
+        if wanted is not None and _unwanted_yaml(document, wanted):
+            continue
+        loaded = yaml.load(document)
+        if loaded is None:
+            continue
+        if not isinstance(loaded, dict):
+            raise YAMLError("YAML documents must be mappings.")
+        secrets.update(loaded)
+
+    return secrets
+
+
+def _unwanted_yaml(document, wanted):
+    """Determine if every top level key of a YAML document is unwanted."""
+    lines = _YAML_TOP.findall(document)
+    if not lines:
+        return False
+
+    for line in lines:
+        match = _YAML_KEY.match(line)
+        if match is None or match.group(1) in wanted:
+            return False
+
+    return True
+
+
+def _copy_tree(value):
+    """Copy the dicts and lists of a parsed configuration."""
+    if isinstance(value, dict):
+        return {k: _copy_tree(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [_copy_tree(v) for v in value]
+
+    return value
+
+
+def _is_dotenv(fn, text):
+    """Determine if ``text`` looks like a dotenv file.
+
+    Only the first significant line is inspected, so detection is
+    cheap regardless of the size of the file.  Files with a suffix
+    belonging to one of the structured formats are never treated as
+    dotenv files.
+
+    Parameters
+    ----------
+    fn : str
+        Filename of the secrets file.
+    text : str
+        Contents of the secrets file.
+
+    Returns
+    -------
+    bool
+        ``True`` if the file should be parsed as dotenv first,
+        ``False`` otherwise.
+    """
+    if Path(fn).suffix.lower() in _STRUCTURED_SUFFIXES:
+        return False
+
+    return _DOTENV_SIGNATURE.match(text) is not None
+
+
+def _load_dotenv(text, prefix="DJANGO_ENV_"):
+    """Load configuration variables from dotenv text.
+
+    Variable names are stripped of ``prefix``, if present, so that the
+    output of ``_dump_secrets_environment()`` and
+    ``_dump_secrets_blob()`` loads as it would from the environment.
+
+    Parameters
+    ----------
+    text : str
+        Contents of a dotenv file.
+    prefix : str, optional
+        Prefix to strip from variable names.
+
+    Returns
+    -------
+    dict
+        The unflattened dictionary of configuration values.
+
+    Raises
+    ------
+    ValueError
+        Raises a ``ValueError`` if ``text`` is not valid dotenv.
+    """
+    return _unflatten_variables(
+        {k.removeprefix(prefix): v for k, v in _parse_dotenv(text).items()}
+    )
+
+
+def _parse_dotenv(text):
+    r"""Parse dotenv text into a flat dictionary.
+
+    Parse ``KEY=value`` lines in a single pass over ``text``.  Lines
+    may be prefixed with ``export``, blank lines and lines starting
+    with ``#`` are ignored, and unquoted values end at a ``#``
+    preceded by whitespace.  Values may be unquoted, single quoted
+    (literal), or double quoted (with ``\n``, ``\t``, ``\r``,
+    ``\"``, ``\\``, and ``\$`` escapes), and adjacent pieces are
+    concatenated as in Bourne shells.  Quoted values may span lines.
+
+    Values starting with a bracket, brace, digit, or sign, or with
+    ``true``, ``false``, ``inf``, or ``nan``, are converted to their
+    TOML types if they are valid TOML values, such as ``5432``,
+    ``false``, or ``["a", "b"]``.  Other values, and the values of
+    ``__JSON`` variables, are strings.
+
+    Parameters
+    ----------
+    text : str
+        Contents of a dotenv file.
+
+    Returns
+    -------
+    dict
+        Variable names and their values.
+
+    Raises
+    ------
+    ValueError
+        Raises a ``ValueError`` on a malformed line or an unterminated
+        quote.
+    """
+    raw = {}
+    pos = 0
+    end = len(text)
+
+    while pos < end:
+        # Skip blank and comment lines.
+        match = _DOTENV_BLANK.match(text, pos)
+        if match:
+            pos = match.end()
+            continue
+
+        match = _DOTENV_KEY.match(text, pos)
+        if match is None:
+            line = text.count("\n", 0, pos) + 1
+            raise ValueError(f"invalid dotenv line {line}")
+        key = match.group(1)
+        pos = start = stop = match.end()
+
+        # Collect the value pieces, keeping whitespace between pieces
+        # but not trailing whitespace.
+        pieces = []
+        space = ""
+        while True:
+            match = _DOTENV_VALUE.match(text, pos)
+            if match is None:
+                raise ValueError(f"unterminated quote in dotenv value for {key}")
+            pos = match.end()
+            kind = match.lastgroup
+            if kind == "eol":
+                break
+            elif kind == "space":
+                space = match.group("space")
+                continue
+            elif kind == "bare" and match.group("bare").startswith("#"):
+                if not pieces or space:
+                    # A comment; skip to the end of the line.
+                    newline = text.find("\n", match.start())
+                    pos = end if newline == -1 else newline + 1
+                    break
+            if space:
+                pieces.append(space)
+                space = ""
+            if kind == "double":
+                pieces.append(
+                    _DOTENV_ESCAPE.sub(
+                        lambda m: _DOTENV_ESCAPES.get(m.group(1), m.group(0)),
+                        match.group("double"),
+                    )
+                )
+            else:
+                pieces.append(match.group(kind))
+            stop = pos
+
+        raw[key] = "".join(pieces)
+        if _DOTENV_TYPED.match(text, start) and not key.endswith(_JSON_SUFFIX):
+            raw[key] = _dotenv_typed(text[start:stop], raw[key])
+
+    return raw
+
+
+def _dotenv_typed(source, value):
+    """Convert the dotenv value ``source`` to its TOML type.
+
+    Parameters
+    ----------
+    source : str
+        The unparsed text of the value.
+    value : str
+        The value parsed as dotenv.
+
+    Returns
+    -------
+    object
+        The TOML value of ``source``, or ``value`` if ``source`` is
+        not a TOML value.
+    """
+    if source in ("true", "false"):
+        return source == "true"
+    elif _TOML_INTEGER.fullmatch(source):
+        return int(source)
+
+    try:
+        return toml.loads(f"value = {source}")["value"]
+    except (toml.TomlDecodeError, KeyError):
+        return value
+
+
+def _dump_secrets_environment(
+    config, prefix="DJANGO_ENV_", export=True, json_threshold=None
+):
+    """Dump configuration as an environment variable string.
+
+    Dump configuration as an environment variable string, hopefully
+    compatible with Bourne shells.  Tested exclusively with bash.
+
+    Lists and dicts are flattened into one variable per scalar unless
+    ``json_threshold`` is set, in which case those whose compact JSON
+    encoding is at least ``json_threshold`` characters long are dumped
+    as a single ``__JSON`` variable instead.
+
+    Parameters
+    ----------
+    config : dict
+        The configuration dict.
+    prefix : str, optional
+        Prefix for environment variables.  This prefix should be
+        prepended to all valid variable names in the environment.
+    export : bool, optional
+        Prepend each environment variable string with "export ", or
+        not.
+    json_threshold : int, optional
+        Minimum encoded size of lists and dicts dumped as JSON.
+
+    Returns
+    -------
+    string
+        The current configuration as a string setting environment
+        variables.
     """
-    from django.core.management.utils import get_random_secret_key
+    dumps = []
+    encoded = {}
+    if export:
+        exp = "export "
+    else:
+        exp = ""
 
-    return get_random_secret_key()
+    def _encode(k, v):
+        """Encode large lists and dicts as JSON instead of flattening."""
+        if json_threshold is None:
+            return True
+        encoding = json.dumps(v, separators=(",", ":"), default=str)
+        if len(encoding) < json_threshold:
+            return True
+        encoded[k] = encoding
 
+        return False
 
-def load_secrets(
-    fn=None,
-    prefix="DJANGO_ENV_",
-    **kwargs,
-):
-    """Load a list of configuration variables.
+    for k, v in _walk_secrets(config, _encode):
+        if k in encoded:
+            dumps.append(f"{str(k)}{_JSON_SUFFIX}={_quote_shell(encoded[k])}")
+        elif not isinstance(v, (list, Mapping)):
+            dumps.append(f"{str(k)}={_quote_shell(str(v))}")
 
-    Return a dictionary of configuration variables, as loaded from a
-    configuration file or the environment.  Default key/value pairs
-    may be passed as ``kwargs``.
+    return "\n".join(f"{exp}{prefix}{line}" for line in dumps)
 
-    If defaults are provided, then only the variables in defaults will
-    be the only ones that can be set from files or the environment.
-    If there are no defaults, then any variable can be set from files
-    or the environment.
+
+def _walk_secrets(config, descend=None):
+    """Walk configuration, yielding the flattened name of each value.
+
+    Values are visited breadth first, with nested names joined by
+    ``__`` and list items named by their index.  Each list and
+    mapping, including the lazy mappings of indexed snapshots and
+    shared memory, is yielded before its items.
 
     Parameters
     ----------
-    fn : str, optional
-        Configuration filename, defaults to ``.env`` if not defined in
-        the environment as ``DJANGO_LOADER_ENV_FILE``.  May be in
-        TOML, JSON, YAML, or BespON formats.  Formats will be
-        attempted in this order.
+    config : dict or collections.abc.Mapping
+        The configuration dict.
+    descend : callable, optional
+        Called with the name and value of each list and mapping
+        before it is yielded.  Its items are skipped if it returns
+        false.
+
+    Yields
+    ------
+    tuple
+        The flattened name and the value.
+    """
+    queue = collections.deque(config.items())
+
+    while queue:
+        k, v = queue.popleft()
+        if isinstance(v, (list, Mapping)) and (descend is None or descend(k, v)):
+            items = v.items() if isinstance(v, Mapping) else enumerate(v)
+            queue.extend((f"{k}__{sk}", sv) for sk, sv in items)
+        yield k, v
+
+
+def _dump_secrets_blob(config, prefix="DJANGO_ENV_", export=True):
+    """Dump configuration as a single compressed environment variable.
+
+    Parameters
+    ----------
+    config : dict
+        The configuration dict.
     prefix : str, optional
-        Prefix for environment variables.  This prefix will be
-        prepended to all variable names before searching for them in
-        the environment.
-    **kwargs : dict, optional
-        Dictionary with configuration variables as keys and default
-        values as values.
+        Prefix for environment variables.
+    export : bool, optional
+        Prepend the environment variable string with "export ", or
+        not.
 
     Returns
     -------
-    dict
-        A dictionary of configuration variables and their values.
+    string
+        The current configuration as a string setting the
+        ``{prefix}_BLOB`` environment variable.
     """
-    if fn is None:
-        fn = os.getenv("DJANGO_LOADER_ENV_FILE", ".env")
+    exp = "export " if export else ""
 
-    return _merge(kwargs, _load_secrets_file(fn), _load_secrets_environment(prefix))
+    return f"{exp}{prefix}{_BLOB_NAME}={_quote_shell(_encode_blob(config))}"
 
 
-def dump_secrets(fmt="TOML", **kwargs):
-    """Dump a secrets dictionary to the specified format.
+def _encode_blob(config):
+    """Encode configuration as a compressed blob.
 
-    Dump a secrets dictionary to the specified format, defaulting to
-    TOML.
+    The blob is the compact JSON encoding of ``config``, compressed
+    with zlib, base64 encoded, and tagged with a format version.
 
     Parameters
     ----------
-    fmt : str, optional
-        The dump format, one of ``TOML``, ``JSON``, ``YAML``,
-        ``BespON``, or ``ENV``.
-    **kwargs : dict
-        A dictionary of configuration variables.
+    config : dict
+        The configuration dict.
+
+    Returns
+    -------
+    str
+        The encoded blob.
     """
-    if fmt == "TOML":
-        return toml.dumps(kwargs)
-    elif fmt == "JSON":
-        return json.dumps(kwargs, indent=2)
-    elif fmt == "YAML":
-        # Let's jump through some hoops for the sake of streams.
-        # https://yaml.readthedocs.io/en/latest/example.html#output-of-dump-as-a-string
-        from ruamel.yaml.compat import StringIO
+    data = json.dumps(config, separators=(",", ":"), default=str).encode("utf-8")
 
-        stream = StringIO()
-        yaml = YAML(typ="safe")
-        yaml.dump(kwargs, stream)
-        return stream.getvalue()
-    elif fmt == "BespON":
-        return bespon.dumps(kwargs)
-    else:
-        return _dump_secrets_environment(kwargs)
+    return _BLOB_TAG + base64.b64encode(zlib.compress(data, 9)).decode("ascii")
 
 
-def _process_defaults(defaults):
-    """Process defaults passed as arguments.
+def _decode_blob(blob):
+    """Decode a compressed configuration blob.
 
-    Process a list of key/value defaults
+    Parameters
+    ----------
+    blob : str
+        A blob from ``_encode_blob()``.
+
+    Returns
+    -------
+    dict
+        The decoded configuration.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if the blob
+        cannot be decoded.
     """
-    if len(defaults) % 2 != 0:
-        raise ValueError(
-            f"keys and values must be passed as pairs; length was {len(defaults)}"
+    if not blob.startswith(_BLOB_TAG):
+        raise ImproperlyConfigured("Configuration blob has an unknown format.")
+
+    try:
+        secrets = json.loads(
+            zlib.decompress(base64.b64decode(blob.removeprefix(_BLOB_TAG)))
         )
+    except (binascii.Error, zlib.error, ValueError) as error:
+        raise ImproperlyConfigured(f"Configuration blob is invalid:  {error}")
 
-    return _unflatten(dict(zip(defaults[::2], defaults[1::2])))
+    if not isinstance(secrets, dict):
+        raise ImproperlyConfigured("Configuration blob is not a dictionary.")
 
+    return secrets
 
-def _load_secrets_environment(prefix="DJANGO_ENV_"):
-    """Load Django configuration variables from the enviroment.
 
-    This function searches the environment for variables prepended
-    with ``prefix``.  Currently, this function only reliably works for
-    string variables, but hopefully will work for other types,
-    dictionaries, and lists in the future.
+def _exec_secrets(
+    command, secrets, prefix="DJANGO_ENV_", mode="env", fn=".env", profile=None
+):
+    """Execute ``command`` with a snapshot of ``secrets``.
+
+    Replace the current process with ``command``, passing ``secrets``
+    so that ``load_secrets()`` in the new process, and any processes
+    it forks, can use them without loading the secrets again, if they
+    load the same file and profile with the same prefix.  In
+    ``env`` mode the snapshot is a blob in ``DJANGO_LOADER_SNAPSHOT``.
+    In ``fd`` mode it is JSON in an inherited, sealed memory file (or
+    an unlinked temporary file) whose descriptor is in
+    ``DJANGO_LOADER_SNAPSHOT_FD``.
 
     Parameters
     ----------
+    command : list
+        The command and its arguments.
+    secrets : dict
+        The loaded configuration.
     prefix : str, optional
-        Prefix for environment variables.  This prefix should be
-        prepended to all valid variable names in the environment.
-
-    Returns
-    -------
-    dict
-        A dictionary, possibly empty, of configuration variables and
-        values.
+        Prefix for environment variables used to load ``secrets``.
+    mode : str, optional
+        The snapshot transport, ``env`` or ``fd``.
+    fn : str, optional
+        Configuration filename used to load ``secrets``.
+    profile : str, optional
+        Profile used to load ``secrets``.
     """
-    raw = {}
-
-    for key, value in os.environ.items():
-        if key.startswith(prefix):
-            # Find the prefixed values and strip the prefix.
-            raw[key.removeprefix(prefix)] = value
-
-    return _unflatten(raw)
+    snapshot = {
+        "fn": _source_path(fn),
+        "prefix": prefix,
+        "profile": profile,
+        "secrets": _restore_references(secrets),
+    }
+
+    if mode == "fd":
+        data = json.dumps(snapshot, separators=(",", ":"), default=str)
+        os.environ[_SNAPSHOT_FD_VAR] = str(_snapshot_fd(data.encode("utf-8")))
+    else:
+        os.environ[_SNAPSHOT_VAR] = _encode_blob(snapshot)
 
+    try:
+        os.execvp(command[0], command)
+    except OSError as error:
+        print(f"{command[0]}: {error.strerror}", file=sys.stderr)
+        sys.exit(127)
 
-def _unflatten(raw):
-    """Unflatten a raw list of key/value options.
 
-    Unflatten a list of key/value options according to the rules for
-    scalars, dicts, and lists.
+def _snapshot_fd(data):
+    """Write ``data`` to an inheritable, read only file descriptor.
 
     Parameters
     ----------
-    raw : list
-        List of single key/value dicts.
+    data : bytes
+        The snapshot data.
 
     Returns
     -------
-    dict
-        The unflattened dictionary of configuration values.
+    int
+        The file descriptor.
     """
-    config = {}
+    if hasattr(os, "memfd_create"):
+        import fcntl
+
+        fd = os.memfd_create("django-loader", os.MFD_ALLOW_SEALING)
+        os.write(fd, data)
+        fcntl.fcntl(
+            fd,
+            fcntl.F_ADD_SEALS,
+            fcntl.F_SEAL_SHRINK
+            | fcntl.F_SEAL_GROW
+            | fcntl.F_SEAL_WRITE
+            | fcntl.F_SEAL_SEAL,
+        )
+    else:
+        fd = os.dup(tempfile.TemporaryFile().fileno())
+        os.write(fd, data)
 
-    for name, value in raw.items():
-        if "__" not in name:
-            # Find scalars.
-            config[name] = value
-        else:
-            # Handle the flattened data structures, treating the
-            # list type variables as dicts.
-            # Based on:
-            # https://gist.github.com/fmder/494aaa2dd6f8c428cede
-            keys = name.split("__")
-            sub_config = config
-            for k in keys[:-1]:
-                try:
-                    if not isinstance(sub_config[k], dict):
-                        raise ImproperlyConfigured(
-                            f"{k} is defined multiple times in the environment."
-                        )
-                    sub_config = sub_config[k]
-                except KeyError:
-                    sub_config[k] = {}
-                    sub_config = sub_config[k]
-            sub_config[keys[-1]] = value
+    os.set_inheritable(fd, True)
 
-    return _convert_listdict_to_list(config)
+    return fd
 
 
-def _load_secrets_file(fn, raise_bad_format=True):
-    """Attempt to load configuration variables from ``fn``.
+def _load_secrets_snapshot(fn=".env", prefix="DJANGO_ENV_", profile=None):
+    """Load a snapshot passed by ``dsloader --exec``.
 
-    Attempt to load configuration variables from ``fn``.  If ``fn``
-    does not exist or is not a recognized format, return an empty
-    dict.  Raises ``ImproperlyConfigured`` if the file exists and does
-    not match a recognized format unless ``raise_bad_format`` is
-    ``False``.
+    Snapshots loaded from a different file or profile, or with a
+    different prefix, are ignored.
 
     Parameters
     ----------
-    fn : str
-        Filename from which to load configuration values.
-    raise_bad_format : bool, optional
-        Determine whether to raise
-        ``django.core.exceptions.ImproperlyConfigured`` if the file
-        format is not recognized.  Default is ``True``.
+    fn : str, optional
+        Configuration filename.
+    prefix : str, optional
+        Prefix for environment variables.
+    profile : str, optional
+        Profile of the configuration.
 
     Returns
     -------
-    dict
-        A dictionary, possibly empty, of configuration variables and
-        values.
+    dict or None
+        The configuration in the snapshot, or ``None`` if there is no
+        snapshot of ``fn``, ``prefix``, and ``profile``.
 
     Raises
     ------
     django.core.exceptions.ImproperlyConfigured
-        Raises an ``ImproperlyConfigured`` exception if the file
-        format is not recognized and ``raise_bad_format`` is ``True``.
+        Raises an ``ImproperlyConfigured`` exception if the snapshot
+        cannot be read.
     """
-    # Determine if the file actually exists, and bail if not.
-    secrets = {}
-    if not Path(fn).is_file():
-        warnings.warn(f'File "{fn}" does not exist.')
-        return secrets
+    fd = os.environ.get(_SNAPSHOT_FD_VAR)
+    blob = os.environ.get(_SNAPSHOT_VAR)
 
-    # Attempt to load TOML, since python.
-    with open(fn, "r") as f:
-        try:
-            secrets = toml.load(f)
-            return secrets
-        except toml.TomlDecodeError:
-            pass
-    # Attempt to load JSON.
-    with open(fn, "r") as f:
-        try:
-            secrets = json.load(f)
-            return secrets
-        except json.JSONDecodeError:
-            pass
-    # Attempt to load YAML, with ruamel.yaml and YAML 1.2.
-    # Overachiever.
-    with open(fn, "r") as f:
+    if fd is not None:
         try:
-            yaml = YAML(typ="safe")
-            secrets = yaml.load(f)
-            return secrets
-        except YAMLError:
-            pass
-    # Attempt to load BespON.  Geek.
-    with open(fn, "r") as f:
-        try:
-            secrets = bespon.load(f)
-            return secrets
-        except bespon.erring.DecodingException:
-            pass
-
-    if raise_bad_format:
-        raise ImproperlyConfigured(
-            f"Configuration file {Path(fn).resolve()} is not a recognized format."
-        )
+            fd = int(fd)
+            size = os.fstat(fd).st_size
+            # Read from offset zero, since the descriptor is shared.
+            data = b""
+            while len(data) < size:
+                chunk = os.pread(fd, size - len(data), len(data))
+                if not chunk:
+                    break
+                data += chunk
+            snapshot = json.loads(data)
+        except (OSError, ValueError) as error:
+            raise ImproperlyConfigured(f"Secrets snapshot is unreadable:  {error}")
+    elif blob is not None:
+        snapshot = _decode_blob(blob)
+    else:
+        return None
 
-    return secrets
+    if (snapshot.get("fn"), snapshot.get("prefix"), snapshot.get("profile")) != (
+        _source_path(fn),
+        prefix,
+        profile,
+    ):
+        return None
 
+    return snapshot["secrets"]
 
-def _dump_secrets_environment(config, prefix="DJANGO_ENV_", export=True):
-    """Dump configuration as an environment variable string.
 
-    Dump configuration as an environment variable string, hopefully
-    compatible with Bourne shells.  Tested exclusively with bash.
+def _quote_shell(value):
+    """Single quote ``value`` for Bourne shells.
 
     Parameters
     ----------
-    config : dict
-        The configuration dict.
-    prefix : str, optional
-        Prefix for environment variables.  This prefix should be
-        prepended to all valid variable names in the environment.
-    export : bool, optional
-        Prepend each environment variable string with "export ", or
-        not.
+    value : str
+        The value to quote.
 
     Returns
     -------
-    string
-        The current configuration as a string setting environment
-        variables.
+    str
+        The quoted value, with embedded single quotes escaped.
     """
-    stack = []
-    dumps = []
-    if export:
-        exp = "export "
-    else:
-        exp = ""
-
-    # Convert the config dict into a list (stack).
-    for k, v in config.items():
-        stack.append((k, v))
-
-    while stack:
-        (k, v) = stack.pop(0)
-        if isinstance(v, list):
-            for i, sv in enumerate(v):
-                stack.append((f"{k}__{i}", sv))
-        elif isinstance(v, dict):
-            for sk, sv in v.items():
-                stack.append((f"{k}__{sk}", sv))
-        else:
-            dumps.append(f"{str(k)}='{str(v)}'")
-
-    return "\n".join(f"{exp}{prefix}{line}" for line in dumps)
+    return "'" + value.replace("'", "'\\''") + "'"
 
 
-def _merge(defaults, file, env):
-    """Merge configuration from defaults, file, and environment.
+def _merge(defaults, *layers):
+    """Merge configuration from defaults and other layers.
 
     Parameters
     ----------
     defaults : dict
         Default configuration dictionary.
-    file : dict
-        File configuration dictionary.
-    env : dict
-        Environment configuration dictionary.
+    *layers : dict
+        Configuration dictionaries, in increasing order of precedence;
+        usually the file, remote backend, and environment
+        configuration.
 
     Returns
     -------
@@ -388,24 +2380,20 @@ def _merge(defaults, file, env):
     config = defaults
 
     if defaults:
-        # Merge in file and environment options, if they exist in the
-        # defaults.
-        for k, v in file.items():
-            if k in config:
-                config[k] = v
-
-        for k, v in env.items():
-            if k in config:
-                config[k] = v
+        # Merge in the layers' options, if they exist in the defaults.
+        # Only look up the defaults, so that lazy mappings only decode
+        # the values that are used.
+        for layer in layers:
+            for k in config:
+                if k in layer:
+                    config[k] = layer[k]
 
         return config
 
-    # Merge all file and environment options, with no defaults.
-    for k, v in file.items():
-        config[k] = v
-
-    for k, v in env.items():
-        config[k] = v
+    # Merge all the layers' options, with no defaults.
+    for layer in layers:
+        for k, v in layer.items():
+            config[k] = v
 
     return config
 
@@ -522,50 +2510,80 @@ def _validate_file_format(fn):
     if not Path(fn).is_file():
         raise ImproperlyConfigured(f"Secrets file {Path(fn).resolve()} does not exist.")
 
-    # TOML.
-    with open(fn, "r") as f:
+    kind, content = _read_secrets_file(fn)
+
+    # Indexed snapshot.
+    if kind == _INDEXED:
+        _load_secrets_indexed(fn, data=content)
+        print(f"Secrets file {Path(fn).resolve()} recognized as indexed.")
+        return True
+
+    # MessagePack.
+    if kind == _MSGPACK:
         try:
-            toml.load(f)
-            print(f"Secrets file {Path(fn).resolve()} recognized as TOML.")
+            _unpack(content)
+            print(f"Secrets file {Path(fn).resolve()} recognized as MessagePack.")
             return True
-        except toml.TomlDecodeError as error:
-            print(f"toml error: {error}")
-            print(f"Secrets file {Path(fn).resolve()} not recognized as TOML.")
-            pass
+        except ValueError as error:
+            print(f"MessagePack error: {error}")
+            print(f"Secrets file {Path(fn).resolve()} not recognized as MessagePack.")
+            raise ImproperlyConfigured(
+                f"Configuration file {Path(fn).resolve()} is not a recognized format."
+            )
 
-    # JSON.
-    with open(fn, "r") as f:
+    text = content
+
+    # Dotenv.
+    if _is_dotenv(fn, text):
         try:
-            json.load(f)
-            print(f"Secrets file {Path(fn).resolve()} recognized as JSON.")
+            _parse_dotenv(text)
+            print(f"Secrets file {Path(fn).resolve()} recognized as dotenv.")
             return True
-        except json.JSONDecodeError as error:
-            print(f"json error: {error}")
-            print(f"Secrets file {Path(fn).resolve()} not recognized as JSON.")
+        except ValueError as error:
+            print(f"dotenv error: {error}")
+            print(f"Secrets file {Path(fn).resolve()} not recognized as dotenv.")
             pass
 
+    # TOML.
+    try:
+        toml.loads(text)
+        print(f"Secrets file {Path(fn).resolve()} recognized as TOML.")
+        return True
+    except toml.TomlDecodeError as error:
+        print(f"toml error: {error}")
+        print(f"Secrets file {Path(fn).resolve()} not recognized as TOML.")
+        pass
+
+    # JSON.
+    try:
+        json.loads(text)
+        print(f"Secrets file {Path(fn).resolve()} recognized as JSON.")
+        return True
+    except json.JSONDecodeError as error:
+        print(f"json error: {error}")
+        print(f"Secrets file {Path(fn).resolve()} not recognized as JSON.")
+        pass
+
     # YAML.
-    with open(fn, "r") as f:
-        try:
-            yaml = YAML(typ="safe")
-            yaml.load(f)
-            print(f"Secrets file {Path(fn).resolve()} recognized as YAML.")
-            return True
-        except YAMLError as error:
-            print(f"yaml error: {error}")
-            print(f"Secrets file {Path(fn).resolve()} not recognized as YAML.")
-            pass
+    try:
+        yaml = YAML(typ="safe")
+        yaml.load(text)
+        print(f"Secrets file {Path(fn).resolve()} recognized as YAML.")
+        return True
+    except YAMLError as error:
+        print(f"yaml error: {error}")
+        print(f"Secrets file {Path(fn).resolve()} not recognized as YAML.")
+        pass
 
     # BespON.
-    with open(fn, "r") as f:
-        try:
-            bespon.load(f)
-            print(f"Secrets file {Path(fn).resolve()} recognized as BespON.")
-            return True
-        except bespon.erring.DecodingException as error:
-            print(f"bespon error: {error}")
-            print(f"Secrets file {Path(fn).resolve()} not recognized as BespON.")
-            pass
+    try:
+        bespon.loads(text)
+        print(f"Secrets file {Path(fn).resolve()} recognized as BespON.")
+        return True
+    except bespon.erring.DecodingException as error:
+        print(f"bespon error: {error}")
+        print(f"Secrets file {Path(fn).resolve()} not recognized as BespON.")
+        pass
 
     raise ImproperlyConfigured(
         f"Configuration file {Path(fn).resolve()} is not a recognized format."
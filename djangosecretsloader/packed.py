@@ -0,0 +1,266 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Encode and decode MessagePack secrets files.
+
+The ``msgpack`` package is used if it is installed, and otherwise a
+pure Python implementation of the subset of MessagePack needed for
+configuration:  nil, booleans, integers, floats, strings, binary,
+arrays, and maps.  Extension types are not supported.
+
+A secrets file is a MessagePack map, so it is recognized by its first
+byte, which is never the first byte of a UTF-8 encoded text format
+other than as an unlikely non-ASCII character.
+"""
+
+import struct
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _is_msgpack(head):
+    """Determine if ``head``, the start of a file, is a MessagePack map."""
+    return bool(head) and (0x80 <= head[0] <= 0x8F or head[0] in (0xDE, 0xDF))
+
+
+def _pack(config):
+    """Encode ``config`` as MessagePack.
+
+    Values that MessagePack cannot represent are encoded as strings.
+
+    Parameters
+    ----------
+    config : dict
+        The configuration dict.
+
+    Returns
+    -------
+    bytes
+        The encoded configuration.
+    """
+    if msgpack is not None:
+        return msgpack.packb(config, default=_default, use_bin_type=True)
+
+    parts = []
+    _pack_value(config, parts)
+
+    return b"".join(parts)
+
+
+def _unpack(data):
+    """Decode a MessagePack configuration.
+
+    Parameters
+    ----------
+    data : bytes
+        The encoded configuration.
+
+    Returns
+    -------
+    dict
+        The configuration.
+
+    Raises
+    ------
+    ValueError
+        Raises a ``ValueError`` if ``data`` is not a single MessagePack
+        map.
+    """
+    if msgpack is not None:
+        try:
+            config = msgpack.unpackb(data, raw=False, strict_map_key=False)
+        except (msgpack.UnpackException, ValueError, TypeError) as error:
+            raise ValueError(f"invalid MessagePack:  {error}")
+    else:
+        try:
+            config, offset = _unpack_value(data, 0)
+        except (
+            IndexError,
+            TypeError,
+            struct.error,
+            UnicodeDecodeError,
+            RecursionError,
+        ):
+            raise ValueError("invalid MessagePack:  truncated or malformed data")
+        if offset != len(data):
+            raise ValueError("invalid MessagePack:  extra data")
+
+    if not isinstance(config, dict):
+        raise ValueError("invalid MessagePack:  not a map")
+
+    return config
+
+
+def _default(value):
+    """Encode values MessagePack cannot represent as strings."""
+    if isinstance(value, memoryview):
+        return bytes(value)
+
+    return str(value)
+
+
+def _pack_value(value, parts):
+    """Append the MessagePack encoding of ``value`` to ``parts``."""
+    if value is None:
+        parts.append(b"\xc0")
+    elif value is True:
+        parts.append(b"\xc3")
+    elif value is False:
+        parts.append(b"\xc2")
+    elif isinstance(value, int):
+        parts.append(_pack_int(value))
+    elif isinstance(value, float):
+        parts.append(struct.pack(">Bd", 0xCB, value))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        parts.append(_pack_length(len(data), 0xA0, 31, (0xD9, 0xDA, 0xDB)))
+        parts.append(data)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        parts.append(_pack_length(len(data), None, 0, (0xC4, 0xC5, 0xC6)))
+        parts.append(data)
+    elif isinstance(value, (list, tuple)):
+        parts.append(_pack_length(len(value), 0x90, 15, (None, 0xDC, 0xDD)))
+        for item in value:
+            _pack_value(item, parts)
+    elif isinstance(value, dict):
+        parts.append(_pack_length(len(value), 0x80, 15, (None, 0xDE, 0xDF)))
+        for k, v in value.items():
+            _pack_value(k, parts)
+            _pack_value(v, parts)
+    else:
+        _pack_value(_default(value), parts)
+
+
+def _pack_int(value):
+    """Encode an integer in its smallest MessagePack form."""
+    if 0 <= value <= 0x7F:
+        return struct.pack(">B", value)
+    elif -32 <= value < 0:
+        return struct.pack(">b", value)
+    elif 0 <= value <= 0xFF:
+        return struct.pack(">BB", 0xCC, value)
+    elif 0 <= value <= 0xFFFF:
+        return struct.pack(">BH", 0xCD, value)
+    elif 0 <= value <= 0xFFFFFFFF:
+        return struct.pack(">BI", 0xCE, value)
+    elif 0 <= value <= 0xFFFFFFFFFFFFFFFF:
+        return struct.pack(">BQ", 0xCF, value)
+    elif -0x80 <= value < 0:
+        return struct.pack(">Bb", 0xD0, value)
+    elif -0x8000 <= value < 0:
+        return struct.pack(">Bh", 0xD1, value)
+    elif -0x80000000 <= value < 0:
+        return struct.pack(">Bi", 0xD2, value)
+    elif -0x8000000000000000 <= value < 0:
+        return struct.pack(">Bq", 0xD3, value)
+
+    raise OverflowError(f"integer {value} is too large for MessagePack")
+
+
+def _pack_length(length, fix, fix_max, types):
+    """Encode the type and length of a string, binary, array, or map.
+
+    ``fix`` is the fixed type with the length in its low bits, for
+    lengths up to ``fix_max``, and ``types`` are the types with 8, 16,
+    and 32 bit lengths, or ``None`` where the type does not exist.
+    """
+    if fix is not None and length <= fix_max:
+        return struct.pack(">B", fix | length)
+    elif types[0] is not None and length <= 0xFF:
+        return struct.pack(">BB", types[0], length)
+    elif length <= 0xFFFF:
+        return struct.pack(">BH", types[1], length)
+
+    return struct.pack(">BI", types[2], length)
+
+
+# Fixed size types:  type byte to (struct format, size).
+_FIXED = {
+    0xCA: (">f", 4),
+    0xCB: (">d", 8),
+    0xCC: (">B", 1),
+    0xCD: (">H", 2),
+    0xCE: (">I", 4),
+    0xCF: (">Q", 8),
+    0xD0: (">b", 1),
+    0xD1: (">h", 2),
+    0xD2: (">i", 4),
+    0xD3: (">q", 8),
+}
+
+# Variable length types:  type byte to (kind, length struct format).
+_SIZED = {
+    0xC4: ("bin", ">B"),
+    0xC5: ("bin", ">H"),
+    0xC6: ("bin", ">I"),
+    0xD9: ("str", ">B"),
+    0xDA: ("str", ">H"),
+    0xDB: ("str", ">I"),
+    0xDC: ("array", ">H"),
+    0xDD: ("array", ">I"),
+    0xDE: ("map", ">H"),
+    0xDF: ("map", ">I"),
+}
+
+
+def _unpack_value(data, offset):
+    """Decode the value at ``offset``, returning it and the next offset."""
+    byte = data[offset]
+    offset += 1
+
+    if byte <= 0x7F:
+        return byte, offset
+    elif byte >= 0xE0:
+        return byte - 0x100, offset
+    elif byte <= 0x8F:
+        kind, length = "map", byte & 0x0F
+    elif byte <= 0x9F:
+        kind, length = "array", byte & 0x0F
+    elif byte <= 0xBF:
+        kind, length = "str", byte & 0x1F
+    elif byte == 0xC0:
+        return None, offset
+    elif byte == 0xC2:
+        return False, offset
+    elif byte == 0xC3:
+        return True, offset
+    elif byte in _FIXED:
+        fmt, size = _FIXED[byte]
+        return struct.unpack_from(fmt, data, offset)[0], offset + size
+    elif byte in _SIZED:
+        kind, fmt = _SIZED[byte]
+        (length,) = struct.unpack_from(fmt, data, offset)
+        offset += struct.calcsize(fmt)
+    else:
+        raise ValueError(f"unsupported MessagePack type 0x{byte:02x}")
+
+    if kind in ("str", "bin"):
+        end = offset + length
+        if end > len(data):
+            raise IndexError(offset)
+        value = data[offset:end]
+        return (str(value, "utf-8") if kind == "str" else bytes(value)), end
+    elif kind == "array":
+        items = []
+        for _ in range(length):
+            item, offset = _unpack_value(data, offset)
+            items.append(item)
+        return items, offset
+
+    mapping = {}
+    for _ in range(length):
+        key, offset = _unpack_value(data, offset)
+        mapping[key], offset = _unpack_value(data, offset)
+
+    return mapping, offset
@@ -0,0 +1,202 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Defer secrets until they are used.
+
+A value of ``{"$ref": "scheme:target"}``, or a string of
+``ref+scheme://target``, is a reference to a secret stored elsewhere.
+References, and encrypted ``ENC[...]`` values, are replaced by lazy
+strings, which resolve their secret when first used and memoize it,
+so that settings may name secrets the process never reads without
+paying to load or decrypt them.
+"""
+
+import os
+import re
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.functional import lazy
+
+# Key of a reference dict.
+_REF_KEY = "$ref"
+
+# Prefix of a reference string.
+_REF_PREFIX = "ref+"
+
+# Prefix of an encrypted value, and an encrypted value:  version, salt,
+# nonce, and ciphertext with its tag.
+_ENC_PREFIX = "ENC["
+_ENCRYPTED = re.compile(
+    r"ENC\[(v1):([A-Za-z0-9_-]+):([A-Za-z0-9_-]+):([A-Za-z0-9_-]+)\]"
+)
+
+# Resolved references by scheme and target.
+_RESOLVED = {}
+_RESOLVED_LOCK = threading.Lock()
+
+
+def _resolve_file(target):
+    """Read the secret in the file ``target``."""
+    try:
+        with open(target, "r") as file:
+            return file.read().rstrip("\r\n")
+    except OSError as error:
+        raise ImproperlyConfigured(f"Secret reference {target} failed:  {error}")
+
+
+def _resolve_env(target):
+    """Read the secret in the environment variable ``target``."""
+    try:
+        return os.environ[target]
+    except KeyError:
+        raise ImproperlyConfigured(f"Secret reference {target} is not set.")
+
+
+def _resolve_encrypted(target):
+    """Decrypt the encrypted value ``target``."""
+    from .encryption import decrypt_value
+
+    return decrypt_value(target)
+
+
+_RESOLVERS = {
+    "file": _resolve_file,
+    "env": _resolve_env,
+    "enc": _resolve_encrypted,
+}
+
+
+def resolve_reference(scheme, target):
+    """Resolve and memoize a secret reference.
+
+    Parameters
+    ----------
+    scheme : str
+        The reference scheme, ``file``, ``env``, or ``enc``.
+    target : str
+        The file path, environment variable name, or encrypted value.
+
+    Returns
+    -------
+    str
+        The referenced secret.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if the secret
+        cannot be read or decrypted.
+    """
+    key = (scheme, target)
+    try:
+        return _RESOLVED[key]
+    except KeyError:
+        pass
+
+    with _RESOLVED_LOCK:
+        if key not in _RESOLVED:
+            _RESOLVED[key] = _RESOLVERS[scheme](target)
+
+        return _RESOLVED[key]
+
+
+_deferred = lazy(resolve_reference, str)
+
+# The lazy string class of references.
+_Reference = type(_deferred("env", ""))
+
+
+def _parse_reference(value):
+    """Return the scheme and target of a reference, or ``None``."""
+    if isinstance(value, dict):
+        if len(value) != 1 or not isinstance(value.get(_REF_KEY), str):
+            return None
+        reference = value[_REF_KEY]
+    elif isinstance(value, str) and value.startswith(_REF_PREFIX):
+        reference = value.removeprefix(_REF_PREFIX)
+    elif (
+        isinstance(value, str)
+        and value.startswith(_ENC_PREFIX)
+        and _ENCRYPTED.fullmatch(value)
+    ):
+        return "enc", value
+    else:
+        return None
+
+    scheme, sep, target = reference.partition(":")
+    if not sep or scheme not in _RESOLVERS:
+        raise ImproperlyConfigured(f"Secret reference {reference} is not supported.")
+    if target.startswith("//"):
+        target = target[2:]
+
+    return scheme, target
+
+
+def _defer_references(value):
+    """Replace references and encrypted values with lazy strings.
+
+    Parameters
+    ----------
+    value : object
+        A configuration value, possibly a dict or list of values.
+
+    Returns
+    -------
+    object
+        ``value``, or a copy with each reference and encrypted value
+        replaced by a lazy string if it has any.  Only the dicts and
+        lists holding references are copied.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if a reference
+        has an unsupported scheme.
+    """
+    reference = _parse_reference(value)
+    if reference is not None:
+        return _deferred(*reference)
+    elif isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return value
+
+    copy = None
+    for k, v in items:
+        deferred = _defer_references(v)
+        if deferred is not v:
+            if copy is None:
+                copy = value.copy()
+            copy[k] = deferred
+
+    return value if copy is None else copy
+
+
+def _restore_references(value):
+    """Replace the lazy strings in ``value`` with reference strings.
+
+    Secrets are not resolved, so that configurations may be dumped or
+    passed to other processes without reading them.  Encrypted values
+    are restored as they were.
+    """
+    if isinstance(value, _Reference):
+        scheme, target = value._args
+        if scheme == "enc":
+            return target
+        return f"{_REF_PREFIX}{scheme}://{target}"
+    elif isinstance(value, dict):
+        return {k: _restore_references(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [_restore_references(v) for v in value]
+
+    return value
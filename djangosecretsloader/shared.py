@@ -0,0 +1,377 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Share loaded secrets between processes.
+
+Publish a loaded configuration into shared memory once, in a master
+process, and attach to it from worker processes, which decode values
+lazily as they are accessed.
+
+Each publication writes a new, immutable data segment named
+``{name}-{generation}`` and then advances the generation stored in
+the pointer segment ``{name}``, so readers always see a complete
+configuration.  Publishers lock the pointer segment, so concurrent
+publications are serialized, and segments owned by other users are
+never trusted.
+"""
+
+import json
+import os
+import struct
+import time
+from collections.abc import Mapping
+from multiprocessing import resource_tracker
+from multiprocessing import shared_memory
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .refs import _defer_references
+from .refs import _restore_references
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Pointer segment:  magic and current generation.
+_POINTER = struct.Struct("!4sQ")
+_POINTER_MAGIC = b"DSLP"
+
+# Data segment:  magic, version, generation, source length, key
+# count, followed by the source (the prefix, filename, and profile as
+# JSON) and an index of (key length, key, value offset, value length)
+# entries, followed by the values.
+_HEADER = struct.Struct("!4sHQHI")
+_HEADER_MAGIC = b"DSLS"
+_HEADER_VERSION = 2
+_ENTRY = struct.Struct("!H")
+_SPAN = struct.Struct("!II")
+
+# Attempts to attach while a publisher is replacing segments, and the
+# seconds between attempts.
+_ATTACH_ATTEMPTS = 5
+_ATTACH_DELAY = 0.01
+
+
+def publish_secrets(
+    secrets, name="django-loader", prefix="DJANGO_ENV_", fn=None, profile=None
+):
+    """Publish ``secrets`` into shared memory.
+
+    Serialize each top level value of ``secrets`` as JSON into a new
+    data segment, point ``name`` at it, and unlink the previous data
+    segment.  Processes already attached to the previous segment keep
+    their mapping.  Segments persist until ``unlink_secrets()`` is
+    called.
+
+    Parameters
+    ----------
+    secrets : dict
+        The loaded configuration.
+    name : str, optional
+        Name of the pointer segment.
+    prefix : str, optional
+        Prefix for environment variables used to load ``secrets``.
+    fn : str, optional
+        Absolute filename ``secrets`` were loaded from.
+        ``load_secrets()`` only attaches to secrets loaded from its
+        own file.
+    profile : str, optional
+        Profile used to load ``secrets``.
+
+    Returns
+    -------
+    int
+        The generation of the published segment.
+
+    Raises
+    ------
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if the pointer
+        segment is not valid or is owned by another user.
+    """
+    try:
+        pointer = _create(name, _POINTER.size)
+    except FileExistsError:
+        pointer = _open(name)
+
+    try:
+        if fcntl is not None:
+            fcntl.flock(pointer._fd, fcntl.LOCK_EX)
+
+        # A new pointer is zero filled until its first publication.
+        previous = _read_pointer(pointer, name) or 0
+        generation = previous + 1
+
+        source = {"prefix": prefix, "fn": fn, "profile": profile}
+        data = _serialize(_restore_references(secrets), source, generation)
+        try:
+            segment = _create(f"{name}-{generation}", len(data))
+        except FileExistsError:
+            # Left by a publisher that exited before advancing the
+            # pointer.
+            _unlink(f"{name}-{generation}")
+            segment = _create(f"{name}-{generation}", len(data))
+        segment.buf[: len(data)] = data
+        segment.close()
+
+        # Point readers at the new generation.
+        _POINTER.pack_into(pointer.buf, 0, _POINTER_MAGIC, generation)
+        _unlink(f"{name}-{previous}")
+    finally:
+        pointer.close()
+
+    return generation
+
+
+def attach_secrets(name="django-loader"):
+    """Attach to secrets published by ``publish_secrets()``.
+
+    Parameters
+    ----------
+    name : str, optional
+        Name of the pointer segment.
+
+    Returns
+    -------
+    SharedSecrets
+        A read only mapping of the published configuration.
+
+    Raises
+    ------
+    FileNotFoundError
+        Raises a ``FileNotFoundError`` if nothing is published as
+        ``name`` yet.
+    django.core.exceptions.ImproperlyConfigured
+        Raises an ``ImproperlyConfigured`` exception if the segments
+        are not valid or are owned by another user.
+    """
+    for attempt in range(_ATTACH_ATTEMPTS):
+        if attempt:
+            time.sleep(_ATTACH_DELAY)
+
+        pointer = _open(name)
+        try:
+            generation = _read_pointer(pointer, name)
+        finally:
+            pointer.close()
+        if generation is None:
+            # Created, but not yet published.
+            continue
+
+        try:
+            return SharedSecrets(name, _open(f"{name}-{generation}"))
+        except FileNotFoundError:
+            # Replaced between reading the pointer and attaching.
+            continue
+
+    if generation is None:
+        raise FileNotFoundError(f"Shared secrets {name} are not published yet.")
+
+    raise ImproperlyConfigured(f"Shared secrets {name} are changing too quickly.")
+
+
+def unlink_secrets(name="django-loader"):
+    """Remove secrets published as ``name`` from shared memory.
+
+    Parameters
+    ----------
+    name : str, optional
+        Name of the pointer segment.
+    """
+    try:
+        pointer = _open(name)
+    except FileNotFoundError:
+        return
+
+    try:
+        generation = _read_pointer(pointer, name)
+    finally:
+        pointer.close()
+
+    if generation is not None:
+        _unlink(f"{name}-{generation}")
+    _unlink(name)
+
+
+class SharedSecrets(Mapping):
+    """A read only mapping of secrets in shared memory.
+
+    Values are decoded from the shared segment on first access and
+    memoized in the attached process.
+    """
+
+    def __init__(self, name, segment):
+        """Index the attached ``segment``."""
+        self.name = name
+        self._segment = segment
+        self._values = {}
+        (
+            magic,
+            version,
+            self.generation,
+            source_length,
+            count,
+        ) = _HEADER.unpack_from(segment.buf, 0)
+
+        if magic != _HEADER_MAGIC or version != _HEADER_VERSION:
+            raise ImproperlyConfigured(f"Shared secrets {name} are not valid.")
+
+        offset = _HEADER.size
+        source = json.loads(bytes(segment.buf[offset : offset + source_length]))
+        self.prefix = source["prefix"]
+        self.fn = source["fn"]
+        self.profile = source["profile"]
+        offset += source_length
+
+        self._index = {}
+        for _ in range(count):
+            (length,) = _ENTRY.unpack_from(segment.buf, offset)
+            offset += _ENTRY.size
+            key = bytes(segment.buf[offset : offset + length]).decode()
+            offset += length
+            self._index[key] = _SPAN.unpack_from(segment.buf, offset)
+            offset += _SPAN.size
+
+    def __getitem__(self, key):
+        """Decode and memoize the value of ``key``."""
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+
+        offset, length = self._index[key]
+        value = _defer_references(
+            json.loads(bytes(self._segment.buf[offset : offset + length]))
+        )
+        self._values[key] = value
+
+        return value
+
+    def __iter__(self):
+        """Iterate over the keys without decoding values."""
+        return iter(self._index)
+
+    def __len__(self):
+        """Count the keys."""
+        return len(self._index)
+
+    def __contains__(self, key):
+        """Check for ``key`` without decoding its value."""
+        return key in self._index
+
+    def is_current(self):
+        """Determine if this is the most recently published generation.
+
+        Returns
+        -------
+        bool
+            ``True`` if no newer generation has been published.
+        """
+        try:
+            pointer = _open(self.name)
+        except FileNotFoundError:
+            return False
+
+        try:
+            return _read_pointer(pointer, self.name) == self.generation
+        finally:
+            pointer.close()
+
+    def close(self):
+        """Detach from the shared segment."""
+        self._segment.close()
+
+
+def _serialize(secrets, source, generation):
+    """Serialize ``secrets`` and their ``source`` into a data segment."""
+    source = json.dumps(source, separators=(",", ":")).encode()
+    keys = [str(k).encode() for k in secrets]
+    values = [
+        json.dumps(v, separators=(",", ":"), default=str).encode()
+        for v in secrets.values()
+    ]
+
+    # Values follow the header, source, and index.
+    offset = (
+        _HEADER.size
+        + len(source)
+        + sum(_ENTRY.size + len(k) + _SPAN.size for k in keys)
+    )
+
+    parts = [
+        _HEADER.pack(
+            _HEADER_MAGIC, _HEADER_VERSION, generation, len(source), len(keys)
+        ),
+        source,
+    ]
+    for key, value in zip(keys, values):
+        parts.append(_ENTRY.pack(len(key)))
+        parts.append(key)
+        parts.append(_SPAN.pack(offset, len(value)))
+        offset += len(value)
+    parts.extend(values)
+
+    return b"".join(parts)
+
+
+def _read_pointer(pointer, name):
+    """Read the current generation from a pointer segment.
+
+    Returns ``None`` if the pointer has been created but nothing has
+    been published to it yet.
+    """
+    magic, generation = _POINTER.unpack_from(pointer.buf, 0)
+    if magic == bytes(len(_POINTER_MAGIC)) and generation == 0:
+        return None
+    if magic != _POINTER_MAGIC:
+        raise ImproperlyConfigured(f"Shared secrets {name} are not valid.")
+
+    return generation
+
+
+def _create(name, size):
+    """Create a shared memory segment outliving this process."""
+    segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+    _untrack(segment)
+
+    return segment
+
+
+def _open(name):
+    """Attach to an existing shared memory segment owned by this user."""
+    segment = shared_memory.SharedMemory(name=name)
+    _untrack(segment)
+
+    if hasattr(os, "getuid") and os.fstat(segment._fd).st_uid != os.getuid():
+        segment.close()
+        raise ImproperlyConfigured(
+            f"Shared secrets segment {name} is owned by another user."
+        )
+
+    return segment
+
+
+def _unlink(name):
+    """Unlink a shared memory segment, if it exists."""
+    try:
+        segment = _open(name)
+    except FileNotFoundError:
+        return
+
+    segment.close()
+    # Track the segment again, since ``unlink()`` untracks it.
+    resource_tracker.register(segment._name, "shared_memory")
+    segment.unlink()
+
+
+def _untrack(segment):
+    """Keep the resource tracker from unlinking ``segment`` at exit."""
+    resource_tracker.unregister(segment._name, "shared_memory")
@@ -0,0 +1,146 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Asyncio loader tests."""
+
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+import djangosecretsloader as DSL
+
+
+class _SlowBackend(DSL.SecretsBackend):
+    """A backend taking ``delay`` seconds per fetch."""
+
+    def __init__(self, secrets, delay):
+        self.secrets = secrets
+        self.delay = delay
+
+    def get_many(self, keys=None):
+        time.sleep(self.delay)
+        return self.secrets
+
+
+def test_aload_secrets_matches_load_secrets(tmp_path, monkeypatch):
+    """Should load the same secrets as the synchronous loader."""
+    fn = tmp_path / "secrets.json"
+    fn.write_text('{"A": "file", "B": "file", "DB": {"HOST": "localhost"}}')
+    monkeypatch.setenv("DJANGO_ENV_B", "environment")
+    backends = [_SlowBackend({"A": "remote", "DB__PORT": "5432"}, 0)]
+
+    expected = DSL.load_secrets(str(fn), backends=backends, A="", B="", DB={})
+    actual = asyncio.run(
+        DSL.aload_secrets(str(fn), backends=backends, A="", B="", DB={})
+    )
+
+    assert actual == expected
+    assert actual == {
+        "A": "remote",
+        "B": "environment",
+        "DB": {"PORT": "5432"},
+    }
+
+
+def test_aload_secrets_concurrent(tmp_path):
+    """Should fetch backends concurrently."""
+    fn = tmp_path / "secrets.json"
+    fn.write_text("{}")
+    backends = [_SlowBackend({"A": "a"}, 0.2), _SlowBackend({"B": "b"}, 0.2)]
+
+    start = time.monotonic()
+    actual = asyncio.run(DSL.aload_secrets(str(fn), backends=backends))
+
+    assert actual == {"A": "a", "B": "b"}
+    assert time.monotonic() - start < 0.35
+
+
+def test_aload_secrets_shares_parse_cache(tmp_path, monkeypatch):
+    """Should reuse a file parsed by the synchronous loader."""
+    fn = tmp_path / "secrets.json"
+    fn.write_text('{"A": "file"}')
+    DSL.load_secrets(str(fn))
+
+    def fail(*args):
+        raise AssertionError("parsed twice")
+
+    monkeypatch.setattr(DSL.loader, "_parse_secrets", fail)
+
+    assert asyncio.run(DSL.aload_secrets(str(fn))) == {"A": "file"}
+
+
+def test_aload_secrets_environment_off_loop(tmp_path, monkeypatch):
+    """Should load the environment and finish in the executor."""
+    fn = tmp_path / "secrets.json"
+    fn.write_text('{"A": "file"}')
+    (tmp_path / "b").write_text("s3cret\n")
+    monkeypatch.setenv("DJANGO_LOADER_FILE_SUFFIX", "_FILE")
+    monkeypatch.setenv("DJANGO_ENV_B_FILE", str(tmp_path / "b"))
+    threads = []
+
+    def record(function):
+        def recorded(*args):
+            threads.append(threading.current_thread())
+            return function(*args)
+
+        return recorded
+
+    monkeypatch.setattr(
+        DSL.aio,
+        "_load_secrets_environment",
+        record(DSL.loader._load_secrets_environment),
+    )
+    monkeypatch.setattr(DSL.aio, "_finish_secrets", record(DSL.loader._finish_secrets))
+
+    actual = asyncio.run(DSL.aload_secrets(str(fn), A="", B=""))
+
+    assert actual == {"A": "file", "B": "s3cret"}
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+
+def test_aload_secrets_timeout(tmp_path):
+    """Should raise when the sources take too long."""
+    fn = tmp_path / "secrets.json"
+    fn.write_text("{}")
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(
+            DSL.aload_secrets(str(fn), backends=[_SlowBackend({}, 0.5)], timeout=0.05)
+        )
+
+
+def test_aload_secrets_backend_failure(tmp_path):
+    """Should raise if a backend fails."""
+    fn = tmp_path / "secrets.json"
+    fn.write_text("{}")
+
+    with DSL.LocalSecretsServer({}, token="t0ken") as remote:
+        backend = DSL.HTTPBackend(f"{remote.url}/secrets", token="wrong")
+
+        with pytest.raises(ImproperlyConfigured):
+            asyncio.run(DSL.aload_secrets(str(fn), backends=[backend]))
+
+
+def test_aload_secrets_lazy():
+    """Should not import asyncio until ``aload_secrets`` is used."""
+    code = (
+        "import sys, djangosecretsloader as DSL\n"
+        "assert 'asyncio' not in sys.modules\n"
+        "assert DSL.aload_secrets.__module__ == 'djangosecretsloader.aio'\n"
+        "assert 'asyncio' in sys.modules\n"
+    )
+
+    subprocess.run([sys.executable, "-c", code], check=True)
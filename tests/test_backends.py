@@ -0,0 +1,120 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Remote backend tests."""
+
+import subprocess
+import sys
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+import djangosecretsloader as DSL
+
+SECRETS = {
+    "SECRET_KEY": "remote",
+    "DB__HOST": "db.example.com",
+    "DB__PORT": "5432",
+    "OTHER": "other",
+}
+
+
+@pytest.fixture
+def remote():
+    """Run a local stand-in secrets service."""
+    with DSL.LocalSecretsServer(SECRETS, token="t0ken") as server:
+        yield server
+
+
+def test_http_backend_get_many(remote):
+    """Should fetch all or some keys, reusing one connection."""
+    backend = DSL.HTTPBackend(f"{remote.url}/secrets", token="t0ken")
+
+    assert backend.get_many() == SECRETS
+    assert backend.get_many(["DB"]) == {
+        "DB__HOST": "db.example.com",
+        "DB__PORT": "5432",
+    }
+    assert remote.requests == 2
+    assert remote.connections == 1
+
+    backend.close()
+
+
+def test_vault_backend_get_many(remote):
+    """Should fetch keys from a KV engine path."""
+    backend = DSL.VaultBackend(remote.url, "app/config", token="t0ken")
+
+    assert backend.get_many(["SECRET_KEY"]) == {"SECRET_KEY": "remote"}
+
+    backend.close()
+
+
+def test_fetch_backends_precedence(remote):
+    """Should let later backends override earlier ones."""
+    with DSL.LocalSecretsServer({"SECRET_KEY": "second"}) as other:
+        backends = [
+            DSL.HTTPBackend(f"{remote.url}/secrets", token="t0ken"),
+            DSL.HTTPBackend(f"{other.url}/secrets"),
+        ]
+
+        assert DSL.fetch_backends(backends, ["SECRET_KEY"]) == {"SECRET_KEY": "second"}
+
+
+def test_secrets_backend_abstract():
+    """Should require subclasses to implement ``get_many()``."""
+    with pytest.raises(TypeError):
+        DSL.SecretsBackend()
+
+    class Incomplete(DSL.SecretsBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_fetch_backends_failure(remote):
+    """Should raise if a backend fails."""
+    backend = DSL.HTTPBackend(f"{remote.url}/secrets", token="wrong")
+
+    with pytest.raises(ImproperlyConfigured):
+        DSL.fetch_backends([backend])
+
+
+def test_load_secrets_backends(remote, fs, monkeypatch):
+    """Should merge remote values between the file and environment."""
+    fs.create_file(".env", contents="SECRET_KEY=file\nDEBUG=file\n")
+    monkeypatch.setenv("DJANGO_ENV_DEBUG", "environment")
+    backend = DSL.HTTPBackend(f"{remote.url}/secrets", token="t0ken")
+
+    actual = DSL.load_secrets(backends=[backend], SECRET_KEY="", DEBUG="", DB={})
+    expected = {
+        "SECRET_KEY": "remote",
+        "DEBUG": "environment",
+        "DB": {
+            "HOST": "db.example.com",
+            "PORT": "5432",
+        },
+    }
+
+    assert actual == expected
+
+
+def test_backends_lazy():
+    """Should not import the backends until they are used."""
+    code = (
+        "import sys, djangosecretsloader as DSL\n"
+        "heavy = {'http.client', 'http.server', 'queue', 'concurrent.futures'}\n"
+        "assert not heavy & set(sys.modules), heavy & set(sys.modules)\n"
+        "assert DSL.SecretsBackend.__module__ == 'djangosecretsloader.backends'\n"
+        "assert DSL.CachedBackend and DSL.load_secrets_many\n"
+    )
+
+    subprocess.run([sys.executable, "-c", code], check=True)
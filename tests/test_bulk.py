@@ -0,0 +1,132 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Multi-tenant loading tests."""
+
+import json
+
+import pytest
+
+import djangosecretsloader as DSL
+from djangosecretsloader import loader
+
+BASE = {
+    "DEBUG": False,
+    "DB": {
+        "default": {"HOST": "db", "PORT": 5432, "OPTIONS": {"sslmode": "require"}},
+        "replica": {"HOST": "replica"},
+    },
+    "CACHES": {"default": {"LOCATION": "redis://cache"}},
+}
+
+OVERLAYS = {
+    "acme": {"DB": {"default": {"NAME": "acme"}}, "TENANT": "acme"},
+    "globex": {"DB": {"default": {"NAME": "globex", "HOST": "db"}}, "DEBUG": True},
+}
+
+
+@pytest.fixture
+def tenants(tmp_path):
+    """Write the base and overlay files."""
+    (tmp_path / "base.json").write_text(json.dumps(BASE))
+    overlays = {}
+    for name, overlay in OVERLAYS.items():
+        overlays[name] = str(tmp_path / f"{name}.json")
+        (tmp_path / f"{name}.json").write_text(json.dumps(overlay))
+
+    return str(tmp_path / "base.json"), overlays
+
+
+def _included(tmp_path, name):
+    """Load a tenant with ``load_secrets()`` and an include."""
+    fn = tmp_path / f"{name}.included.json"
+    fn.write_text(json.dumps({"_INCLUDE": "base.json", **OVERLAYS[name]}))
+
+    return DSL.load_secrets(str(fn))
+
+
+def test_load_secrets_many(tmp_path, tenants):
+    """Should load each tenant as an include of the base would."""
+    base, overlays = tenants
+
+    loaded = DSL.load_secrets_many(base, overlays)
+
+    assert loaded == {name: _included(tmp_path, name) for name in OVERLAYS}
+    assert loaded["acme"]["DB"]["default"]["NAME"] == "acme"
+    assert loaded["acme"]["DB"]["default"]["HOST"] == "db"
+    assert loaded["globex"]["DEBUG"] is True
+
+
+def test_load_secrets_many_shared(tenants):
+    """Should share unchanged subtrees, equal strings, and keys."""
+    base, overlays = tenants
+
+    acme, globex = DSL.load_secrets_many(base, overlays).values()
+
+    assert acme["CACHES"] is globex["CACHES"]
+    assert acme["DB"]["replica"] is globex["DB"]["replica"]
+    assert acme["DB"]["default"]["OPTIONS"] is globex["DB"]["default"]["OPTIONS"]
+    assert acme["DB"]["default"] is not globex["DB"]["default"]
+    assert acme["DB"]["default"]["HOST"] is globex["DB"]["default"]["HOST"]
+
+    acme_key = next(k for k in acme["DB"]["default"] if k == "NAME")
+    globex_key = next(k for k in globex["DB"]["default"] if k == "NAME")
+    assert acme_key is globex_key
+
+
+def test_load_secrets_many_list(tenants):
+    """Should name tenants by filename when given a list."""
+    base, overlays = tenants
+
+    loaded = DSL.load_secrets_many(base, list(overlays.values()))
+
+    assert loaded[overlays["acme"]]["TENANT"] == "acme"
+
+
+def test_load_secrets_many_layers(tmp_path, tenants, monkeypatch):
+    """Should apply the environment, interpolation, and defaults."""
+    base, overlays = tenants
+    (tmp_path / "acme.json").write_text(
+        json.dumps({"TENANT": "acme", "URL": "${TENANT}.example.com"})
+    )
+    monkeypatch.setenv("DJANGO_ENV_DEBUG", "true")
+    monkeypatch.setenv("DJANGO_ENV_TOKEN", "ref+env://UPSTREAM_TOKEN")
+    monkeypatch.setenv("UPSTREAM_TOKEN", "t0ken")
+
+    loaded = DSL.load_secrets_many(base, overlays, URL=None, DEBUG=False, TOKEN="")
+
+    assert loaded["acme"] == {
+        "URL": "acme.example.com",
+        "DEBUG": "true",
+        "TOKEN": "t0ken",
+    }
+    assert loaded["globex"] == {"URL": None, "DEBUG": "true", "TOKEN": "t0ken"}
+    assert isinstance(loaded["globex"]["TOKEN"], DSL.refs._Reference)
+
+
+def test_load_secrets_many_processes(tenants):
+    """Should parse overlays in a process pool."""
+    base, overlays = tenants
+
+    assert DSL.load_secrets_many(base, overlays, processes=2) == (
+        DSL.load_secrets_many(base, overlays)
+    )
+
+
+@pytest.mark.parametrize("processes", [None, 2])
+def test_load_secrets_many_uncached(tenants, processes):
+    """Should not retain the parses of the overlays."""
+    base, overlays = tenants
+
+    DSL.load_secrets_many(base, overlays, processes=processes)
+
+    cached = {key[0] for key in loader._PARSE_CACHE}
+    assert base in cached
+    assert not cached & set(overlays.values())
@@ -0,0 +1,162 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""TTL cache tests."""
+
+import threading
+
+import pytest
+
+import djangosecretsloader as DSL
+
+
+class _Clock:
+    """A settable clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Source:
+    """A counting source of values."""
+
+    def __init__(self):
+        self.calls = []
+        self.version = 1
+
+    def __call__(self, keys):
+        self.calls.append(list(keys))
+        return {k: f"{k}{self.version}" for k in keys if k != "MISSING"}
+
+
+def test_ttl_cache_hit_and_miss():
+    """Should fetch misses in one batch and count hits."""
+    source = _Source()
+    cache = DSL.TTLCache(source, ttl=10, clock=_Clock())
+
+    assert cache.get_many(["A", "B", "MISSING"]) == {"A": "A1", "B": "B1"}
+    assert cache.get_many(["A", "MISSING"]) == {"A": "A1"}
+    assert cache.get("MISSING", "default") == "default"
+    assert source.calls == [["A", "B", "MISSING"]]
+    assert cache.metrics() == {
+        "hits": 3,
+        "stale_hits": 0,
+        "misses": 3,
+        "fetches": 1,
+        "refreshes": 0,
+        "errors": 0,
+    }
+
+
+def test_ttl_cache_stale_while_revalidate():
+    """Should serve stale values while refreshing in the background."""
+    source = _Source()
+    clock = _Clock()
+    cache = DSL.TTLCache(source, ttl=10, jitter=0, clock=clock)
+
+    assert cache.get("A") == "A1"
+
+    source.version = 2
+    clock.now = 11
+
+    assert cache.get("A") == "A1"
+
+    cache._executor.shutdown(wait=True)
+
+    assert cache.get("A") == "A2"
+    assert cache.metrics()["refreshes"] == 1
+
+
+def test_ttl_cache_max_stale():
+    """Should fetch synchronously when too stale."""
+    source = _Source()
+    clock = _Clock()
+    cache = DSL.TTLCache(source, ttl=10, max_stale=5, jitter=0, clock=clock)
+
+    cache.get("A")
+    source.version = 2
+    clock.now = 16
+
+    assert cache.get("A") == "A2"
+    assert cache.metrics()["misses"] == 2
+
+
+def test_ttl_cache_jitter():
+    """Should shorten expiry by up to the jitter."""
+    cache = DSL.TTLCache(_Source(), ttl=100, jitter=0.5, clock=_Clock())
+    cache.get_many([str(i) for i in range(50)])
+
+    expiries = [entry[1] for entry in cache._entries.values()]
+
+    assert all(50 <= e <= 100 for e in expiries)
+    assert len(set(expiries)) > 1
+
+
+def test_ttl_cache_coalesces_misses():
+    """Should fetch a key once for concurrent misses."""
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch(keys):
+        calls.append(keys)
+        started.set()
+        release.wait(5)
+        return {k: "value" for k in keys}
+
+    cache = DSL.TTLCache(fetch)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get("A")))
+        for _ in range(5)
+    ]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [["A"]]
+    assert results == ["value"] * 5
+
+
+def test_ttl_cache_error():
+    """Should raise fetch errors for misses."""
+
+    def fetch(keys):
+        raise OSError("down")
+
+    cache = DSL.TTLCache(fetch)
+
+    with pytest.raises(OSError):
+        cache.get("A")
+
+    assert cache.metrics()["errors"] == 1
+
+
+def test_cached_backend():
+    """Should cache a backend by top level key."""
+    secrets = {"DB__HOST": "localhost", "DB__PORT": "5432", "KEY": "k"}
+    with DSL.LocalSecretsServer(secrets) as remote:
+        backend = DSL.CachedBackend(DSL.HTTPBackend(f"{remote.url}/secrets"))
+
+        assert backend.get_many(["DB"]) == {"DB__HOST": "localhost", "DB__PORT": "5432"}
+        assert backend.get_many(["DB", "KEY"]) == secrets
+        assert backend.get_many(["DB", "KEY"]) == secrets
+        assert backend.get_many() == secrets
+        assert remote.requests == 3
+        assert backend.metrics()["hits"] == 3
+
+        backend.close()
@@ -0,0 +1,80 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Compressed secrets file tests."""
+
+import gzip
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+import djangosecretsloader as DSL
+from djangosecretsloader import compressed
+
+SECRETS = {"A": "one", "B": {"C": "two\r\nthree"}}
+
+
+@pytest.mark.parametrize("fmt", ["TOML", "JSON", "YAML", "MSGPACK", "INDEXED"])
+@pytest.mark.parametrize(
+    "codec",
+    [
+        "gzip",
+        "xz",
+        pytest.param(
+            "zstd",
+            marks=pytest.mark.skipif(
+                compressed.zstd is None, reason="zstd is not available"
+            ),
+        ),
+    ],
+)
+def test_load_secrets_compressed(tmp_path, fmt, codec):
+    """Should decompress any format in memory."""
+    fn = tmp_path / "secrets"
+    fn.write_bytes(DSL.dump_secrets(fmt=f"{fmt}+{codec}", **SECRETS))
+
+    assert DSL.load_secrets(fn=str(fn)) == SECRETS
+    assert DSL._validate_file_format(str(fn))
+
+
+def test_load_secrets_compressed_dotenv(tmp_path):
+    """Should decode text as text files are decoded."""
+    fn = tmp_path / ".env.gz"
+    fn.write_bytes(gzip.compress(b"DJANGO_ENV_A=one\r\nDJANGO_ENV_B=two\r\n"))
+
+    assert DSL.load_secrets(fn=str(fn)) == {"A": "one", "B": "two"}
+
+
+def test_load_secrets_compressed_invalid(tmp_path):
+    """Should raise on corrupt compressed files."""
+    fn = tmp_path / "secrets.json.gz"
+    fn.write_bytes(gzip.compress(b'{"A": "one"}')[:-4])
+
+    with pytest.raises(ImproperlyConfigured):
+        DSL.load_secrets(fn=str(fn))
+
+
+def test_dump_secrets_compression_unsupported():
+    """Should raise on unsupported compression."""
+    with pytest.raises(ValueError):
+        DSL.dump_secrets(fmt="JSON+bzip2", A="one")
+
+
+def test_main_compress(tmp_path, monkeypatch):
+    """Should write compressed dumps."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "secrets.json").write_text('{"A": "one"}')
+
+    with pytest.raises(SystemExit):
+        DSL.main(["secrets.json", "-d", "JSON", "-z", "gzip", "-o", "out.gz"])
+
+    assert gzip.decompress((tmp_path / "out.gz").read_bytes()) == (
+        b'{\n  "A": "one"\n}'
+    )
@@ -0,0 +1,147 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Secrets server tests."""
+
+import errno
+import os
+import socket
+import stat
+import threading
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+import djangosecretsloader as DSL
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Serve a secrets file from a background thread."""
+    fn = tmp_path / "secrets.json"
+    fn.write_text('{"A": "one", "DB": {"HOST": "localhost"}}')
+    path = str(tmp_path / "dsl.sock")
+
+    server = DSL.SecretsServer(path, str(fn))
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+    DSL.daemon._FETCHED.clear()
+
+
+def test_fetch_secrets(server):
+    """Should fetch the served secrets."""
+    path = server.server_address
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert DSL.fetch_secrets(path) == {"A": "one", "DB": {"HOST": "localhost"}}
+
+
+def test_fetch_secrets_cached_and_reloaded(server):
+    """Should cache fetched secrets and reload changed files."""
+    path = server.server_address
+    DSL.fetch_secrets(path)
+
+    with open(server.fn, "w") as file:
+        file.write('{"A": "two"}')
+
+    assert DSL.fetch_secrets(path) == {"A": "one", "DB": {"HOST": "localhost"}}
+    assert DSL.fetch_secrets(path, refresh=True) == {"A": "two"}
+    assert server.generation == 2
+
+
+def test_fetch_secrets_include_reloaded(tmp_path):
+    """Should reload when an included file changes."""
+    (tmp_path / "common.json").write_text('{"B": "one"}')
+    fn = tmp_path / "secrets.json"
+    fn.write_text('{"_INCLUDE": "common.json", "A": "one"}')
+    server = DSL.SecretsServer(str(tmp_path / "dsl.sock"), str(fn))
+
+    assert server.generation == 1
+    server.refresh()
+    assert server.generation == 1
+
+    (tmp_path / "common.json").write_text('{"B": "two"}')
+    server.refresh()
+
+    assert server.generation == 2
+    assert b'"B":"two"' in server.refresh()
+
+    server.server_close()
+
+
+def test_server_socket_private(tmp_path, monkeypatch):
+    """Should bind the socket without ever exposing it."""
+    fn = tmp_path / "secrets.json"
+    fn.write_text('{"A": "one"}')
+    modes = []
+    bind = DSL.SecretsServer.server_bind
+
+    def server_bind(self):
+        bind(self)
+        modes.append(stat.S_IMODE(os.stat(self.server_address).st_mode))
+
+    monkeypatch.setattr(DSL.SecretsServer, "server_bind", server_bind)
+    umask = os.umask(0o022)
+    try:
+        server = DSL.SecretsServer(str(tmp_path / "dsl.sock"), str(fn))
+    finally:
+        assert os.umask(umask) == 0o022
+
+    assert modes == [0o600]
+
+    server.server_close()
+
+
+def test_server_socket_stale(server, tmp_path):
+    """Should replace a stale socket, but not a live one."""
+    with pytest.raises(OSError) as error:
+        DSL.SecretsServer(server.server_address, server.fn)
+
+    assert error.value.errno == errno.EADDRINUSE
+    assert DSL.fetch_secrets(server.server_address)["A"] == "one"
+
+    stale = str(tmp_path / "stale.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(stale)
+
+    replacement = DSL.SecretsServer(stale, server.fn)
+    replacement.server_close()
+
+
+def test_fetch_secrets_wrong_prefix(server):
+    """Should raise with a different prefix."""
+    with pytest.raises(ImproperlyConfigured):
+        DSL.fetch_secrets(server.server_address, prefix="OTHER_")
+
+
+def test_load_secrets_unix(server, monkeypatch):
+    """Should load served secrets under the client environment."""
+    monkeypatch.setenv("DJANGO_ENV_A", "environment")
+
+    actual = DSL.load_secrets(f"unix:{server.server_address}", A="", DB={})
+
+    assert actual == {"A": "environment", "DB": {"HOST": "localhost"}}
+
+
+def test_load_secrets_unix_fallback(tmp_path, monkeypatch):
+    """Should load the fallback file without a server."""
+    fn = tmp_path / "fallback.env"
+    fn.write_text("A=fallback\n")
+    monkeypatch.setenv("DJANGO_LOADER_FALLBACK_FILE", str(fn))
+
+    with pytest.warns(UserWarning):
+        actual = DSL.load_secrets(f"unix:{tmp_path / 'missing.sock'}")
+
+    assert actual == {"A": "fallback"}
@@ -0,0 +1,78 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Secrets directory tests."""
+
+import os
+
+import djangosecretsloader as DSL
+
+
+def _mount(root, version, secrets):
+    """Write a Kubernetes-style secret volume version and swap to it."""
+    data = root / f"..{version}"
+    data.mkdir()
+    for name, value in secrets.items():
+        (data / name).write_text(value)
+        if not (root / name).is_symlink():
+            (root / name).symlink_to(os.path.join("..data", name))
+
+    link = root / "..data_tmp"
+    link.symlink_to(data.name)
+    os.replace(link, root / "..data")
+
+
+def test_load_secrets_directory(tmp_path):
+    """Should load one variable per file."""
+    (tmp_path / "SECRET_KEY").write_text("s3cret\n")
+    (tmp_path / "DJANGO_ENV_DB__HOST").write_text("localhost")
+    (tmp_path / "DB__PORT").write_text("5432")
+    (tmp_path / "HOSTS__JSON").write_text('["a", "b"]')
+    (tmp_path / ".hidden").write_text("ignored")
+    (tmp_path / "subdirectory").mkdir()
+
+    expected = {
+        "SECRET_KEY": "s3cret",
+        "DB": {
+            "HOST": "localhost",
+            "PORT": "5432",
+        },
+        "HOSTS": ["a", "b"],
+    }
+
+    assert DSL._load_secrets_directory(str(tmp_path)) == expected
+    assert DSL.load_secrets(str(tmp_path), SECRET_KEY="", DB={}) == {
+        "SECRET_KEY": "s3cret",
+        "DB": {
+            "HOST": "localhost",
+            "PORT": "5432",
+        },
+    }
+
+
+def test_load_secrets_directory_data_link(tmp_path):
+    """Should read the current version of a secret volume."""
+    _mount(tmp_path, 1, {"USER": "one", "PASSWORD": "one"})
+
+    assert DSL.load_secrets(str(tmp_path)) == {"USER": "one", "PASSWORD": "one"}
+
+    _mount(tmp_path, 2, {"USER": "two", "PASSWORD": "two"})
+
+    assert DSL.load_secrets(str(tmp_path)) == {"USER": "two", "PASSWORD": "two"}
+
+
+def test_load_secrets_directory_many(tmp_path):
+    """Should read many files in parallel."""
+    for i in range(100):
+        (tmp_path / f"KEYS__K{i}").write_text(str(i))
+
+    assert DSL._load_secrets_directory(str(tmp_path)) == {
+        "KEYS": {f"K{i}": str(i) for i in range(100)}
+    }
@@ -0,0 +1,194 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""dotenv tests."""
+
+from pathlib import Path
+
+import pytest
+
+import djangosecretsloader as DSL
+
+
+def test__parse_dotenv_quoting():
+    """Should parse unquoted, quoted, and commented values."""
+    text = r"""# A comment.
+
+export UNQUOTED=some value   # trailing comment
+SINGLE='literal \n $HOME'
+DOUBLE="tab\there \"quoted\""
+HASH=abc#def
+EMPTY=
+MULTI="one
+two"
+JOINED='it'\''s'
+"""
+
+    expected = {
+        "UNQUOTED": "some value",
+        "SINGLE": r"literal \n $HOME",
+        "DOUBLE": 'tab\there "quoted"',
+        "HASH": "abc#def",
+        "EMPTY": "",
+        "MULTI": "one\ntwo",
+        "JOINED": "it's",
+    }
+
+    assert DSL._parse_dotenv(text) == expected
+
+
+def test__parse_dotenv_bad_line():
+    """Should raise ``ValueError`` on a malformed line."""
+    with pytest.raises(ValueError):
+        DSL._parse_dotenv("GOOD=1\nnot a line\n")
+
+
+def test__parse_dotenv_unterminated_quote():
+    """Should raise ``ValueError`` on an unterminated quote."""
+    with pytest.raises(ValueError):
+        DSL._parse_dotenv("BAD='oops\n")
+
+
+def test__is_dotenv():
+    """Should only detect dotenv-shaped text."""
+    assert DSL._is_dotenv(".env", "# comment\nexport A=1\n")
+    assert DSL._is_dotenv(".env", "A=1")
+    assert not DSL._is_dotenv(".env", "A = 1")
+    assert not DSL._is_dotenv(".env", '{"A": 1}')
+    assert not DSL._is_dotenv("secrets.toml", "A=1")
+
+
+def test__load_secrets_file_dotenv(fs):
+    """Should load nested values from a dotenv file."""
+    fn = ".env"
+    fs.create_file(fn)
+    with open(fn, "w") as file:
+        file.write('DB__HOST=localhost\nDB__PORT="5432"\nHOSTS__0=a\nHOSTS__1=b\n')
+
+    expected = {
+        "DB": {
+            "HOST": "localhost",
+            "PORT": "5432",
+        },
+        "HOSTS": ["a", "b"],
+    }
+
+    assert DSL._load_secrets_file(fn) == expected
+
+
+def test__parse_dotenv_typed():
+    """Should convert unquoted TOML values to their types."""
+    text = """INT=5432
+NEGATIVE=-1_000  # comment
+FLOAT=0.5
+BOOL=false
+ARRAY=["a", 'b']
+TABLE={ port = 5432 }
+WORD=localhost
+QUOTED="5432"
+SINGLE='true'
+DASH=-
+VERSION=1.2.3
+LIST__JSON=[1, 2]
+"""
+
+    assert DSL._parse_dotenv(text) == {
+        "INT": 5432,
+        "NEGATIVE": -1000,
+        "FLOAT": 0.5,
+        "BOOL": False,
+        "ARRAY": ["a", "b"],
+        "TABLE": {"port": 5432},
+        "WORD": "localhost",
+        "QUOTED": "5432",
+        "SINGLE": "true",
+        "DASH": "-",
+        "VERSION": "1.2.3",
+        "LIST__JSON": "[1, 2]",
+    }
+
+
+def test__load_secrets_file_typed_toml(fs):
+    """Should load TOML without spaces around ``=`` with its types."""
+    fn = ".env"
+    fs.create_file(fn)
+    with open(fn, "w") as file:
+        file.write('ALLOWED_HOSTS=["a","b"]\nDEBUG=false\nDB={port=5432}\n')
+
+    assert DSL._load_secrets_file(fn) == {
+        "ALLOWED_HOSTS": ["a", "b"],
+        "DEBUG": False,
+        "DB": {"port": 5432},
+    }
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "DJANGO_ENV_DB__PORT=5432\nDJANGO_ENV_DEBUG=true\n",
+        'DB__PORT=5432\nDEBUG=true\nDB__NAME="x"\n',
+        "DB__PORT=5432\nDEBUG=true\nDB__NAME=x\n",
+    ],
+)
+def test__load_secrets_file_dotenv_toml_valid(fs, text):
+    """Should strip prefixes and nest names in TOML-valid dotenv files."""
+    fn = ".env"
+    fs.create_file(fn)
+    with open(fn, "w") as file:
+        file.write(text)
+
+    actual = DSL._load_secrets_file(fn)
+
+    assert actual["DB"]["PORT"] == 5432
+    assert actual["DEBUG"] is True
+    assert set(actual) == {"DB", "DEBUG"}
+
+
+def test__load_secrets_file_dotenv_not_toml(fs):
+    """Should type each value whatever the other lines hold."""
+    fn = ".env"
+    fs.create_file(fn)
+    with open(fn, "w") as file:
+        file.write("PORT=5432\nHOST=localhost\n")
+
+    assert DSL._load_secrets_file(fn) == {"PORT": 5432, "HOST": "localhost"}
+
+
+def test__load_secrets_file_dotenv_round_trip(fs):
+    """Should load the output of ``_dump_secrets_environment``."""
+    config = {
+        "BREAKFAST": "toast 'n' jam",
+        "FRUIT": ["apple", "banana"],
+        "FOOD": {
+            "FRUIT": {
+                "APPLE": "2",
+            },
+        },
+    }
+
+    fn = ".env"
+    fs.create_file(fn)
+    with open(fn, "w") as file:
+        file.write(DSL._dump_secrets_environment(config))
+
+    assert DSL._load_secrets_file(fn) == config
+
+
+def test__validate_file_format_valid_dotenv(fs, capsys):
+    """Should return ``True``."""
+    fn = ".env"
+    fs.create_file(fn)
+    with open(fn, "w") as file:
+        file.write("export A=1\n")
+
+    assert DSL._validate_file_format(fn) is True
+
+    out = capsys.readouterr().out
+    assert f"Secrets file {Path(fn).resolve()} recognized as dotenv." in out
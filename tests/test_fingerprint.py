@@ -0,0 +1,127 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Configuration fingerprint tests."""
+
+import copy
+import json
+
+import pytest
+
+import djangosecretsloader as DSL
+
+CONFIG = {
+    "DEBUG": False,
+    "PORT": 8000,
+    "RATIO": 0.5,
+    "KEY": b"\x00\xff",
+    "TOKEN": "ref+env://UPSTREAM_TOKEN",
+    "DB": {
+        "default": {"HOST": "localhost", "PASSWORD": {"$ref": "file:/run/pw"}},
+        "replica": {"HOST": "replica", "OPTIONS": None},
+    },
+    "HOSTS": ["a.example.com", {"NAME": "b.example.com"}],
+}
+
+
+def test_fingerprint_order_independent():
+    """Should hash equal configurations equally, in any order."""
+    reordered = {k: CONFIG[k] for k in reversed(CONFIG)}
+    reordered["DB"] = {"replica": CONFIG["DB"]["replica"], **CONFIG["DB"]}
+
+    assert DSL.SecretsFingerprint(CONFIG) == DSL.SecretsFingerprint(reordered)
+    assert hash(DSL.SecretsFingerprint(CONFIG)) == hash(
+        DSL.SecretsFingerprint(reordered)
+    )
+    assert len(DSL.SecretsFingerprint(CONFIG).hexdigest()) == 64
+
+
+@pytest.mark.parametrize(
+    "changed",
+    [
+        {"DEBUG": 0},
+        {"PORT": "8000"},
+        {"RATIO": 0.25},
+        {"KEY": "\x00\xff"},
+        {"TOKEN": "ref+env://OTHER"},
+        {"HOSTS": ["b.example.com", "a.example.com"]},
+    ],
+)
+def test_fingerprint_distinguishes(changed):
+    """Should distinguish values and types."""
+    assert DSL.SecretsFingerprint(CONFIG) != DSL.SecretsFingerprint(
+        {**CONFIG, **changed}
+    )
+
+
+def test_fingerprint_diff():
+    """Should report the innermost changed names."""
+    new = copy.deepcopy(CONFIG)
+    new["DB"]["replica"]["HOST"] = "replica2"
+    new["HOSTS"][1]["NAME"] = "c.example.com"
+    new["ADDED"] = 1
+    del new["PORT"]
+
+    old = DSL.SecretsFingerprint(CONFIG)
+
+    assert old.diff(DSL.SecretsFingerprint(new)) == {
+        "DB__replica__HOST",
+        "HOSTS__1__NAME",
+        "ADDED",
+        "PORT",
+    }
+    assert old.diff(DSL.SecretsFingerprint(copy.deepcopy(CONFIG))) == set()
+
+
+def test_fingerprint_references_unresolved(tmp_path, monkeypatch):
+    """Should hash loaded references without resolving them."""
+    fn = tmp_path / "secrets.json"
+    fn.write_text(json.dumps({"TOKEN": "ref+env://UPSTREAM_TOKEN"}))
+    monkeypatch.delenv("UPSTREAM_TOKEN", raising=False)
+
+    assert DSL.SecretsFingerprint(DSL.load_secrets(str(fn))) == DSL.SecretsFingerprint(
+        {"TOKEN": {"$ref": "env:UPSTREAM_TOKEN"}}
+    )
+
+
+def test_fingerprint_indexed(tmp_path):
+    """Should use the hashes stored in indexed snapshots."""
+    old = tmp_path / "old.dsl"
+    old.write_bytes(DSL.dump_secrets(fmt="INDEXED", **CONFIG))
+    new = tmp_path / "new.dsl"
+    changed = copy.deepcopy(CONFIG)
+    changed["DB"]["default"]["HOST"] = "db"
+    new.write_bytes(DSL.dump_secrets(fmt="INDEXED", **changed))
+
+    snapshot = DSL.open_secrets(str(old))
+    fingerprint = DSL.SecretsFingerprint(snapshot)
+
+    assert fingerprint == DSL.SecretsFingerprint(CONFIG)
+    assert snapshot._values == {}
+
+    assert fingerprint.diff(DSL.SecretsFingerprint(DSL.open_secrets(str(new)))) == {
+        "DB__default__HOST"
+    }
+    assert snapshot["DB"]["replica"]._values == {}
+
+
+def test_main_fingerprint(tmp_path, monkeypatch, capsys):
+    """Should print the fingerprint of the loaded secrets."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "secrets.json").write_text('{"A": "one", "B": [1, 2]}')
+
+    with pytest.raises(SystemExit) as exit:
+        DSL.main(["secrets.json", "--fingerprint"])
+
+    assert exit.value.code == 0
+    assert (
+        capsys.readouterr().out.strip()
+        == DSL.SecretsFingerprint({"B": [1, 2], "A": "one"}).hexdigest()
+    )
@@ -0,0 +1,105 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Generated module tests."""
+
+import os
+import stat
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+import djangosecretsloader as DSL
+
+
+@pytest.fixture
+def generated(tmp_path, monkeypatch):
+    """Compile a secrets file with an include."""
+    (tmp_path / "common.toml").write_text('[DB]\nHOST = "localhost"\nPORT = 5432\n')
+    fn = tmp_path / "secrets.json"
+    fn.write_text('{"_INCLUDE": "common.toml", "KEY": "${DB__HOST}", "B": "\\u0000"}')
+    module = tmp_path / "secrets_generated.py"
+    monkeypatch.setenv("DJANGO_LOADER_MODULE", str(module))
+    monkeypatch.delenv("DJANGO_LOADER_PROFILE", raising=False)
+
+    return str(fn), DSL.compile_secrets(str(module), fn=str(fn))
+
+
+def test_compile_secrets(generated):
+    """Should write and compile a private module."""
+    fn, compiled = generated
+    module = os.environ["DJANGO_LOADER_MODULE"]
+
+    assert stat.S_IMODE(os.stat(module).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(compiled).st_mode) == 0o600
+    assert DSL.generated._import(module).SECRETS == {
+        "DB": {"HOST": "localhost", "PORT": 5432},
+        "KEY": "${DB__HOST}",
+        "B": "\x00",
+    }
+
+
+def test_load_secrets_generated(generated, monkeypatch):
+    """Should import the module instead of parsing the file."""
+    fn, _ = generated
+    monkeypatch.setenv("DJANGO_ENV_B", "environment")
+    DSL.loader._PARSE_CACHE.clear()
+    DSL.loader._INCLUDE_CACHE.clear()
+
+    def _parse_secrets(*args):
+        raise AssertionError("parsed")
+
+    monkeypatch.setattr(DSL.loader, "_parse_secrets", _parse_secrets)
+
+    assert DSL.load_secrets(fn=fn, KEY="", B="", DB={}) == {
+        "KEY": "localhost",
+        "B": "environment",
+        "DB": {"HOST": "localhost", "PORT": 5432},
+    }
+
+
+def test_load_secrets_generated_references(generated):
+    """Should take the values referenced by the needed values."""
+    fn, _ = generated
+
+    assert DSL.load_secrets(fn=fn, KEY="") == {"KEY": "localhost"}
+
+
+def test_load_secrets_generated_out_of_date(generated, tmp_path):
+    """Should parse the file once an included file changes."""
+    fn, _ = generated
+    (tmp_path / "common.toml").write_text('[DB]\nHOST = "db.local"\n')
+
+    with pytest.warns(UserWarning, match="out of date"):
+        actual = DSL.load_secrets(fn=fn, KEY="")
+
+    assert actual == {"KEY": "db.local"}
+
+    with pytest.warns(UserWarning, match="out of date"):
+        with pytest.raises(ImproperlyConfigured):
+            DSL.load_secrets(fn=fn, profile="production", KEY="")
+
+
+def test_compile_secrets_directory(tmp_path):
+    """Should not compile directories."""
+    with pytest.raises(ImproperlyConfigured):
+        DSL.compile_secrets(str(tmp_path / "generated.py"), fn=str(tmp_path))
+
+
+def test_main_compile(tmp_path, monkeypatch, capsys):
+    """Should print the compiled bytecode filename."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".env").write_text("A=one\n")
+
+    with pytest.raises(SystemExit) as exit:
+        DSL.main(["--compile", "generated.py"])
+
+    assert exit.value.code == 0
+    assert os.path.isfile(capsys.readouterr().out.strip())
@@ -0,0 +1,108 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Include directive tests."""
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+import djangosecretsloader as DSL
+from djangosecretsloader import loader
+
+
+@pytest.fixture
+def fragments(tmp_path):
+    """Write shared fragments in several formats."""
+    common = tmp_path / "common"
+    common.mkdir()
+    (common / "db.toml").write_text(
+        '[DB]\nHOST = "db.local"\nPORT = 5432\nOPTIONS = {SSL = "require"}\n'
+    )
+    (common / "cache.yaml").write_text("CACHE:\n  LOCATION: redis://cache.local\n")
+    (common / "keys.env").write_text("SECRET_KEY=common\nDB__USER=app\n")
+
+    return tmp_path
+
+
+def test_include(fragments):
+    """Should deep merge included files under the including file."""
+    fn = fragments / "secrets.json"
+    fn.write_text(
+        '{"_INCLUDE": ["common/db.toml", "common/cache.yaml", "common/keys.env"],'
+        ' "DB": {"HOST": "db.example.com", "OPTIONS": {"TIMEOUT": 5}}}'
+    )
+    expected = {
+        "DB": {
+            "HOST": "db.example.com",
+            "PORT": 5432,
+            "USER": "app",
+            "OPTIONS": {"SSL": "require", "TIMEOUT": 5},
+        },
+        "CACHE": {"LOCATION": "redis://cache.local"},
+        "SECRET_KEY": "common",
+    }
+
+    assert DSL.load_secrets(str(fn)) == expected
+
+
+def test_include_nested_and_shared(fragments, monkeypatch):
+    """Should parse shared fragments once and reparse only changes."""
+    (fragments / "a.yaml").write_text("_INCLUDE: common/db.toml\nA: a\n")
+    (fragments / "b.env").write_text("_INCLUDE=a.yaml\nB=b\n")
+    (fragments / "c.toml").write_text('_INCLUDE = ["common/db.toml", "b.env"]\n')
+
+    parsed = []
+    parse = loader._parse_secrets
+
+    def counting(fn, text, prefix, profile, keys):
+        parsed.append(fn)
+        return parse(fn, text, prefix, profile, keys)
+
+    monkeypatch.setattr(loader, "_parse_secrets", counting)
+
+    actual = DSL._load_secrets_file(str(fragments / "c.toml"))
+
+    assert actual["A"] == "a"
+    assert actual["B"] == "b"
+    assert actual["DB"]["PORT"] == 5432
+    assert [p.rsplit("/", 1)[1] for p in parsed] == [
+        "c.toml",
+        "db.toml",
+        "b.env",
+        "a.yaml",
+    ]
+
+    parsed.clear()
+    (fragments / "a.yaml").write_text("_INCLUDE: common/db.toml\nA: changed\n")
+
+    assert DSL._load_secrets_file(str(fragments / "c.toml"))["A"] == "changed"
+    assert [p.rsplit("/", 1)[1] for p in parsed] == ["a.yaml"]
+
+    parsed.clear()
+    DSL._load_secrets_file(str(fragments / "b.env"))
+
+    assert parsed == []
+
+
+def test_include_cycle(tmp_path):
+    """Should raise on include cycles."""
+    (tmp_path / "a.toml").write_text('_INCLUDE = "b.toml"\n')
+    (tmp_path / "b.toml").write_text('_INCLUDE = "a.toml"\n')
+
+    with pytest.raises(ImproperlyConfigured, match="cycle"):
+        DSL._load_secrets_file(str(tmp_path / "a.toml"))
+
+
+def test_include_missing(tmp_path):
+    """Should raise on missing includes."""
+    (tmp_path / "a.toml").write_text('_INCLUDE = "missing.toml"\n')
+
+    with pytest.raises(ImproperlyConfigured):
+        DSL._load_secrets_file(str(tmp_path / "a.toml"))
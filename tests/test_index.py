@@ -0,0 +1,113 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Flattened path index tests."""
+
+import pytest
+
+import djangosecretsloader as DSL
+from djangosecretsloader.refs import _defer_references
+
+SECRETS = {
+    "DB": {"default": {"HOST": "localhost", "PORT": 5432}},
+    "DEBUG": False,
+    "HOSTS": ["a", "b"],
+    "DBX": "x",
+}
+
+
+def test_index_lookup():
+    """Should look up scalars, lists, and dicts by path."""
+    index = DSL.SecretsIndex(SECRETS)
+
+    assert index["DB__default__HOST"] == "localhost"
+    assert index.get("DB__default") == {"HOST": "localhost", "PORT": 5432}
+    assert index.get("HOSTS__1") == "b"
+    assert index.get("DB__default__USER", "none") == "none"
+    assert "DEBUG" in index
+    assert "DB__HOST" not in index
+
+    with pytest.raises(KeyError):
+        index["DB__HOST"]
+
+
+def test_index_items():
+    """Should iterate over scalars in path order."""
+    index = DSL.SecretsIndex(SECRETS)
+
+    assert list(index.items("DB")) == [
+        ("DB__default__HOST", "localhost"),
+        ("DB__default__PORT", 5432),
+    ]
+    assert list(index.items("DBX")) == [("DBX", "x")]
+    assert [path for path, _ in index.items()] == [
+        "DBX",
+        "DB__default__HOST",
+        "DB__default__PORT",
+        "DEBUG",
+        "HOSTS__0",
+        "HOSTS__1",
+    ]
+
+
+def test_index_update():
+    """Should reindex only the changed paths."""
+    index = DSL.SecretsIndex(SECRETS)
+    changed = index.update(
+        {
+            "DB": {"default": {"HOST": "db.local", "PORT": 5432}},
+            "DEBUG": False,
+            "HOSTS": ["a"],
+            "NEW": {"A": 1},
+        }
+    )
+
+    assert changed == {
+        "DB__default__HOST",
+        "HOSTS",
+        "HOSTS__0",
+        "HOSTS__1",
+        "NEW",
+        "NEW__A",
+        "DBX",
+    }
+    assert index["DB__default__HOST"] == "db.local"
+    assert index["DB__default"]["HOST"] == "db.local"
+    assert "HOSTS__1" not in index
+    assert "DBX" not in index
+    assert list(index.items("NEW")) == [("NEW__A", 1)]
+    assert index.update(index.secrets) == set()
+
+
+def test_index_update_references(monkeypatch):
+    """Should compare references without resolving them."""
+    monkeypatch.delenv("DSL_TEST_SECRET", raising=False)
+    index = DSL.SecretsIndex(_defer_references({"KEY": "ref+env://DSL_TEST_SECRET"}))
+
+    assert index.update(_defer_references({"KEY": "ref+env://DSL_TEST_SECRET"})) == (
+        set()
+    )
+    assert index.update(_defer_references({"KEY": "ref+env://OTHER"})) == {"KEY"}
+
+
+def test_index_lazy_snapshot(tmp_path):
+    """Should index the nested values of lazy mappings."""
+    fn = tmp_path / "secrets.dsl"
+    fn.write_bytes(
+        DSL.dump_secrets(
+            fmt="INDEXED", DB={"default": {"HOST": "db.local"}}, HOSTS=["a", "b"]
+        )
+    )
+
+    index = DSL.SecretsIndex(DSL.open_secrets(str(fn)))
+
+    assert index["DB__default__HOST"] == "db.local"
+    assert index["HOSTS__1"] == "b"
+    assert list(index.items("DB")) == [("DB__default__HOST", "db.local")]
@@ -0,0 +1,133 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Indexed snapshot tests."""
+
+import os
+import stat
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+import djangosecretsloader as DSL
+
+SECRETS = {
+    "SECRET_KEY": "s3cr3t",
+    "DB": {"default": {"HOST": "localhost", "PORT": 5432}},
+    "HOSTS": ["a", "b"],
+    "CERT": b"\x00\x01binary",
+    "DEBUG": False,
+}
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    """Write an indexed snapshot."""
+    fn = tmp_path / "secrets.dsl"
+    fn.write_bytes(DSL.dump_secrets(fmt="INDEXED", **SECRETS))
+
+    return str(fn)
+
+
+def test_open_secrets(snapshot):
+    """Should decode values lazily."""
+    secrets = DSL.open_secrets(snapshot)
+
+    assert list(secrets) == list(SECRETS)
+    assert "DB" in secrets
+    assert secrets._values == {}
+    assert isinstance(secrets["DB"], DSL.IndexedSecrets)
+    assert secrets["DB"]["default"]["PORT"] == 5432
+    assert list(secrets._values) == ["DB"]
+    assert isinstance(secrets["CERT"], memoryview)
+    assert secrets["CERT"] == b"\x00\x01binary"
+    assert secrets["HOSTS"] == ["a", "b"]
+    assert secrets["DEBUG"] is False
+
+
+def test_open_secrets_references(tmp_path):
+    """Should defer references."""
+    fn = tmp_path / "secrets.dsl"
+    fn.write_bytes(DSL.dump_secrets(fmt="INDEXED", KEY="ref+env://DSL_TEST_KEY"))
+
+    assert isinstance(DSL.open_secrets(str(fn))["KEY"], DSL.refs._Reference)
+
+
+def test_open_secrets_invalid(tmp_path):
+    """Should raise on files which are not snapshots."""
+    empty = tmp_path / "empty"
+    empty.write_bytes(b"")
+    truncated = tmp_path / "truncated"
+    truncated.write_bytes(DSL.dump_secrets(fmt="INDEXED", **SECRETS)[:12])
+
+    for fn in (empty, truncated):
+        with pytest.raises(ImproperlyConfigured):
+            DSL.open_secrets(str(fn))
+
+
+def test_load_secrets_indexed(snapshot, monkeypatch):
+    """Should load only the needed values from a snapshot."""
+    monkeypatch.setenv("DJANGO_ENV_SECRET_KEY", "environment")
+
+    actual = DSL.load_secrets(fn=snapshot, SECRET_KEY="", DB={})
+
+    assert actual == {
+        "SECRET_KEY": "environment",
+        "DB": {"default": {"HOST": "localhost", "PORT": 5432}},
+    }
+    assert DSL._load_secrets_file(snapshot)["CERT"] == b"\x00\x01binary"
+
+
+def test_load_secrets_indexed_references(tmp_path):
+    """Should load the values referenced by the needed values."""
+    fn = tmp_path / "secrets.dsl"
+    fn.write_bytes(
+        DSL.dump_secrets(fmt="INDEXED", A="${B}/x", B="${C}", C="host", D="d")
+    )
+
+    assert DSL.load_secrets(fn=str(fn), A="defaults") == {"A": "host/x"}
+    assert DSL._load_secrets_indexed(str(fn), keys=frozenset({"A"})) == {
+        "A": "${B}/x",
+        "B": "${C}",
+        "C": "host",
+    }
+
+
+def test_load_secrets_indexed_profile(tmp_path):
+    """Should select a profile from a snapshot."""
+    fn = tmp_path / "secrets.dsl"
+    fn.write_bytes(
+        DSL.dump_secrets(
+            fmt="INDEXED",
+            base={"DB": {"HOST": "localhost", "PORT": 5432}},
+            production={"DB": {"HOST": "db.example.com"}},
+        )
+    )
+
+    assert DSL.load_secrets(fn=str(fn), profile="production", DB={}) == {
+        "DB": {"HOST": "db.example.com", "PORT": 5432}
+    }
+
+
+def test_main_indexed_output(tmp_path, monkeypatch):
+    """Should convert a secrets file into a private snapshot."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "secrets.json").write_text('{"A": "one", "B": {"C": 2}}')
+
+    with pytest.raises(SystemExit):
+        DSL.main(["secrets.json", "-d", "INDEXED", "-o", "secrets.dsl"])
+
+    assert stat.S_IMODE(os.stat("secrets.dsl").st_mode) == 0o600
+    assert DSL._load_secrets_file("secrets.dsl") == {"A": "one", "B": {"C": 2}}
+
+    with pytest.raises(SystemExit) as exit:
+        DSL.main(["secrets.dsl", "-V"])
+
+    assert exit.value.code == 0
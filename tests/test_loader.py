@@ -322,6 +322,71 @@ def test__load_secrets_environment_missing():
     assert actual == expected
 
 
+def test__load_secrets_environment_files(tmp_path, monkeypatch):
+    """Should read variables from secret files."""
+    monkeypatch.setenv("DJANGO_LOADER_FILE_SUFFIX", "_FILE")
+    (tmp_path / "password").write_text("s3cret\n")
+    (tmp_path / "user").write_text("app")
+    monkeypatch.setenv("DJANGO_ENV_DB__PASSWORD_FILE", str(tmp_path / "password"))
+    monkeypatch.setenv("DJANGO_ENV_DB__USER_FILE", str(tmp_path / "user"))
+    monkeypatch.setenv("DJANGO_ENV_DB__USER", "override")
+    expected = {
+        "DB": {
+            "PASSWORD": "s3cret",
+            "USER": "override",
+        },
+    }
+    actual = DSL._load_secrets_environment()
+
+    assert actual == expected
+
+
+def test__load_secrets_environment_files_many(tmp_path, monkeypatch):
+    """Should read many secret files in parallel."""
+    monkeypatch.setenv("DJANGO_LOADER_FILE_SUFFIX", "_FILE")
+    for i in range(40):
+        (tmp_path / str(i)).write_text(f"value{i}\n")
+        monkeypatch.setenv(f"DJANGO_ENV_KEYS__K{i}_FILE", str(tmp_path / str(i)))
+    expected = {
+        "KEYS": {f"K{i}": f"value{i}" for i in range(40)},
+    }
+    actual = DSL._load_secrets_environment()
+
+    assert actual == expected
+
+
+def test__load_secrets_environment_files_missing(tmp_path, monkeypatch):
+    """Should warn and keep the filename of missing secret files."""
+    monkeypatch.setenv("DJANGO_ENV_KEY_FILE", str(tmp_path / "missing"))
+
+    with pytest.warns(UserWarning):
+        actual = DSL._load_secrets_environment(file_suffix="_FILE")
+
+    assert actual == {"KEY_FILE": str(tmp_path / "missing")}
+
+
+def test__load_secrets_environment_files_unset(tmp_path, monkeypatch):
+    """Should keep variables ending in ``_FILE`` unless enabled."""
+    (tmp_path / "app.log").write_text("contents")
+    monkeypatch.setenv("DJANGO_ENV_LOG_FILE", str(tmp_path / "app.log"))
+
+    assert DSL._load_secrets_environment() == {"LOG_FILE": str(tmp_path / "app.log")}
+
+
+def test__load_secrets_environment_files_suffix(tmp_path, monkeypatch):
+    """Should use a configured suffix, or none."""
+    (tmp_path / "key").write_text("s3cret")
+    monkeypatch.setenv("DJANGO_ENV_KEY_PATH", str(tmp_path / "key"))
+
+    assert DSL._load_secrets_environment(file_suffix="") == {
+        "KEY_PATH": str(tmp_path / "key")
+    }
+
+    monkeypatch.setenv("DJANGO_LOADER_FILE_SUFFIX", "_PATH")
+
+    assert DSL._load_secrets_environment() == {"KEY": "s3cret"}
+
+
 def test_load_list(monkeypatch):
     """Should load list with list-style environment variables."""
     monkeypatch.setenv("DJANGO_ENV_FRUIT__0", "apple")
@@ -656,3 +721,92 @@ def test_dump_secrets_env():
     actual = DSL.dump_secrets(fmt="ENV", **config)
 
     assert actual == expected
+
+
+def test_load_json_values(monkeypatch):
+    """Should decode ``__JSON`` environment variables."""
+    monkeypatch.setenv("DJANGO_ENV_FRUIT__JSON", '["apple", {"0": "banana"}]')
+    monkeypatch.setenv("DJANGO_ENV_FOOD__COUNT__JSON", "5")
+    monkeypatch.setenv("DJANGO_ENV_FOOD__NAME", "lunch")
+    monkeypatch.setenv("DJANGO_ENV_MEALS__0__JSON", '{"time": 8}')
+    monkeypatch.setenv("DJANGO_ENV_MEALS__1", "dinner")
+
+    expected = {
+        "FRUIT": ["apple", {"0": "banana"}],
+        "FOOD": {
+            "COUNT": 5,
+            "NAME": "lunch",
+        },
+        "MEALS": [{"time": 8}, "dinner"],
+    }
+
+    assert DSL._load_secrets_environment() == expected
+
+
+def test_load_json_values_invalid(monkeypatch):
+    """Should raise on invalid ``__JSON`` environment variables."""
+    monkeypatch.setenv("DJANGO_ENV_FRUIT__JSON", "[apple")
+
+    with pytest.raises(ImproperlyConfigured):
+        DSL._load_secrets_environment()
+
+
+def test_dump_json_values(monkeypatch):
+    """Should dump large subtrees as ``__JSON`` variables."""
+    config = {
+        "BREAKFAST": "toast",
+        "FRUIT": ["apple", "banana", "orange"],
+        "FOOD": {
+            "SNACK": ["nuts"],
+        },
+    }
+
+    expected = """export DJANGO_ENV_BREAKFAST='toast'
+export DJANGO_ENV_FRUIT__JSON='["apple","banana","orange"]'
+export DJANGO_ENV_FOOD__SNACK__0='nuts'"""
+
+    actual = DSL._dump_secrets_environment(config, json_threshold=20)
+
+    assert actual == expected
+
+    for line in actual.splitlines():
+        name, value = line.removeprefix("export ").split("=", 1)
+        monkeypatch.setenv(name, value.strip("'"))
+
+    assert DSL._load_secrets_environment() == config
+
+
+def test_blob_round_trip(monkeypatch):
+    """Should load a dumped configuration blob."""
+    config = {
+        "BREAKFAST": "toast",
+        "FRUIT": ["apple", "banana"],
+        "FOOD": {
+            "COUNT": 5,
+        },
+    }
+
+    line = DSL.dump_secrets(fmt="BLOB", **config)
+    name, value = line.removeprefix("export ").split("=", 1)
+
+    assert name == "DJANGO_ENV__BLOB"
+
+    monkeypatch.setenv(name, value.strip("'"))
+    monkeypatch.setenv("DJANGO_ENV_BREAKFAST", "eggs")
+
+    expected = dict(config, BREAKFAST="eggs")
+
+    assert DSL._load_secrets_environment() == expected
+
+
+def test_blob_invalid(monkeypatch):
+    """Should raise on an invalid blob."""
+    monkeypatch.setenv("DJANGO_ENV__BLOB", "z1:not-a-blob")
+
+    with pytest.raises(ImproperlyConfigured):
+        DSL._load_secrets_environment()
+
+    monkeypatch.setenv("DJANGO_ENV__BLOB", "nope")
+
+    with pytest.raises(ImproperlyConfigured):
+        DSL._load_secrets_environment()
@@ -10,6 +10,9 @@
 
 """django-loader command line options tests."""
 
+import json
+import os
+
 import pytest
 
 import djangosecretsloader as DSL
@@ -165,3 +168,165 @@ WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
         actual = capsys.readouterr().out
 
         assert actual == expected
+
+
+def test_exec_env(monkeypatch):
+    """Should execute the command with an environment snapshot."""
+    calls = []
+    monkeypatch.setattr("os.execvp", lambda file, args: calls.append(args))
+    # Record the snapshot variables so that they are restored.
+    monkeypatch.setenv("DJANGO_LOADER_SNAPSHOT", "")
+    monkeypatch.setenv("DJANGO_LOADER_SNAPSHOT_FD", "")
+    monkeypatch.delenv("DJANGO_LOADER_SNAPSHOT")
+    monkeypatch.delenv("DJANGO_LOADER_SNAPSHOT_FD")
+    monkeypatch.setenv("DJANGO_ENV_TEST_VAR", "environment")
+
+    DSL.main(["--exec", "gunicorn", "-w", "4"])
+
+    assert calls == [["gunicorn", "-w", "4"]]
+    assert DSL.load_secrets(TEST_VAR="defaults") == {"TEST_VAR": "environment"}
+
+    # The snapshot is used, not the environment.
+    monkeypatch.setenv("DJANGO_ENV_TEST_VAR", "changed")
+
+    assert DSL.load_secrets(TEST_VAR="defaults") == {"TEST_VAR": "environment"}
+    assert DSL.load_secrets(prefix="OTHER_", TEST_VAR="defaults") == {
+        "TEST_VAR": "defaults"
+    }
+
+
+def test_exec_fd(monkeypatch):
+    """Should execute the command with a file descriptor snapshot."""
+    calls = []
+    monkeypatch.setattr("os.execvp", lambda file, args: calls.append(args))
+    # Record the snapshot variables so that they are restored.
+    monkeypatch.setenv("DJANGO_LOADER_SNAPSHOT", "")
+    monkeypatch.setenv("DJANGO_LOADER_SNAPSHOT_FD", "")
+    monkeypatch.delenv("DJANGO_LOADER_SNAPSHOT")
+    monkeypatch.delenv("DJANGO_LOADER_SNAPSHOT_FD")
+    monkeypatch.setenv("DJANGO_ENV_TEST_VAR", "environment")
+
+    DSL.main(["-D", "TEST_VAR", "arguments", "--exec-mode", "fd", "-x", "true"])
+
+    fd = int(os.environ["DJANGO_LOADER_SNAPSHOT_FD"])
+
+    assert calls == [["true"]]
+    assert os.get_inheritable(fd)
+    assert DSL.load_secrets() == {"TEST_VAR": "environment"}
+    assert DSL.load_secrets() == {"TEST_VAR": "environment"}
+
+    os.close(fd)
+
+
+def test_exec_interpolate_defaults(tmp_path, monkeypatch):
+    """Should interpolate the defaults against the snapshot."""
+    calls = []
+    monkeypatch.setattr("os.execvp", lambda file, args: calls.append(args))
+    monkeypatch.setenv("DJANGO_LOADER_SNAPSHOT", "")
+    monkeypatch.setenv("DJANGO_LOADER_SNAPSHOT_FD", "")
+    monkeypatch.delenv("DJANGO_LOADER_SNAPSHOT")
+    monkeypatch.delenv("DJANGO_LOADER_SNAPSHOT_FD")
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "secrets.json").write_text(
+        '{"DB": {"HOST": "db.local"}, "PRICE": "$${AMOUNT}", "URL": "file"}'
+    )
+
+    DSL.main(["secrets.json", "--exec", "true"])
+
+    assert calls == [["true"]]
+    assert DSL.load_secrets(
+        fn="secrets.json",
+        CACHE="redis://${DB__HOST}",
+        LABEL="${PRICE}!",
+        URL="${MISSING}",
+    ) == {"CACHE": "redis://db.local", "LABEL": "${AMOUNT}!", "URL": "file"}
+
+
+def test_exec_other_source(tmp_path, monkeypatch):
+    """Should ignore the snapshot when loading another source."""
+    calls = []
+    monkeypatch.setattr("os.execvp", lambda file, args: calls.append(args))
+    monkeypatch.setenv("DJANGO_LOADER_SNAPSHOT", "")
+    monkeypatch.setenv("DJANGO_LOADER_SNAPSHOT_FD", "")
+    monkeypatch.delenv("DJANGO_LOADER_SNAPSHOT")
+    monkeypatch.delenv("DJANGO_LOADER_SNAPSHOT_FD")
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "secrets.json").write_text('{"A": "snapshot"}')
+    (tmp_path / "other.json").write_text('{"A": "other", "staging": {"A": "staging"}}')
+
+    DSL.main(["secrets.json", "--exec", "true"])
+
+    assert calls == [["true"]]
+    assert DSL.load_secrets(fn="secrets.json", A="defaults") == {"A": "snapshot"}
+    assert DSL.load_secrets(fn=str(tmp_path / "secrets.json")) == {"A": "snapshot"}
+    assert DSL.load_secrets(fn="other.json", A="defaults") == {"A": "other"}
+    assert DSL.load_secrets(fn="other.json", profile="staging", A="defaults") == {
+        "A": "staging"
+    }
+
+    class Backend(DSL.SecretsBackend):
+        def get_many(self, keys=None):
+            return {"B": "backend"}
+
+    assert DSL.load_secrets(
+        fn="secrets.json", backends=[Backend()], A="defaults", B="defaults"
+    ) == {"A": "snapshot", "B": "backend"}
+
+
+def test_exec_missing_command(monkeypatch):
+    """Should exit with 127 if the command cannot be executed."""
+    monkeypatch.setenv("DJANGO_LOADER_SNAPSHOT", "")
+    monkeypatch.delenv("DJANGO_LOADER_SNAPSHOT")
+
+    with pytest.raises(SystemExit) as error:
+        DSL.main(["-x", "/not/a/command"])
+
+    assert str(error.value) == "127"
+
+
+@pytest.fixture
+def query_file(tmp_path, monkeypatch):
+    """Write a secrets file to query."""
+    fn = tmp_path / "secrets.json"
+    fn.write_text(
+        '{"DB": {"HOST": "db.local", "PORT": 5432, "HOSTS": ["a", "b"]},'
+        ' "KEY": "k", "SKIPPED": {"INVALID": tru}}'
+    )
+    monkeypatch.setenv("DJANGO_ENV_KEY", "environment")
+
+    return str(fn)
+
+
+def test_get(query_file, capsys):
+    """Should print one raw value without loading everything."""
+    with pytest.raises(SystemExit) as exit:
+        DSL.main([query_file, "--get", "DB__HOST"])
+
+    assert exit.value.code == 0
+    assert capsys.readouterr().out == "db.local\n"
+
+    with pytest.raises(SystemExit):
+        DSL.main([query_file, "--get", "DB__HOSTS"])
+
+    assert capsys.readouterr().out == '[\n  "a",\n  "b"\n]\n'
+
+
+def test_get_missing(query_file, capsys):
+    """Should fail on an undefined path."""
+    with pytest.raises(SystemExit) as exit:
+        DSL.main([query_file, "--get", "DB__USER"])
+
+    assert exit.value.code == 1
+    assert "DB__USER is not defined" in capsys.readouterr().err
+
+
+def test_many(query_file, capsys):
+    """Should print several values as a JSON object."""
+    with pytest.raises(SystemExit):
+        DSL.main([query_file, "--many", "DB__PORT", "DB__HOSTS__1", "KEY"])
+
+    assert json.loads(capsys.readouterr().out) == {
+        "DB__PORT": 5432,
+        "DB__HOSTS__1": "b",
+        "KEY": "environment",
+    }
@@ -0,0 +1,107 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""MessagePack tests."""
+
+import datetime
+
+import pytest
+
+import djangosecretsloader as DSL
+from djangosecretsloader import packed
+
+CONFIG = {
+    "NONE": None,
+    "FLAGS": [True, False],
+    "INTS": [0, 127, 128, -32, -33, 255, 256, 65536, 2**32, 2**64 - 1, -(2**63)],
+    "FLOAT": -0.25,
+    "STRINGS": ["", "ünïcode", "x" * 40, "y" * 300, "z" * 70000],
+    "BINARY": [b"", b"\x00" * 300, b"\xff" * 70000],
+    "NESTED": {str(i): {"LIST": list(range(i))} for i in range(20)},
+}
+
+
+@pytest.fixture
+def fallback(monkeypatch):
+    """Use the pure Python implementation."""
+    monkeypatch.setattr(packed, "msgpack", None)
+
+
+def test_round_trip(fallback):
+    """Should decode what it encodes."""
+    assert packed._unpack(packed._pack(CONFIG)) == CONFIG
+
+
+def test_round_trip_msgpack(monkeypatch):
+    """Should read and write the same bytes as the msgpack package."""
+    pytest.importorskip("msgpack")
+    config = dict(CONFIG, DATE=datetime.date(2024, 1, 2))
+    encoded = packed._pack(config)
+    expected = dict(config, DATE="2024-01-02")
+
+    assert packed._unpack(encoded) == expected
+
+    monkeypatch.setattr(packed, "msgpack", None)
+
+    assert packed._pack(config) == encoded
+    assert packed._unpack(encoded) == expected
+
+
+@pytest.mark.parametrize(
+    "value, encoded",
+    [
+        ({}, b"\x80"),
+        ({"a": None}, b"\x81\xa1a\xc0"),
+        ({"a": [True, -1, 200]}, b"\x81\xa1a\x93\xc3\xff\xcc\xc8"),
+        ({"a": -200}, b"\x81\xa1a\xd1\xff\x38"),
+        ({"a": b"\x00"}, b"\x81\xa1a\xc4\x01\x00"),
+        ({"a": 1.5}, b"\x81\xa1a\xcb\x3f\xf8\x00\x00\x00\x00\x00\x00"),
+        ({"a": "x" * 32}, b"\x81\xa1a\xd9\x20" + b"x" * 32),
+        ({"a": datetime.date(2024, 1, 2)}, b"\x81\xa1a\xaa2024-01-02"),
+    ],
+)
+def test_pack(fallback, value, encoded):
+    """Should encode values in their smallest forms."""
+    assert packed._pack(value) == encoded
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"\x81\xa1a",
+        b"\x81\xa1a\xc0\xc0",
+        b"\x91\xc0",
+        b"\x81\xc1\xc0",
+        b"\x81\x91\xc0\xc0",
+    ],
+)
+def test_unpack_invalid(fallback, data):
+    """Should raise on truncated, extra, or unsupported data."""
+    with pytest.raises(ValueError):
+        packed._unpack(data)
+
+
+def test_load_secrets_msgpack(tmp_path, monkeypatch):
+    """Should recognize MessagePack files by their first byte."""
+    monkeypatch.setenv("DJANGO_ENV_A", "environment")
+    fn = tmp_path / "secrets"
+    fn.write_bytes(
+        DSL.dump_secrets(
+            fmt="MSGPACK",
+            base={"A": "one", "B": {"C": b"\xff"}},
+            production={"B": {"D": 2}},
+        )
+    )
+
+    assert DSL.load_secrets(fn=str(fn), profile="production", A="", B={}) == {
+        "A": "environment",
+        "B": {"C": b"\xff", "D": 2},
+    }
+    assert DSL._validate_file_format(str(fn))
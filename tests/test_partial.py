@@ -0,0 +1,76 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Partial JSON parsing tests."""
+
+import json
+
+import pytest
+
+import djangosecretsloader as DSL
+from djangosecretsloader import loader
+
+CONFIG = {
+    "SCALAR": 1.5,
+    "BRACES": {"PASSWORD": "p{a}ss[word", "OTHER": ["}", "{", "]"]},
+    "ESCAPES": {"QUOTE": 'say "hi" {', "PATH": "C:\\secrets\\"},
+    "NESTED": [[1, [2, {"A": None}]], {"B": [True, False]}],
+    "UNICODE": {"NAME": "caf\u00e9 \u2603"},
+    "EMPTY": {},
+    "LIST": [],
+    "LAST": "last",
+}
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_load_json_partial(indent):
+    """Should decode only the wanted values, exactly."""
+    text = json.dumps(CONFIG, indent=indent)
+
+    for key in CONFIG:
+        assert loader._load_json_partial(text, [key]) == {key: CONFIG[key]}
+
+    assert loader._load_json_partial(text, list(CONFIG)) == CONFIG
+    assert loader._load_json_partial(text, ["MISSING"]) == {}
+
+
+def test_load_json_partial_references():
+    """Should decode the values referenced by wanted values."""
+    text = json.dumps(
+        {"URL": "http://${DB__HOST}/", "DB": {"HOST": "${HOST}"}, "HOST": "h", "X": 1}
+    )
+
+    assert loader._load_json_partial(text, ["URL"]) == {
+        "URL": "http://${DB__HOST}/",
+        "DB": {"HOST": "${HOST}"},
+        "HOST": "h",
+    }
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["[]", '{"A": 1', '{"A" 1}', '{"A": 1,}', '{"A": {"B": 1}', '{"A": 1} x'],
+)
+def test_load_json_partial_invalid(text):
+    """Should raise on invalid structure."""
+    with pytest.raises(json.JSONDecodeError):
+        loader._load_json_partial(text, ["A"])
+
+
+def test_load_secrets_partial(tmp_path):
+    """Should load defaults and references without decoding the rest."""
+    fn = tmp_path / "secrets.json"
+    fn.write_text(
+        '{"SKIPPED": {"INVALID": tru}, "DB": {"HOST": "db.local"}, "KEY": "k"}'
+    )
+
+    actual = DSL.load_secrets(str(fn), KEY="", URL="postgres://${DB__HOST}/app")
+
+    assert actual == {"KEY": "k", "URL": "postgres://db.local/app"}
@@ -0,0 +1,183 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Profile tests."""
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+import djangosecretsloader as DSL
+from djangosecretsloader import loader
+
+EXPECTED = {
+    "DEBUG": "false",
+    "DB": {"HOST": "db.example.com", "PORT": "5432"},
+}
+
+FILES = {
+    "secrets.toml": """NAME = "app"
+
+[base]
+DEBUG = "false"
+
+[base.DB]
+PORT = "5432"
+
+[development]
+DEBUG = "true"
+
+[production.DB]
+HOST = "db.example.com"
+
+[[staging]]
+BROKEN = "not a table"
+""",
+    "secrets.json": """{
+  "base": {"DEBUG": "false", "DB": {"PORT": "5432"}},
+  "development": {"DEBUG": "true"},
+  "production": {"DB": {"HOST": "db.example.com"}}
+}""",
+    "secrets.yaml": """base:
+  DEBUG: "false"
+  DB:
+    PORT: "5432"
+---
+development: [not, parsed
+---
+production:
+  DB:
+    HOST: db.example.com
+""",
+    "secrets.env": """base__DEBUG='false'
+base__DB__PORT='5432'
+development__DEBUG=true
+production__DB__HOST=db.example.com
+""",
+}
+
+
+@pytest.mark.parametrize("name", sorted(FILES))
+def test_load_secrets_profile(name, tmp_path):
+    """Should merge the profile over the base."""
+    fn = tmp_path / name
+    fn.write_text(FILES[name])
+
+    assert DSL.load_secrets(str(fn), profile="production") == EXPECTED
+
+
+def test_load_secrets_profile_environment(tmp_path, monkeypatch):
+    """Should select the profile from the environment."""
+    fn = tmp_path / "secrets.json"
+    fn.write_text(FILES["secrets.json"])
+    monkeypatch.setenv("DJANGO_LOADER_PROFILE", "production")
+
+    assert DSL.load_secrets(str(fn), DB={}) == {"DB": EXPECTED["DB"]}
+
+
+def test_load_secrets_profile_missing(tmp_path):
+    """Should raise on a missing profile."""
+    fn = tmp_path / "secrets.json"
+    fn.write_text(FILES["secrets.json"])
+
+    with pytest.raises(ImproperlyConfigured):
+        DSL.load_secrets(str(fn), profile="staging")
+
+
+def test_prune_toml():
+    """Should keep only the wanted tables."""
+    pruned = loader._prune_toml(FILES["secrets.toml"], ("base", "production"))
+
+    assert "development" not in pruned
+    assert "staging" not in pruned
+    assert 'NAME = "app"' in pruned
+    assert "[production.DB]" in pruned
+
+
+def test_yaml_documents_without_profile(tmp_path):
+    """Should merge YAML documents without a profile."""
+    fn = tmp_path / "secrets.yaml"
+    fn.write_text("---\nA: a\n---\nB: b\n")
+
+    assert DSL.load_secrets(str(fn)) == {"A": "a", "B": "b"}
+
+
+def test_yaml_documents_several_profiles(tmp_path):
+    """Should not skip a document with a wanted profile after others."""
+    fn = tmp_path / "secrets.yaml"
+    fn.write_text(
+        "base:\n  A: a\n---\nstaging:\n  A: staging\n"
+        "production:\n  A: production\n---\n# Comment\ndevelopment:\n  A: x\n"
+    )
+
+    assert DSL.load_secrets(str(fn), profile="production", A="") == {"A": "production"}
+    assert loader._load_yaml(fn.read_text(), ("base", "development")) == {
+        "base": {"A": "a"},
+        "development": {"A": "x"},
+    }
+
+
+INCLUDING = {
+    "secrets.toml": """_INCLUDE = "common.json"
+
+[base]
+DEBUG = "false"
+
+[production]
+DEBUG = "true"
+""",
+    "secrets.json": """{
+  "_INCLUDE": "common.json",
+  "base": {"DEBUG": "false"},
+  "production": {"DEBUG": "true"}
+}""",
+    "secrets.yaml": """_INCLUDE: common.json
+---
+base:
+  DEBUG: "false"
+---
+production:
+  DEBUG: "true"
+""",
+}
+
+
+@pytest.mark.parametrize("name", sorted(INCLUDING))
+def test_load_secrets_profile_include(name, tmp_path):
+    """Should keep the top level includes of a profile's file."""
+    (tmp_path / "common.json").write_text('{"CACHE": "redis", "DEBUG": "none"}')
+    fn = tmp_path / name
+    fn.write_text(INCLUDING[name])
+
+    assert DSL.load_secrets(str(fn), profile="production") == {
+        "CACHE": "redis",
+        "DEBUG": "true",
+    }
+    assert DSL.load_secrets(str(fn), profile="production", DEBUG="") == {
+        "DEBUG": "true"
+    }
+
+
+def test_load_secrets_profile_include_indexed(tmp_path):
+    """Should keep the top level includes of an indexed snapshot."""
+    (tmp_path / "common.json").write_text('{"CACHE": "redis"}')
+    fn = tmp_path / "secrets.dsl"
+    fn.write_bytes(
+        DSL.dump_secrets(
+            fmt="INDEXED",
+            _INCLUDE=["common.json"],
+            production={"DEBUG": "true", "_INCLUDE": "production.json"},
+        )
+    )
+    (tmp_path / "production.json").write_text('{"CACHE": "memcached"}')
+
+    assert DSL.load_secrets(str(fn), profile="production") == {
+        "CACHE": "memcached",
+        "DEBUG": "true",
+    }
@@ -0,0 +1,102 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Secret reference tests."""
+
+import json
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+import djangosecretsloader as DSL
+from djangosecretsloader.refs import _defer_references
+
+
+@pytest.fixture(autouse=True)
+def resolved():
+    """Forget resolved references."""
+    DSL.refs._RESOLVED.clear()
+    yield
+    DSL.refs._RESOLVED.clear()
+
+
+def test_references_deferred(tmp_path, monkeypatch):
+    """Should resolve references on first use only."""
+    secret = tmp_path / "api_key"
+    secret.write_text("s3cret\n")
+    fn = tmp_path / "secrets.json"
+    fn.write_text(
+        json.dumps({"API": {"KEY": {"$ref": f"file:{secret}"}}, "PLAIN": "plain"})
+    )
+    monkeypatch.setenv("DJANGO_ENV_TOKEN", "ref+env://UPSTREAM_TOKEN")
+    monkeypatch.setenv("UPSTREAM_TOKEN", "t0ken")
+
+    secrets = DSL.load_secrets(str(fn))
+
+    assert DSL.refs._RESOLVED == {}
+    assert secrets["PLAIN"] == "plain"
+    assert secrets["API"]["KEY"] == "s3cret"
+    assert str(secrets["TOKEN"]) == "t0ken"
+    assert secrets["TOKEN"] + "!" == "t0ken!"
+
+    secret.write_text("changed")
+
+    assert secrets["API"]["KEY"] == "s3cret"
+
+
+def test_defer_references_copies_only_references():
+    """Should return values without references unchanged."""
+    config = {"DB": {"HOST": "db", "PORTS": [1, 2]}, "KEYS": ["a", "ref+env://B"]}
+
+    assert _defer_references(config["DB"]) is config["DB"]
+
+    deferred = _defer_references(config)
+
+    assert deferred is not config
+    assert deferred["DB"] is config["DB"]
+    assert deferred["KEYS"][0] == "a"
+    assert isinstance(deferred["KEYS"][1], DSL.refs._Reference)
+    assert config["KEYS"] == ["a", "ref+env://B"]
+
+
+def test_references_missing(tmp_path):
+    """Should raise when a missing secret is used."""
+    fn = tmp_path / "secrets.json"
+    fn.write_text(json.dumps({"KEY": "ref+file:///nonexistent/key"}))
+
+    secrets = DSL.load_secrets(str(fn))
+
+    with pytest.raises(ImproperlyConfigured):
+        str(secrets["KEY"])
+
+
+def test_references_unsupported(tmp_path):
+    """Should raise on an unsupported scheme when loading."""
+    fn = tmp_path / "secrets.json"
+    fn.write_text(json.dumps({"KEY": {"$ref": "vault:secret/key"}}))
+
+    with pytest.raises(ImproperlyConfigured):
+        DSL.load_secrets(str(fn))
+
+
+def test_references_dumped_unresolved(tmp_path, monkeypatch):
+    """Should dump references without resolving them."""
+    fn = tmp_path / "secrets.json"
+    fn.write_text(json.dumps({"KEY": {"$ref": "env:UPSTREAM_TOKEN"}}))
+    monkeypatch.delenv("UPSTREAM_TOKEN", raising=False)
+
+    secrets = DSL.load_secrets(str(fn))
+
+    assert json.loads(DSL.dump_secrets(fmt="JSON", **secrets)) == {
+        "KEY": "ref+env://UPSTREAM_TOKEN"
+    }
+    assert DSL.dump_secrets(fmt="ENV", **secrets) == (
+        "export DJANGO_ENV_KEY='ref+env://UPSTREAM_TOKEN'"
+    )
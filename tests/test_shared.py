@@ -0,0 +1,187 @@
+# ******************************************************************************
+#
+# django-loader, a configuration and secret loader for Django
+#
+# Copyright 2021-2024 Jeremy A Gray <gray@flyquackswim.com>.
+#
+# SPDX-License-Identifier: MIT
+#
+# ******************************************************************************
+
+"""Shared memory secrets tests."""
+
+import os
+import threading
+import uuid
+from multiprocessing import shared_memory
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+import djangosecretsloader as DSL
+
+
+@pytest.fixture
+def name():
+    """Provide a unique segment name and clean up after the test."""
+    name = f"dsl-test-{uuid.uuid4().hex[:12]}"
+
+    yield name
+
+    DSL.unlink_secrets(name)
+
+
+def test_publish_and_attach(name):
+    """Should attach to published secrets and decode lazily."""
+    config = {
+        "SECRET_KEY": "shhh",
+        "DB": {
+            "HOST": "localhost",
+            "PORT": 5432,
+        },
+        "HOSTS": ["a", "b"],
+    }
+
+    assert DSL.publish_secrets(config, name) == 1
+
+    secrets = DSL.attach_secrets(name)
+
+    assert secrets.generation == 1
+    assert secrets.prefix == "DJANGO_ENV_"
+    assert len(secrets) == 3
+    assert "DB" in secrets
+    assert secrets._values == {}
+    assert secrets["DB"] == config["DB"]
+    assert list(secrets._values) == ["DB"]
+    assert dict(secrets) == config
+
+    secrets.close()
+
+
+def test_publish_new_generation(name):
+    """Should publish a new generation and unlink the old one."""
+    DSL.publish_secrets({"A": "one"}, name)
+    old = DSL.attach_secrets(name)
+
+    assert old.is_current()
+
+    assert DSL.publish_secrets({"A": "two"}, name) == 2
+
+    new = DSL.attach_secrets(name)
+
+    assert not old.is_current()
+    assert new.is_current()
+    assert old["A"] == "one"
+    assert new["A"] == "two"
+    assert not os.path.exists(f"/dev/shm/{name}-1")
+
+    old.close()
+    new.close()
+
+
+def test_attach_missing(name):
+    """Should raise ``FileNotFoundError`` if nothing is published."""
+    with pytest.raises(FileNotFoundError):
+        DSL.attach_secrets(name)
+
+
+def test_attach_unpublished(name):
+    """Should treat a created but unpublished pointer as not published."""
+    pointer = shared_memory.SharedMemory(name=name, create=True, size=12)
+
+    with pytest.raises(FileNotFoundError):
+        DSL.attach_secrets(name)
+
+    pointer.close()
+
+    assert DSL.publish_secrets({"A": "one"}, name) == 1
+    secrets = DSL.attach_secrets(name)
+    assert secrets["A"] == "one"
+    secrets.close()
+
+
+def test_publish_concurrent(name):
+    """Should serialize concurrent publications."""
+    errors = []
+
+    def publish(i):
+        try:
+            DSL.publish_secrets({"A": i}, name)
+        except Exception as e:  # pragma: no cover
+            errors.append(e)
+
+    threads = [threading.Thread(target=publish, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    secrets = DSL.attach_secrets(name)
+    assert secrets.generation == 8
+    assert not any(os.path.exists(f"/dev/shm/{name}-{i}") for i in range(1, 8))
+    secrets.close()
+
+
+def test_attach_other_owner(name, monkeypatch):
+    """Should not trust segments owned by another user."""
+    DSL.publish_secrets({"A": "one"}, name)
+    monkeypatch.setattr(os, "getuid", lambda: os.geteuid() + 1)
+
+    with pytest.raises(ImproperlyConfigured, match="another user"):
+        DSL.attach_secrets(name)
+
+    monkeypatch.undo()
+
+
+def test_load_secrets_shared(name, tmp_path, monkeypatch):
+    """Should publish on the first load and attach afterwards."""
+    fn = tmp_path / ".env"
+    fn.write_text("A=file\nB=other\n")
+    monkeypatch.setenv("DJANGO_LOADER_ENV_FILE", str(fn))
+    monkeypatch.setenv("DJANGO_LOADER_SHM", name)
+
+    assert DSL.load_secrets(A="defaults") == {"A": "file"}
+
+    # Later loads use the published secrets.
+    fn.write_text("A=changed\n")
+
+    secrets = DSL.load_secrets()
+
+    assert isinstance(secrets, DSL.SharedSecrets)
+    assert dict(secrets) == {"A": "file", "B": "other"}
+    assert DSL.load_secrets(B="defaults") == {"B": "other"}
+
+    secrets.close()
+
+
+def test_load_secrets_shared_interpolate_defaults(name, tmp_path, monkeypatch):
+    """Should interpolate the defaults against the published secrets."""
+    fn = tmp_path / ".env"
+    fn.write_text("DB__HOST=db.local\nPRICE='$${AMOUNT}'\n")
+    monkeypatch.setenv("DJANGO_LOADER_ENV_FILE", str(fn))
+    monkeypatch.setenv("DJANGO_LOADER_SHM", name)
+
+    assert DSL.load_secrets(PRICE="") == {"PRICE": "${AMOUNT}"}
+    assert DSL.load_secrets(URL="pg://${DB__HOST}", LABEL="${PRICE}!") == {
+        "URL": "pg://db.local",
+        "LABEL": "${AMOUNT}!",
+    }
+
+
+def test_load_secrets_shared_other_source(name, tmp_path, monkeypatch):
+    """Should not attach to secrets loaded from another source."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "secrets.json").write_text('{"A": "one", "test": {"A": "test"}}')
+    (tmp_path / "other.json").write_text('{"A": "other"}')
+    monkeypatch.setenv("DJANGO_LOADER_SHM", name)
+
+    assert DSL.load_secrets(fn="secrets.json", A="defaults") == {"A": "one"}
+    assert DSL.load_secrets(fn="other.json", A="defaults") == {"A": "other"}
+    assert DSL.load_secrets(fn="secrets.json", profile="test", A="defaults") == {
+        "A": "test"
+    }
+
+    secrets = DSL.attach_secrets(name)
+    assert (secrets.fn, secrets.profile) == (str(tmp_path / "secrets.json"), "test")
+    secrets.close()